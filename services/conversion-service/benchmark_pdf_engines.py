@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Benchmark the PDF text engines against the bundled PDFs."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from converters.pdf_engines import ENGINES, choose_engine  # noqa: E402
+
+
+def time_engine(engine_name: str, pdf_path: Path) -> float:
+    """Extract every page of a PDF with one engine and return the elapsed seconds."""
+    start = time.perf_counter()
+    with ENGINES[engine_name](pdf_path) as engine:
+        for page_index in range(engine.page_count):
+            engine.extract_text(page_index)
+    return time.perf_counter() - start
+
+
+pdf_paths = [Path(arg) for arg in sys.argv[1:]] or sorted(
+    Path(__file__).parent.glob('pdf*/*.pdf')
+)
+
+print(f"{'PDF':<60} {'layout':>9} {'fast':>9} {'speedup':>8}  auto")
+for pdf_path in pdf_paths:
+    layout_seconds = time_engine('layout', pdf_path)
+    fast_seconds = time_engine('fast', pdf_path)
+    speedup = layout_seconds / fast_seconds if fast_seconds else float('inf')
+    print(
+        f"{pdf_path.name[:60]:<60} {layout_seconds:>8.2f}s {fast_seconds:>8.2f}s "
+        f"{speedup:>7.1f}x  {choose_engine(pdf_path)}"
+    )
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Compare PDF conversion memory with and without --low-memory on a synthetic long PDF.
+
+Usage: python benchmark_pdf_memory.py [PAGES] [ENGINE] [--tolerance FRACTION] [--low-memory-only]
+
+Each mode converts the same generated PDF in a child process whose RSS is
+sampled while it runs (Linux only). In low-memory mode the RSS should stay
+flat from the first window to the last page: the script exits with status 1
+if the low-memory peak grows by more than the tolerance after the first
+quarter of the run. --low-memory-only skips the default mode, which needs
+gigabytes on long PDFs, so the check is cheap enough for CI.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from converters.memory import format_bytes  # noqa: E402
+from converters.pdf_converter import DEFAULT_PAGE_WINDOW, PDFConverter  # noqa: E402
+
+SAMPLE_SECONDS = 0.05
+LINES_PER_PAGE = 40
+# Allowed growth of the low-memory peak RSS after the first quarter of the run
+DEFAULT_TOLERANCE = 0.1
+
+
+def write_synthetic_pdf(path: Path, pages: int) -> None:
+    """Write a PDF with the given number of text pages."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(1, pages + 1):
+        lines = [f"Page {page} line {line}: the quick brown fox jumps over the lazy dog."
+                 for line in range(LINES_PER_PAGE)]
+        text = ' '.join(f"({line}) Tj 0 -16 Td" for line in lines)
+        content = f"BT /F1 11 Tf 50 760 Td {text} ET".encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Count %d /Kids [%s] >>" % (pages, b' '.join(kids))
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(objects) + 1, xref))
+
+
+def convert(pdf_path: Path, output_dir: Path, engine: str, low_memory: bool,
+            page_window: int = DEFAULT_PAGE_WINDOW) -> None:
+    """Convert the PDF in a child process."""
+    converter = PDFConverter(
+        engine=engine, checkpoint=False, low_memory=low_memory, page_window=page_window
+    )
+    converter.convert(pdf_path, output_dir)
+
+
+def rss(pid: int) -> int:
+    """Get the current RSS of a process in bytes."""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def measure(pdf_path: Path, output_dir: Path, engine: str, low_memory: bool,
+            page_window: int = DEFAULT_PAGE_WINDOW) -> tuple:
+    """Run one conversion and return (seconds, RSS samples)."""
+    process = multiprocessing.Process(
+        target=convert, args=(pdf_path, output_dir, engine, low_memory, page_window)
+    )
+    start = time.perf_counter()
+    process.start()
+    samples = []
+    while process.is_alive():
+        try:
+            samples.append(rss(process.pid))
+        except OSError:
+            break
+        time.sleep(SAMPLE_SECONDS)
+    process.join()
+    if process.exitcode:
+        raise SystemExit(f"Conversion failed with exit code {process.exitcode}")
+    return time.perf_counter() - start, [sample for sample in samples if sample]
+
+
+def growth(samples: list) -> float:
+    """Get how much the peak RSS grew after the first quarter of the run, as a fraction."""
+    return max(samples) / max(samples[:max(1, len(samples) // 4)]) - 1
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='?', type=int, default=5000,
+                        help="Pages in the synthetic PDF")
+    parser.add_argument('engine', nargs='?', default='layout', help="PDF text engine")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed growth of the low-memory peak RSS after the first quarter "
+                             f"of the run (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--low-memory-only', action='store_true',
+                        help="Skip the default mode and only check the low-memory bound")
+    args = parser.parse_args()
+    # The first quarter must already span a full page window
+    if args.pages < 4 * DEFAULT_PAGE_WINDOW:
+        parser.error(
+            f"PAGES must be at least {4 * DEFAULT_PAGE_WINDOW} to check the memory bound"
+        )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = Path(temp_dir) / 'synthetic.pdf'
+        write_synthetic_pdf(pdf_path, args.pages)
+        size = format_bytes(pdf_path.stat().st_size)
+        print(f"{args.pages} pages, {args.engine} engine, {size} PDF")
+        print(f"{'mode':<12} {'time':>8} {'RSS 10%':>10} {'RSS 50%':>10} {'RSS 90%':>10} "
+              f"{'peak':>10} {'growth':>7}")
+        for low_memory in (False, True):
+            if not low_memory and args.low_memory_only:
+                continue
+            seconds, samples = measure(pdf_path, Path(temp_dir) / 'out', args.engine, low_memory)
+            quantiles = [samples[int(len(samples) * share)] for share in (0.1, 0.5, 0.9)]
+            print(
+                f"{'low-memory' if low_memory else 'default':<12} {seconds:>7.1f}s "
+                + ' '.join(f"{format_bytes(sample):>10}" for sample in quantiles)
+                + f" {format_bytes(max(samples)):>10} {growth(samples):>+7.0%}"
+            )
+
+    if growth(samples) > args.tolerance:
+        raise SystemExit(
+            f"FAIL: the low-memory peak RSS grew {growth(samples):+.0%} after the first quarter "
+            f"of the run (tolerance {args.tolerance:.0%})"
+        )
+    print(f"OK: the low-memory peak RSS stayed within {args.tolerance:.0%} of its early peak")
+
+
+if __name__ == '__main__':
+    main()
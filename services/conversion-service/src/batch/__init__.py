@@ -0,0 +1,15 @@
+"""Batch execution of conversions: single-file jobs, the async pipeline and the work queue."""
+
+from .jobs import convert_single_file, get_converter
+from .pipeline import convert_async
+from .work_queue import JobQueue, SQLiteJobQueue, open_queue, run_worker
+
+__all__ = [
+    'convert_async',
+    'convert_single_file',
+    'get_converter',
+    'JobQueue',
+    'SQLiteJobQueue',
+    'open_queue',
+    'run_worker',
+]
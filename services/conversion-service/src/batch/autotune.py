@@ -0,0 +1,239 @@
+"""Worker-count autotuning from CPU/memory limits and measured job memory.
+
+``--workers auto`` sizes the worker pool from what the process may really
+use: the CPU quota and memory limit of its cgroup (falling back to the
+CPU affinity mask and physical memory) rather than the host's totals.
+The pool starts with a conservative per-job memory estimate, then grows
+or shrinks as workers report the peak RSS of the jobs they finish.
+"""
+
+import json
+import math
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from converters.memory import format_bytes, peak_rss
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+# Share of the memory limit the workers may use together
+MEMORY_HEADROOM = 0.8
+
+# Per-job peak RSS assumed until jobs have reported their own
+INITIAL_JOB_RSS = 512 << 20
+
+# Completed jobs measured before the first adjustment, and how many of the
+# most recent measurements later adjustments consider
+MIN_SAMPLES = 3
+SAMPLE_WINDOW = 20
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_v2_dirs() -> List[Path]:
+    """Get this process's cgroup v2 directory and its ancestors."""
+    text = _read_text(Path('/proc/self/cgroup')) or ''
+    for line in text.splitlines():
+        if line.startswith('0::'):
+            directory = CGROUP_ROOT / line[3:].lstrip('/')
+            directories = [directory]
+            while directory != CGROUP_ROOT:
+                directory = directory.parent
+                directories.append(directory)
+            return directories
+    return [CGROUP_ROOT]
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """
+    Get the CPU quota of this process's cgroup.
+
+    Returns:
+        Number of CPUs the quota allows (may be fractional), or None if unlimited
+    """
+    limits = []
+    for directory in _cgroup_v2_dirs():
+        text = _read_text(directory / 'cpu.max')
+        if text:
+            quota, _, period = text.partition(' ')
+            if quota != 'max' and period:
+                limits.append(int(quota) / int(period))
+    quota = _read_text(CGROUP_ROOT / 'cpu' / 'cpu.cfs_quota_us')
+    period = _read_text(CGROUP_ROOT / 'cpu' / 'cpu.cfs_period_us')
+    if quota and period and int(quota) > 0:
+        limits.append(int(quota) / int(period))
+    return min(limits) if limits else None
+
+
+def cgroup_memory_limit() -> Optional[int]:
+    """
+    Get the memory limit of this process's cgroup.
+
+    Returns:
+        Limit in bytes, or None if unlimited
+    """
+    limits = []
+    for directory in _cgroup_v2_dirs():
+        text = _read_text(directory / 'memory.max')
+        if text and text != 'max':
+            limits.append(int(text))
+    text = _read_text(CGROUP_ROOT / 'memory' / 'memory.limit_in_bytes')
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    if text and int(text) < 1 << 60:
+        limits.append(int(text))
+    return min(limits) if limits else None
+
+
+def available_cpus() -> int:
+    """
+    Count the CPUs this process may use.
+
+    Returns:
+        CPUs allowed by both the affinity mask and the cgroup quota (at least 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def available_memory() -> Optional[int]:
+    """
+    Get the memory this process's workers may use.
+
+    Returns:
+        Cgroup memory limit, or physical memory without one; None if unknown
+    """
+    limit = cgroup_memory_limit()
+    if limit is not None:
+        return limit
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class WorkerAutotuner:
+    """
+    Choose how many workers may run at once.
+
+    The count never exceeds the available CPUs, and is lowered whenever the
+    largest recent per-job peak RSS times the worker count would exceed the
+    memory budget. Every change is reported to ``on_decision`` and, when a
+    log file is given, appended to it as a JSON line.
+    """
+
+    def __init__(
+        self,
+        cpus: Optional[int] = None,
+        memory: Optional[int] = None,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+        log_path: Optional[Path] = None,
+    ):
+        """
+        Initialize the autotuner and pick the starting worker count.
+
+        Args:
+            cpus: Maximum workers (default: CPUs allowed by affinity and cgroup)
+            memory: Memory limit in bytes (default: cgroup limit or physical memory)
+            on_decision: Called with each decision record
+            log_path: JSON-lines file to append decision records to
+        """
+        self.cpus = cpus or available_cpus()
+        self.memory = memory if memory is not None else available_memory()
+        self.on_decision = on_decision
+        self.log_path = log_path
+        self.samples: Deque[int] = deque(maxlen=SAMPLE_WINDOW)
+        if self.memory is None:
+            self.memory_budget = None
+        else:
+            # The parent process shares the limit with its workers
+            self.memory_budget = max(0, int(self.memory * MEMORY_HEADROOM) - (peak_rss() or 0))
+        self.workers = 0
+        self._decide(self._fit(INITIAL_JOB_RSS), 'initial estimate', INITIAL_JOB_RSS)
+
+    def _fit(self, job_rss: int) -> int:
+        """Get the worker count that fits the CPUs and memory budget."""
+        if self.memory_budget is None or job_rss <= 0:
+            return self.cpus
+        return max(1, min(self.cpus, self.memory_budget // job_rss))
+
+    def _decide(self, workers: int, reason: str, job_rss: int) -> None:
+        """Record a change of the worker count."""
+        if workers == self.workers:
+            return
+        record = {
+            'time': time.time(),
+            'workers_from': self.workers,
+            'workers_to': workers,
+            'reason': reason,
+            'cpus': self.cpus,
+            'memory_limit': self.memory,
+            'memory_budget': self.memory_budget,
+            'job_rss': job_rss,
+            'samples': len(self.samples),
+        }
+        self.workers = workers
+        if self.on_decision:
+            self.on_decision(record)
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError:
+                # The log is diagnostic; tuning goes on without it
+                pass
+
+    def record(self, job_rss: Optional[int]) -> int:
+        """
+        Take a finished job's peak RSS into account.
+
+        Args:
+            job_rss: Peak RSS of the job's worker process in bytes, if measured
+
+        Returns:
+            Worker count to use from now on
+        """
+        if job_rss:
+            self.samples.append(job_rss)
+        if len(self.samples) >= MIN_SAMPLES:
+            largest = max(self.samples)
+            workers = self._fit(largest)
+            if workers != self.workers:
+                direction = 'grow' if workers > self.workers else 'shrink'
+                self._decide(
+                    workers,
+                    f"{direction}: largest of last {len(self.samples)} jobs peaked at "
+                    f"{format_bytes(largest)}",
+                    largest,
+                )
+        return self.workers
+
+
+def describe_decision(record: Dict[str, Any]) -> str:
+    """
+    Format an autotuning decision for display.
+
+    Args:
+        record: Decision record passed to ``on_decision``
+
+    Returns:
+        One-line description
+    """
+    budget = record['memory_budget']
+    limits = f"{record['cpus']} CPUs, " + (
+        f"{format_bytes(budget)} memory budget" if budget is not None else "unknown memory"
+    )
+    return f"Workers {record['workers_from']} → {record['workers_to']} ({record['reason']}; {limits})"
@@ -0,0 +1,169 @@
+"""Single-file conversion jobs shared by the CLI and the batch runners."""
+
+import os
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from converters import EPUBConverter, PDFConverter, MOBIConverter, MarkdownToPDFConverter
+from converters.image_processing import DEFAULT_MAX_DIMENSION, DEFAULT_QUALITY
+from converters.memory import format_bytes
+from converters.sniffing import input_format, preflight
+
+
+class JobStatus(str, Enum):
+    """
+    Outcome of a conversion job.
+
+    ``UNCHANGED`` is a successful conversion whose outputs already had
+    the same content, so none were rewritten. Only ``CONVERTED`` and
+    ``UNCHANGED`` are truthy, so a status can be used wherever a success
+    flag was expected.
+    """
+
+    CONVERTED = 'converted'
+    UNCHANGED = 'unchanged'
+    FAILED = 'failed'
+    TIMEOUT = 'timeout'
+
+    def __bool__(self) -> bool:
+        return self in (JobStatus.CONVERTED, JobStatus.UNCHANGED)
+
+
+def get_converter(
+    file_path: Path,
+    converter_options: Optional[Dict[str, Any]] = None,
+    book_format: Optional[str] = None,
+):
+    """
+    Get the appropriate converter for a file.
+
+    The converter is chosen by the file's content (magic bytes), falling
+    back to its suffix, so a mislabeled file still reaches the right
+    converter. Only the chosen converter is constructed.
+
+    Args:
+        file_path: Path to the file to convert
+        converter_options: Format-specific converter settings ('pdf_engine',
+            'page_ranges', 'preview', 'checkpoint', 'low_memory', 'cache_dir',
+            'targets', 'profile', 'font_dirs', 'image_format', 'image_max_size',
+            'image_quality')
+        book_format: Format already detected by ``preflight`` (detected
+            from the file if None)
+
+    Returns:
+        Converter instance or None if format not supported
+    """
+    options = converter_options or {}
+    page_ranges = options.get('page_ranges')
+    preview = options.get('preview')
+    cache_dir = options.get('cache_dir')
+    image_options = {
+        'image_format': options.get('image_format'),
+        'image_max_dimension': options.get('image_max_size', DEFAULT_MAX_DIMENSION),
+        'image_quality': options.get('image_quality', DEFAULT_QUALITY),
+        'image_cache_dir': cache_dir / 'images' if cache_dir else None,
+    }
+    factories = {
+        'epub': lambda: EPUBConverter(page_ranges=page_ranges, preview=preview, **image_options),
+        'pdf': lambda: PDFConverter(
+            engine=options.get('pdf_engine', 'auto'),
+            page_ranges=page_ranges,
+            preview=preview,
+            checkpoint=options.get('checkpoint', True),
+            low_memory=options.get('low_memory', False),
+        ),
+        'mobi': lambda: MOBIConverter(page_ranges=page_ranges, preview=preview, **image_options),
+        'markdown': lambda: MarkdownToPDFConverter(
+            fragment_cache_dir=cache_dir / 'fragments' if cache_dir else None,
+            targets=options.get('targets'),
+            profile=options.get('profile', 'final'),
+            font_dirs=options.get('font_dirs'),
+            font_index_path=cache_dir / 'fonts.json' if cache_dir else None,
+        ),
+    }
+    factory = factories.get(book_format or input_format(file_path))
+    return factory() if factory else None
+
+
+def conversion_details(converter) -> str:
+    """
+    Describe measurements a converter took during its last conversion.
+
+    Args:
+        converter: Converter that just finished
+
+    Returns:
+        Suffix for the result message, e.g. `` (peak RSS 84.2 MB)``, or ''
+    """
+    peak = getattr(converter, 'peak_rss', None)
+    return f" (peak RSS {format_bytes(peak)})" if peak else ''
+
+
+def output_status(output_changes: Dict[Path, bool], output_dir: Path) -> Tuple[JobStatus, str]:
+    """
+    Summarize which of a conversion's outputs changed.
+
+    Args:
+        output_changes: Every file written, mapped to whether its content changed
+        output_dir: Directory the changed files are listed relative to
+
+    Returns:
+        Tuple of (``CONVERTED`` or ``UNCHANGED``, suffix for the result
+        message naming the changed files when only some of them changed)
+    """
+    changed = [path for path, is_changed in output_changes.items() if is_changed]
+    if output_changes and not changed:
+        return JobStatus.UNCHANGED, " (unchanged)"
+    if len(changed) == len(output_changes):
+        return JobStatus.CONVERTED, ''
+    names = ', '.join(os.path.relpath(path, output_dir) for path in changed)
+    return JobStatus.CONVERTED, f" (changed: {names}; {len(output_changes) - len(changed)} unchanged)"
+
+
+def convert_single_file(
+    input_path: Path,
+    output_dir: Path,
+    extract_images: bool = False,
+    clean_headers: bool = False,
+    converter_options: Optional[Dict[str, Any]] = None,
+    book_format: Optional[str] = None,
+) -> tuple[Path, JobStatus, str]:
+    """
+    Convert a single file to Markdown.
+
+    Args:
+        input_path: Path to the input file
+        output_dir: Directory for output files
+        extract_images: Whether to extract images
+        clean_headers: Whether to clean headers
+        converter_options: Format-specific converter settings
+        book_format: Format from an earlier ``preflight`` of the file; the
+            file is preflighted here if None
+
+    Returns:
+        Tuple of (input_path, status, message); the status is ``UNCHANGED``
+        when every output already had the same content
+    """
+    try:
+        if book_format is None:
+            # Rejects empty, truncated and unsupported files before any parsing starts
+            book_format = preflight(input_path)
+        converter = get_converter(input_path, converter_options, book_format)
+        if not converter:
+            return (input_path, JobStatus.FAILED, f"Unsupported format: {input_path.suffix}")
+        
+        output_path = converter.convert(
+            input_path,
+            output_dir,
+            extract_images=extract_images,
+            clean_headers=clean_headers,
+        )
+        status, changes = output_status(converter.output_changes, output_dir)
+        message = f"Converted to {output_path}{changes}{conversion_details(converter)}"
+        return (input_path, status, message)
+    except MemoryError as e:
+        # Raised when a worker's memory limit is hit; usually has no message
+        return (input_path, JobStatus.FAILED, f"Error: {str(e) or 'Out of memory'}")
+    except Exception as e:
+        return (input_path, JobStatus.FAILED, f"Error: {str(e)}")
@@ -0,0 +1,412 @@
+"""asyncio batch pipeline that overlaps file I/O and subprocesses with conversion.
+
+Each input flows through bounded stages:
+
+1. discovery: directories are expanded to supported files, and each file
+   is identified by its content and rejected early if obviously broken
+2. prefetch: the input is read ahead so conversion does not wait on cold storage
+3. unpack: MOBI/AZW files go through ``ebook-convert`` as async subprocesses
+4. convert: the CPU-bound conversion runs in a supervised process pool,
+   writing to a local staging directory; Markdown rendering has its own
+   smaller, optionally memory-capped pool; jobs over their time budget are
+   killed and reported as timeouts
+5. write-behind: staged outputs are moved into the output directory, or
+   added to a bundle by a single writer
+6. index (optional): each Markdown document is fed into a full-text
+   search index by the same single writer
+
+Every stage has its own concurrency limit, so slow disks, Calibre and the
+CPU-bound parsing all make progress at the same time.
+"""
+
+import asyncio
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from converters.mobi_converter import ebook_convert_input
+from converters.output_files import file_digest, matches_file
+from converters.sniffing import FORMAT_SUFFIXES, preflight
+from outputs.bundle import BundleWriter
+from outputs.search_index import SearchIndex
+
+from .autotune import WorkerAutotuner
+from .jobs import JobStatus, conversion_details, get_converter, output_status
+from .routing import default_render_workers
+from .supervisor import JobTimeoutError, WorkerPool, job_timeout
+
+SUPPORTED_SUFFIXES = set().union(*FORMAT_SUFFIXES.values())
+
+DEFAULT_READ_CONCURRENCY = 8
+DEFAULT_SUBPROCESS_CONCURRENCY = 2
+DEFAULT_WRITE_CONCURRENCY = 8
+
+# Prefetch reads at most this much of each input into the page cache
+PREFETCH_CHUNK_SIZE = 1 << 20
+PREFETCH_MAX_BYTES = 256 << 20
+
+ConversionResult = Tuple[Path, JobStatus, str]
+
+
+def discover_inputs(paths: Iterable[Path]) -> List[Path]:
+    """
+    Expand files and directories into the list of files to convert.
+
+    Args:
+        paths: Files or directories; directories are searched recursively
+
+    Returns:
+        Input files in the given order, directory contents sorted
+    """
+    found = []
+    seen = set()
+    for path in paths:
+        if path.is_dir():
+            candidates = sorted(
+                Path(root) / name
+                for root, _dirs, files in os.walk(path)
+                for name in files
+                if Path(name).suffix.lower() in SUPPORTED_SUFFIXES
+            )
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            if candidate not in seen:
+                seen.add(candidate)
+                found.append(candidate)
+    return found
+
+
+def prefetch(path: Path) -> None:
+    """
+    Read a file ahead of conversion so its pages are in the OS cache.
+
+    Args:
+        path: File to read
+    """
+    remaining = PREFETCH_MAX_BYTES
+    with open(path, 'rb') as f:
+        while remaining > 0 and f.read(min(PREFETCH_CHUNK_SIZE, remaining)):
+            remaining -= PREFETCH_CHUNK_SIZE
+
+
+async def unpack_mobi(input_path: Path, work_dir: Path) -> Path:
+    """
+    Convert a MOBI/AZW file to EPUB with an async ``ebook-convert`` subprocess.
+
+    Args:
+        input_path: Path to the MOBI file
+        work_dir: Directory for the intermediate EPUB
+
+    Returns:
+        Path to the EPUB file, named after the input
+
+    Raises:
+        RuntimeError: If ebook-convert is missing or fails
+    """
+    epub_path = work_dir / f"{input_path.stem}.epub"
+    try:
+        process = await asyncio.create_subprocess_exec(
+            'ebook-convert', str(ebook_convert_input(input_path, work_dir)), str(epub_path),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise RuntimeError(
+            "ebook-convert not found. Please install Calibre "
+            "(https://calibre-ebook.com/)"
+        )
+
+    try:
+        _, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(f"Failed to convert MOBI to EPUB: {stderr.decode(errors='replace')}")
+    return epub_path
+
+
+def convert_to_staging(
+    input_path: Path,
+    staging_dir: Path,
+    extract_images: bool,
+    clean_headers: bool,
+    converter_options: Optional[Dict[str, Any]],
+    book_format: Optional[str] = None,
+    keep_markdown: bool = False,
+) -> Tuple[Path, str, Optional[str]]:
+    """
+    Run one conversion in a worker process, writing into a staging directory.
+
+    Args:
+        input_path: Path to the input file
+        staging_dir: Directory the converter writes to
+        extract_images: Whether to extract images
+        clean_headers: Whether to clean headers
+        converter_options: Format-specific converter settings
+        book_format: Format from the preflight of the input
+        keep_markdown: Also return the Markdown the converter produced (or
+            rendered, for Markdown inputs), for the search index
+
+    Returns:
+        Tuple of (primary output path relative to the staging directory,
+        measurement details for the result message, the Markdown or None)
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    converter = get_converter(input_path, converter_options, book_format)
+    if not converter:
+        raise ValueError(f"Unsupported format: {input_path.suffix}")
+    output_path = converter.convert(
+        input_path,
+        staging_dir,
+        extract_images=extract_images,
+        clean_headers=clean_headers,
+    )
+    markdown = None
+    if keep_markdown:
+        markdown = converter.markdown
+        if markdown is None:
+            # Low-memory PDF conversions do not keep their text; the staged copy is local
+            markdown = output_path.read_text(encoding='utf-8', errors='replace')
+    return output_path.relative_to(staging_dir), conversion_details(converter), markdown
+
+
+def publish_outputs(staging_dir: Path, output_dir: Path) -> Dict[Path, bool]:
+    """
+    Move staged outputs whose content changed into the output directory.
+
+    Outputs identical to the file already in place are skipped, so its
+    mtime is kept. Changed files are renamed into place when both
+    directories share a filesystem and copied to a temporary name then
+    renamed otherwise, so readers never see a partial output.
+
+    Args:
+        staging_dir: Directory holding a finished conversion's files
+        output_dir: Final output directory
+
+    Returns:
+        Each published path, mapped to whether its content changed
+    """
+    changes = {}
+    for root, _dirs, files in os.walk(staging_dir):
+        target_dir = output_dir / Path(root).relative_to(staging_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            if name.endswith('.checkpoint'):
+                continue
+            source = Path(root) / name
+            target = target_dir / name
+            changes[target] = not matches_file(
+                target, source.stat().st_size, file_digest(source)
+            )
+            if not changes[target]:
+                continue
+            try:
+                os.replace(source, target)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                temp_path = target_dir / f".{name}.{os.getpid()}.tmp"
+                try:
+                    shutil.copyfile(source, temp_path)
+                    os.replace(temp_path, target)
+                except BaseException:
+                    temp_path.unlink(missing_ok=True)
+                    raise
+    return changes
+
+
+def resume_staging_dir(cache_dir: Path, target: Path) -> Path:
+    """
+    Get a persistent staging directory for the conversions into one output.
+
+    Passed as ``staging_dir``, it keeps staged PDF checkpoints across runs,
+    so rerunning an interrupted batch resumes them. Every output directory
+    or bundle gets its own, so batches into different outputs do not mix.
+
+    Args:
+        cache_dir: On-disk cache directory
+        target: Output directory or bundle file of the batch
+
+    Returns:
+        Staging directory under ``cache_dir``
+    """
+    digest = hashlib.sha1(str(target.resolve()).encode('utf-8')).hexdigest()[:16]
+    return cache_dir / 'staging' / digest
+
+
+def _staging_name(input_path: Path) -> str:
+    """Get a stable per-input staging directory name."""
+    digest = hashlib.sha1(str(input_path.resolve()).encode('utf-8')).hexdigest()[:16]
+    return f"{input_path.stem}-{digest}"
+
+
+async def convert_async(
+    input_paths: Iterable[Path],
+    output_dir: Path,
+    extract_images: bool = False,
+    clean_headers: bool = False,
+    converter_options: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    read_concurrency: int = DEFAULT_READ_CONCURRENCY,
+    subprocess_concurrency: int = DEFAULT_SUBPROCESS_CONCURRENCY,
+    write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+    staging_dir: Optional[Path] = None,
+    on_result: Optional[Callable[[Path, JobStatus, str], None]] = None,
+    bundle: Optional[BundleWriter] = None,
+    search_index: Optional[SearchIndex] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    autotuner: Optional[WorkerAutotuner] = None,
+    render_workers: Optional[int] = None,
+    render_memory_limit: Optional[int] = None,
+    formats: Optional[Dict[Path, str]] = None,
+) -> List[ConversionResult]:
+    """
+    Convert files through the asyncio pipeline.
+
+    Args:
+        input_paths: Files or directories to convert
+        output_dir: Directory for output files
+        extract_images: Whether to extract images
+        clean_headers: Whether to clean headers
+        converter_options: Format-specific converter settings
+        workers: Conversion processes (default: CPU count)
+        read_concurrency: Inputs prefetched at the same time
+        subprocess_concurrency: ``ebook-convert`` processes at the same time
+        write_concurrency: Outputs published at the same time
+        staging_dir: Local directory for in-progress outputs (default: a
+            temporary directory). Staged PDF checkpoints survive there, so
+            pass a persistent directory to resume interrupted batches.
+        on_result: Called with (input_path, status, message) as each file finishes
+        bundle: Bundle to add outputs to instead of the output directory;
+            books are added one at a time by this process
+        search_index: Full-text index to feed each Markdown document into
+            (the converted output, or the input for Markdown sources);
+            unchanged documents are skipped by content hash
+        timeouts: Seconds each job may spend unpacking and converting, by
+            input format ('epub', 'pdf', 'mobi', 'markdown') with 'default'
+            for the rest; stuck workers and subprocesses are killed
+        autotuner: Sizes the conversion pool from CPU/memory limits and
+            measured job memory instead of ``workers``
+        render_workers: Processes rendering Markdown inputs, separate from
+            the conversion pool (default: half of workers)
+        render_memory_limit: Address-space limit of each rendering process
+            in bytes; a render that exceeds it fails instead of exhausting memory
+        formats: Formats of inputs the caller already preflighted; other
+            inputs are preflighted here
+
+    Returns:
+        List of (input_path, status, message) tuples in input order; the
+        status is only truthy for converted files
+    """
+    loop = asyncio.get_running_loop()
+    if autotuner:
+        workers = autotuner.cpus
+    workers = workers or os.cpu_count() or 1
+    files = await asyncio.to_thread(discover_inputs, list(input_paths))
+    if bundle is None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Only a few files beyond what the workers are converting are in flight
+    in_flight = asyncio.Semaphore(workers + read_concurrency)
+    read_slots = asyncio.Semaphore(read_concurrency)
+    subprocess_slots = asyncio.Semaphore(subprocess_concurrency)
+    write_slots = asyncio.Semaphore(write_concurrency)
+    # Bundle and index writes are serialized in this process
+    writer_lock = asyncio.Lock()
+
+    async def run(input_path: Path, staging_root: Path, pool: WorkerPool, render_pool: WorkerPool):
+        book_format = formats.get(input_path) if formats else None
+        if book_format is None:
+            try:
+                # Broken and unsupported files fail here, before taking any slot
+                book_format = await asyncio.to_thread(preflight, input_path)
+            except Exception as e:
+                result = (input_path, JobStatus.FAILED, f"Error: {e}")
+                if on_result:
+                    on_result(*result)
+                return result
+        timeout = job_timeout(input_path, timeouts, book_format)
+        async with in_flight:
+            staging = staging_root / _staging_name(input_path)
+            output_staging = staging / 'output'
+            try:
+                await asyncio.to_thread(output_staging.mkdir, parents=True, exist_ok=True)
+                async with read_slots:
+                    await asyncio.to_thread(prefetch, input_path)
+
+                deadline = loop.time() + timeout if timeout else None
+                source, source_format = input_path, book_format
+                if book_format == 'mobi':
+                    async with subprocess_slots:
+                        try:
+                            source = await asyncio.wait_for(
+                                unpack_mobi(input_path, staging), timeout
+                            )
+                        except asyncio.TimeoutError:
+                            raise JobTimeoutError(timeout)
+                    source_format = 'epub'
+
+                is_markdown = book_format == 'markdown'
+                # The index gets the text the worker already has in memory
+                relative_output, details, markdown = await asyncio.wrap_future(
+                    (render_pool if is_markdown else pool).submit(
+                        convert_to_staging, source, output_staging,
+                        extract_images, clean_headers, converter_options,
+                        source_format, search_index is not None,
+                        timeout=max(0.0, deadline - loop.time()) if deadline else None,
+                    )
+                )
+
+                if bundle is not None:
+                    async with writer_lock:
+                        book = await asyncio.to_thread(
+                            bundle.add_book, input_path.stem, output_staging, relative_output
+                        )
+                    output_key = f"{book}/{relative_output.as_posix()}"
+                    status = JobStatus.CONVERTED
+                    message = f"Added to {bundle.path} as {output_key}"
+                else:
+                    async with write_slots:
+                        changes = await asyncio.to_thread(
+                            publish_outputs, output_staging, output_dir
+                        )
+                    book = input_path.stem
+                    output_key = str(output_dir / relative_output)
+                    status, change_details = output_status(changes, output_dir)
+                    message = f"Converted to {output_key}{change_details}"
+
+                message += details
+                if search_index is not None:
+                    async with writer_lock:
+                        indexed = await asyncio.to_thread(
+                            search_index.index_document, output_key, book, markdown
+                        )
+                    message += " (indexed)" if indexed else " (index unchanged)"
+                await asyncio.to_thread(shutil.rmtree, staging, True)
+                result = (input_path, status, message)
+            except JobTimeoutError:
+                result = (input_path, JobStatus.TIMEOUT, str(JobTimeoutError(timeout)))
+            except Exception as e:
+                result = (input_path, JobStatus.FAILED, f"Error: {e}")
+
+        if on_result:
+            on_result(*result)
+        return result
+
+    with tempfile.TemporaryDirectory(prefix='convert-staging-') as temp_dir:
+        staging_root = staging_dir or Path(temp_dir)
+        with WorkerPool(workers, autotuner=autotuner) as pool, WorkerPool(
+            render_workers or default_render_workers(workers), memory_limit=render_memory_limit
+        ) as render_pool:
+            return list(await asyncio.gather(
+                *(run(path, staging_root, pool, render_pool) for path in files)
+            ))
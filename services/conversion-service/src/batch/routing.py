@@ -0,0 +1,286 @@
+"""Format-aware routing of conversion jobs to separate executors.
+
+Formats stress different resources. A MOBI job mostly waits on
+``ebook-convert``; EPUB and PDF parsing is CPU-bound; Markdown→PDF rendering
+with WeasyPrint is CPU-bound and memory-hungry. Giving every job a whole
+worker from one pool lets waiting MOBI jobs hold CPU slots and large
+renders crowd out light parses. ``FormatRouter`` gives each kind of work its
+own executor and concurrency limit, so a mixed batch keeps the CPUs, the
+subprocess slots and the memory budget busy at the same time.
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from converters.mobi_converter import ebook_convert_input
+from converters.sniffing import input_format
+
+from .autotune import WorkerAutotuner
+from .jobs import convert_single_file
+from .supervisor import JobTimeoutError, WorkerPool
+
+# ebook-convert processes run at once
+DEFAULT_SUBPROCESS_WORKERS = 2
+
+
+def default_render_workers(workers: int) -> int:
+    """
+    Get the default size of the Markdown rendering pool.
+
+    Args:
+        workers: Size of the parsing pool
+
+    Returns:
+        Half the parsing pool, at least 1
+    """
+    return max(1, workers // 2)
+
+
+def job_kind(input_path: Path, book_format: Optional[str] = None) -> str:
+    """
+    Classify a job by the resource it mostly uses.
+
+    Args:
+        input_path: Input file of the job
+        book_format: Format already detected by ``preflight`` (detected
+            from the file if None)
+
+    Returns:
+        'subprocess' for MOBI/AZW, 'render' for Markdown, 'parse' otherwise,
+        judged by content like the converter choice
+    """
+    book_format = book_format or input_format(input_path)
+    if book_format == 'mobi':
+        return 'subprocess'
+    if book_format == 'markdown':
+        return 'render'
+    return 'parse'
+
+
+class FormatRouter:
+    """
+    Run conversion jobs on executors chosen by input format.
+
+    - EPUB and PDF jobs run in a process pool of ``workers`` processes.
+    - Markdown jobs render in a separate, smaller process pool whose
+      workers can be given an address-space limit.
+    - MOBI jobs unpack with ``ebook-convert`` on a thread pool, since the
+      thread only waits on the subprocess. The unpacked EPUB then converts
+      in the parsing pool.
+
+    Every job's time budget covers all of its steps. Jobs are submitted
+    like with ``WorkerPool`` and their futures resolve to
+    ``(input_path, status, message)``. Leaving the ``with`` block because
+    of an exception kills running workers and ``ebook-convert`` processes
+    and cancels pending jobs.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        render_workers: Optional[int] = None,
+        subprocess_workers: int = DEFAULT_SUBPROCESS_WORKERS,
+        render_memory_limit: Optional[int] = None,
+        autotuner: Optional[WorkerAutotuner] = None,
+    ):
+        """
+        Initialize the executors; processes are started as jobs arrive.
+
+        Args:
+            workers: Parsing processes (ignored with an autotuner)
+            render_workers: Markdown rendering processes (default: half of workers)
+            subprocess_workers: ebook-convert processes run at once
+            render_memory_limit: Address-space limit of each rendering process in bytes
+            autotuner: Sizes the parsing pool from measured job memory
+        """
+        self.parse_pool = WorkerPool(workers, autotuner=autotuner)
+        self.render_pool = WorkerPool(
+            render_workers or default_render_workers(workers), memory_limit=render_memory_limit
+        )
+        self.subprocess_pool = ThreadPoolExecutor(
+            subprocess_workers, thread_name_prefix='ebook-convert'
+        )
+        self._processes: Set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._cancelling = False
+
+    def __enter__(self) -> 'FormatRouter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(cancel=exc_type is not None)
+
+    def submit(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        extract_images: bool = False,
+        clean_headers: bool = False,
+        converter_options: Optional[Dict[str, Any]] = None,
+        book_format: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """
+        Schedule the conversion of one file.
+
+        Args:
+            input_path: Path to the input file
+            output_dir: Directory for output files
+            extract_images: Whether to extract images
+            clean_headers: Whether to clean headers
+            converter_options: Format-specific converter settings
+            book_format: Format from an earlier ``preflight`` of the file,
+                passed on so the worker does not check the file again
+            timeout: Seconds the job may run once started (None for no limit)
+
+        Returns:
+            Future for the job's (input_path, status, message) result
+        """
+        args = (output_dir, extract_images, clean_headers, converter_options)
+        kind = job_kind(input_path, book_format)
+        if kind == 'parse':
+            return self.parse_pool.submit(
+                convert_single_file, input_path, *args, book_format, timeout=timeout
+            )
+        if kind == 'render':
+            return self.render_pool.submit(
+                convert_single_file, input_path, *args, book_format, timeout=timeout
+            )
+
+        result: Future = Future()
+        unpacked = self.subprocess_pool.submit(self._unpack, input_path, timeout)
+        unpacked.add_done_callback(
+            lambda future: self._convert_unpacked(input_path, args, timeout, future, result)
+        )
+        return result
+
+    def shutdown(self, cancel: bool = False) -> None:
+        """
+        Stop every executor.
+
+        Args:
+            cancel: Cancel pending jobs and kill running ones instead of
+                waiting for them to finish
+        """
+        if cancel:
+            with self._lock:
+                self._cancelling = True
+                for process in self._processes:
+                    _kill_group(process)
+        # Unpacked MOBI files are handed to the parsing pool, so it closes last
+        self.subprocess_pool.shutdown(wait=True, cancel_futures=cancel)
+        self.render_pool.shutdown(cancel=cancel)
+        self.parse_pool.shutdown(cancel=cancel)
+
+    def _unpack(self, input_path: Path, timeout: Optional[float]) -> tuple:
+        """
+        Convert a MOBI file to EPUB in a temporary directory.
+
+        Returns:
+            Tuple of (EPUB path, temporary directory, deadline or None)
+
+        Raises:
+            JobTimeoutError: If ebook-convert runs past the time budget
+            RuntimeError: If ebook-convert is missing or fails
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        work_dir = Path(tempfile.mkdtemp(prefix='convert-mobi-'))
+        epub_path = work_dir / f"{input_path.stem}.epub"
+        try:
+            with self._lock:
+                if self._cancelling:
+                    raise CancelledError()
+                try:
+                    process = subprocess.Popen(
+                        ['ebook-convert', str(ebook_convert_input(input_path, work_dir)),
+                         str(epub_path)],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        start_new_session=True,
+                    )
+                except FileNotFoundError:
+                    raise RuntimeError(
+                        "ebook-convert not found. Please install Calibre "
+                        "(https://calibre-ebook.com/)"
+                    )
+                self._processes.add(process)
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill_group(process)
+                process.communicate()
+                raise JobTimeoutError(timeout)
+            finally:
+                with self._lock:
+                    self._processes.discard(process)
+            if process.returncode != 0:
+                if self._cancelling:
+                    raise CancelledError()
+                raise RuntimeError(f"Failed to convert MOBI to EPUB: {stderr}")
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        return epub_path, work_dir, deadline
+
+    def _convert_unpacked(
+        self,
+        input_path: Path,
+        args: tuple,
+        timeout: Optional[float],
+        unpacked: Future,
+        result: Future,
+    ) -> None:
+        """Convert an unpacked MOBI file in the parsing pool and resolve its result."""
+        if unpacked.cancelled():
+            result.cancel()
+            return
+        error = unpacked.exception()
+        if error is not None:
+            result.set_exception(error)
+            return
+        epub_path, work_dir, deadline = unpacked.result()
+        remaining = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+        def finish(converted: Future) -> None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            if converted.cancelled():
+                result.cancel()
+            elif converted.exception() is not None:
+                error = converted.exception()
+                result.set_exception(JobTimeoutError(timeout) if isinstance(error, JobTimeoutError) else error)
+            else:
+                # Report the MOBI file rather than the intermediate EPUB
+                _, status, message = converted.result()
+                result.set_result((input_path, status, message))
+
+        try:
+            converted = self.parse_pool.submit(
+                convert_single_file, epub_path, *args, 'epub', timeout=remaining
+            )
+        except RuntimeError:
+            # The batch is being cancelled
+            shutil.rmtree(work_dir, ignore_errors=True)
+            result.cancel()
+            return
+        converted.add_done_callback(finish)
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Kill a subprocess started in its own session, with its children."""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except OSError:
+        # Already exited
+        pass
@@ -0,0 +1,410 @@
+"""Worker processes with per-job time budgets.
+
+``ProcessPoolExecutor`` cannot stop a running job: one PDF that sends
+pdfminer into a layout loop, a render that never finishes or a hung
+``ebook-convert`` holds its worker forever, and shutting the pool down
+waits for it. ``WorkerPool`` runs each worker in its own process group,
+kills the whole group (including subprocesses such as ``ebook-convert``)
+when a job exceeds its budget or the batch is cancelled, and starts a
+replacement worker. Workers can also be given an address-space limit, so
+a runaway render fails its own job instead of exhausting the host.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from functools import partial
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from converters.memory import format_bytes, peak_rss, reset_peak_rss
+from converters.sniffing import FORMAT_SUFFIXES, input_format
+
+from .autotune import WorkerAutotuner
+from .jobs import JobStatus
+
+# Seconds to wait for a worker to exit after being told to stop
+STOP_GRACE_SECONDS = 5.0
+
+# Replacement workers are started from the supervisor thread, where forking
+# the whole parent is unsafe; a fork server or fresh interpreter is not
+_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+class JobTimeoutError(Exception):
+    """Raised for a job whose worker was killed after exceeding its time budget."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Timed out after {timeout:g}s; worker process was killed")
+        self.timeout = timeout
+
+
+class WorkerCrashedError(Exception):
+    """Raised for a job whose worker process died without returning a result."""
+
+    def __init__(self, exitcode: Optional[int]):
+        super().__init__(f"Worker process died (exit code {exitcode})")
+        self.exitcode = exitcode
+
+
+def parse_timeout(spec: str) -> Tuple[str, float]:
+    """
+    Parse a time budget given on the command line.
+
+    Args:
+        spec: ``SECONDS`` for every job, or ``FORMAT=SECONDS`` for one input
+            format (epub, pdf, mobi or markdown)
+
+    Returns:
+        Tuple of (format or 'default', seconds)
+
+    Raises:
+        ValueError: If the format is unknown or the seconds are not positive
+    """
+    name, separator, value = spec.rpartition('=')
+    name = name.strip().lower() if separator else 'default'
+    if name != 'default' and name not in FORMAT_SUFFIXES:
+        raise ValueError(
+            f"Unknown format '{name}' in timeout (choose from {', '.join(FORMAT_SUFFIXES)})"
+        )
+    seconds = float(value)
+    if seconds <= 0:
+        raise ValueError(f"Timeout must be positive: {spec}")
+    return name, seconds
+
+
+def job_timeout(
+    input_path: Path,
+    timeouts: Optional[Dict[str, float]],
+    book_format: Optional[str] = None,
+) -> Optional[float]:
+    """
+    Get the time budget of one job.
+
+    The job's format is taken from the file's content, falling back to
+    its suffix, the same way the converter is chosen.
+
+    Args:
+        input_path: Input file of the job
+        timeouts: Seconds per format, with 'default' for formats not listed
+        book_format: Format already detected by ``preflight`` (detected
+            from the file if None)
+
+    Returns:
+        Seconds, or None for no limit
+    """
+    if not timeouts:
+        return None
+    return timeouts.get(book_format or input_format(input_path), timeouts.get('default'))
+
+
+def job_result(input_path: Path, future: Future) -> Tuple[Path, JobStatus, str]:
+    """
+    Get the result of a ``convert_single_file`` job run by a WorkerPool.
+
+    Args:
+        input_path: Input file of the job
+        future: Finished future returned by ``WorkerPool.submit``
+
+    Returns:
+        Tuple of (input_path, status, message)
+    """
+    try:
+        return future.result()
+    except JobTimeoutError as e:
+        return (input_path, JobStatus.TIMEOUT, str(e))
+    except Exception as e:
+        return (input_path, JobStatus.FAILED, f"Error: {e}")
+
+
+def _worker_main(conn: Connection, memory_limit: Optional[int] = None) -> None:
+    """Run jobs received over a pipe until told to stop."""
+    if hasattr(os, 'setsid'):
+        # Own process group, so a kill also reaches this worker's subprocesses
+        os.setsid()
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    # Ctrl-C is handled by the parent, which kills workers it no longer needs
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        reset_peak_rss()
+        try:
+            result = (True, fn(*args))
+        except MemoryError:
+            result = (False, MemoryError(
+                f"Exceeded the worker memory limit of {format_bytes(memory_limit)}"
+                if memory_limit else "Out of memory"
+            ))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send((*result, peak_rss()))
+        except Exception as e:
+            # The result or exception could not be pickled
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}"), peak_rss()))
+
+
+def _settle(settle: List[Callable[[], None]]) -> None:
+    """Complete futures collected while the pool lock was held."""
+    for complete in settle:
+        complete()
+
+
+class _Worker:
+    """A worker process and the job it is running."""
+
+    def __init__(self, memory_limit: Optional[int] = None):
+        self.conn, child_conn = _CONTEXT.Pipe()
+        self.process = _CONTEXT.Process(
+            target=_worker_main, args=(child_conn, memory_limit), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.future: Optional[Future] = None
+        self.timeout: Optional[float] = None
+        self.deadline: Optional[float] = None
+
+    def assign(self, future: Future, fn: Callable, args: tuple, timeout: Optional[float]) -> None:
+        self.conn.send((fn, args))
+        self.future = future
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def finish(self) -> Future:
+        future = self.future
+        self.future = self.timeout = self.deadline = None
+        return future
+
+    def kill(self) -> None:
+        if hasattr(os, 'killpg') and self.process.is_alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                # The worker has not made its process group yet
+                pass
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(STOP_GRACE_SECONDS)
+        self.kill()
+
+
+class WorkerPool:
+    """
+    Process pool that enforces per-job time budgets and replaces stuck workers.
+
+    Jobs are submitted like with an executor and return
+    ``concurrent.futures.Future`` objects. A job that exceeds its timeout
+    fails with ``JobTimeoutError``; one whose worker dies fails with
+    ``WorkerCrashedError``. Either way the worker's process group is killed and
+    a new worker takes its place. Leaving the ``with`` block because of an
+    exception (including Ctrl-C) kills all workers and cancels pending jobs
+    instead of waiting for running ones.
+
+    With an autotuner, each worker reports the peak RSS of every job and
+    the number of jobs running at once follows the autotuner's decisions;
+    shrinking lets running jobs finish and retires idle workers.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        autotuner: Optional[WorkerAutotuner] = None,
+        memory_limit: Optional[int] = None,
+    ):
+        """
+        Initialize the pool; workers are started as jobs arrive.
+
+        Args:
+            workers: Maximum number of worker processes (ignored with an autotuner)
+            autotuner: Adjusts the worker count from measured job memory
+            memory_limit: Address-space limit of each worker in bytes; a job
+                that exceeds it fails with ``MemoryError`` (Unix only)
+        """
+        self.autotuner = autotuner
+        self.memory_limit = memory_limit
+        self.max_workers = max(1, autotuner.workers if autotuner else workers)
+        self._workers: List[_Worker] = []
+        self._pending: Deque[Tuple[Future, Callable, tuple, Optional[float]]] = deque()
+        self._lock = threading.Lock()
+        self._wakeup_reader, self._wakeup_writer = _CONTEXT.Pipe(duplex=False)
+        self._closing = False
+        self._cancelling = False
+        self._thread = threading.Thread(target=self._supervise, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(cancel=exc_type is not None)
+
+    def submit(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Future:
+        """
+        Schedule a job.
+
+        Args:
+            fn: Picklable function to run in a worker process
+            *args: Picklable arguments for fn
+            timeout: Seconds the job may run once started (None for no limit)
+
+        Returns:
+            Future for the job's return value
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("Cannot submit to a pool that is shutting down")
+            self._pending.append((future, fn, args, timeout))
+        self._wake()
+        return future
+
+    def shutdown(self, cancel: bool = False) -> None:
+        """
+        Stop the pool.
+
+        Args:
+            cancel: Cancel pending jobs and kill running ones instead of
+                waiting for them to finish
+        """
+        with self._lock:
+            self._closing = True
+            self._cancelling = self._cancelling or cancel
+        self._wake()
+        self._thread.join()
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+    def _wake(self) -> None:
+        """Interrupt the supervisor's wait."""
+        try:
+            self._wakeup_writer.send_bytes(b'')
+        except OSError:
+            pass
+
+    def _assign_pending(self) -> None:
+        """Hand pending jobs to idle workers, starting workers as needed."""
+        idle = [worker for worker in self._workers if worker.future is None]
+        while idle and len(self._workers) > self.max_workers:
+            # The worker count was lowered; retire idle workers first
+            worker = idle.pop()
+            worker.stop()
+            self._workers.remove(worker)
+
+        while self._pending and len(self._workers) - len(idle) < self.max_workers:
+            if idle:
+                worker = idle.pop()
+            else:
+                worker = _Worker(self.memory_limit)
+                self._workers.append(worker)
+            future, fn, args, timeout = self._pending.popleft()
+            if future.set_running_or_notify_cancel():
+                worker.assign(future, fn, args, timeout)
+
+    def _replace(self, worker: _Worker) -> None:
+        """Kill a worker; a new one is started when a job needs it."""
+        worker.kill()
+        self._workers.remove(worker)
+
+    def _cancel_all(self, settle: List[Callable[[], None]]) -> None:
+        """
+        Cancel pending jobs and kill the workers running jobs.
+
+        Args:
+            settle: Receives the calls that complete the jobs' futures
+        """
+        while self._pending:
+            settle.append(self._pending.popleft()[0].cancel)
+        for worker in [worker for worker in self._workers if worker.future is not None]:
+            self._replace(worker)
+            settle.append(partial(worker.finish().set_exception, CancelledError()))
+
+    def _supervise(self) -> None:
+        """Assign jobs, collect results and enforce deadlines until shut down."""
+        while True:
+            # Futures are completed after the lock is released: their done
+            # callbacks may submit follow-up jobs, which takes the lock again
+            settle: List[Callable[[], None]] = []
+            with self._lock:
+                if self._cancelling:
+                    self._cancel_all(settle)
+                self._assign_pending()
+                busy = [worker for worker in self._workers if worker.future is not None]
+                done = self._closing and not busy and not self._pending
+            _settle(settle)
+            if done:
+                return
+            deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+            wait_seconds = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            handles = [self._wakeup_reader]
+            for worker in busy:
+                handles += [worker.conn, worker.process.sentinel]
+            ready = wait(handles, wait_seconds)
+
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+
+            with self._lock:
+                if self._cancelling:
+                    continue
+                now = time.monotonic()
+                for worker in busy:
+                    if worker.conn in ready:
+                        try:
+                            succeeded, value, job_rss = worker.conn.recv()
+                        except (EOFError, OSError):
+                            # The worker died; its pipe closed along with it
+                            self._replace(worker)
+                            settle.append(partial(
+                                worker.finish().set_exception,
+                                WorkerCrashedError(worker.process.exitcode),
+                            ))
+                            continue
+                        if self.autotuner:
+                            self.max_workers = self.autotuner.record(job_rss)
+                        future = worker.finish()
+                        settle.append(partial(
+                            future.set_result if succeeded else future.set_exception, value
+                        ))
+                    elif worker.process.sentinel in ready:
+                        self._replace(worker)
+                        settle.append(partial(
+                            worker.finish().set_exception,
+                            WorkerCrashedError(worker.process.exitcode),
+                        ))
+                    elif worker.deadline is not None and now >= worker.deadline:
+                        timeout = worker.timeout
+                        self._replace(worker)
+                        settle.append(partial(
+                            worker.finish().set_exception, JobTimeoutError(timeout)
+                        ))
+            _settle(settle)
@@ -0,0 +1,515 @@
+"""Shared work queue for batch conversion across processes and hosts.
+
+One ``convert enqueue`` records jobs; any number of ``convert worker``
+processes, on any host that sees the same paths, lease jobs, keep their
+leases alive with heartbeats and write results back. A lease that is not
+renewed expires and the job is handed to another worker, up to the job's
+attempt limit.
+
+Backends implement ``JobQueue``; SQLite is the built-in one and is
+selected with a plain path or a ``sqlite:///path`` URL.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from converters.sniffing import preflight
+
+from .jobs import JobStatus, convert_single_file
+from .supervisor import WorkerPool, job_result, job_timeout
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL_SECONDS = 5.0
+
+JOB_STATUSES = ['pending', 'leased', 'done', 'failed', 'timeout']
+
+
+def queue_status(status: JobStatus) -> str:
+    """
+    Map a job result to the status stored in a queue.
+
+    Args:
+        status: Result status (or a plain success flag)
+
+    Returns:
+        'done', 'failed' or 'timeout'
+    """
+    if status == JobStatus.TIMEOUT:
+        return 'timeout'
+    return 'done' if status else 'failed'
+
+
+class Job(NamedTuple):
+    """A leased conversion job."""
+
+    id: int
+    input_path: Path
+    output_dir: Path
+    extract_images: bool
+    clean_headers: bool
+    converter_options: Dict[str, Any]
+    attempts: int
+
+
+def encode_options(converter_options: Optional[Dict[str, Any]]) -> str:
+    """
+    Serialize converter settings for storage in a queue.
+
+    Args:
+        converter_options: Converter settings (may contain paths and page ranges)
+
+    Returns:
+        JSON text
+    """
+    return json.dumps(converter_options or {}, sort_keys=True, default=str)
+
+
+def decode_options(text: str) -> Dict[str, Any]:
+    """
+    Restore converter settings stored with ``encode_options``.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        Converter settings with paths and page ranges restored
+    """
+    options = json.loads(text)
+    if options.get('cache_dir'):
+        options['cache_dir'] = Path(options['cache_dir'])
+    if options.get('font_dirs'):
+        options['font_dirs'] = [Path(font_dir) for font_dir in options['font_dirs']]
+    if options.get('page_ranges'):
+        options['page_ranges'] = [tuple(page_range) for page_range in options['page_ranges']]
+    return options
+
+
+class JobQueue(ABC):
+    """Interface of a work queue backend."""
+
+    @abstractmethod
+    def enqueue(
+        self,
+        input_paths: Iterable[Path],
+        output_dir: Path,
+        extract_images: bool = False,
+        clean_headers: bool = False,
+        converter_options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> int:
+        """
+        Add conversion jobs.
+
+        Jobs are keyed by (input, output directory); enqueueing a finished,
+        failed or timed-out job again resets it, while pending or running
+        jobs are left alone.
+
+        Args:
+            input_paths: Files to convert
+            output_dir: Directory for output files
+            extract_images: Whether to extract images
+            clean_headers: Whether to clean headers
+            converter_options: Format-specific converter settings
+            max_attempts: Leases a job may get before it is marked failed
+
+        Returns:
+            Number of jobs added or reset
+        """
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """
+        Take the next pending job, or one whose lease expired.
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            lease_seconds: How long the lease lasts without a heartbeat
+
+        Returns:
+            The leased Job, or None if there is no work
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease.
+
+        Args:
+            job_id: Leased job
+            worker_id: Worker holding the lease
+            lease_seconds: New lease duration from now
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+
+    @abstractmethod
+    def complete(self, job_id: int, worker_id: str, status: JobStatus, message: str) -> bool:
+        """
+        Record a job's result.
+
+        Args:
+            job_id: Leased job
+            worker_id: Worker holding the lease
+            status: Result status (see ``queue_status``)
+            message: Result message
+
+        Returns:
+            False if the lease was lost and the result was not recorded
+        """
+
+    @abstractmethod
+    def release(self, job_id: int, worker_id: str) -> None:
+        """
+        Give a job back without counting the attempt (e.g. on shutdown).
+
+        Args:
+            job_id: Leased job
+            worker_id: Worker holding the lease
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Count jobs by status.
+
+        Returns:
+            Dict mapping each status in JOB_STATUSES to its job count
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Work queue stored in a SQLite database.
+
+    Leases are taken inside ``BEGIN IMMEDIATE`` transactions, so concurrent
+    workers never lease the same job. Use a local disk or a filesystem with
+    reliable POSIX locks for the database.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (and create if needed) the queue database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=60, isolation_level=None)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                input_path TEXT NOT NULL,
+                output_dir TEXT NOT NULL,
+                extract_images INTEGER NOT NULL,
+                clean_headers INTEGER NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                message TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (input_path, output_dir)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, lease_expires);
+            """
+        )
+
+    def enqueue(
+        self,
+        input_paths: Iterable[Path],
+        output_dir: Path,
+        extract_images: bool = False,
+        clean_headers: bool = False,
+        converter_options: Optional[Dict[str, Any]] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> int:
+        now = time.time()
+        options = encode_options(converter_options)
+        rows = [
+            (str(Path(input_path).resolve()), str(Path(output_dir).resolve()),
+             int(extract_images), int(clean_headers), options, max_attempts, now)
+            for input_path in input_paths
+        ]
+        with self._conn:
+            cursor = self._conn.executemany(
+                """
+                INSERT INTO jobs (input_path, output_dir, extract_images, clean_headers,
+                                  options, max_attempts, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (input_path, output_dir) DO UPDATE SET
+                    extract_images = excluded.extract_images,
+                    clean_headers = excluded.clean_headers,
+                    options = excluded.options,
+                    max_attempts = excluded.max_attempts,
+                    status = 'pending',
+                    attempts = 0,
+                    worker = NULL,
+                    lease_expires = NULL,
+                    message = NULL,
+                    updated = excluded.updated
+                WHERE status IN ('done', 'failed', 'timeout')
+                """,
+                rows,
+            )
+        return cursor.rowcount
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[Job]:
+        now = time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', worker = NULL, lease_expires = NULL,
+                    message = 'Lease expired after ' || attempts || ' attempts', updated = ?
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts
+                """,
+                (now, now),
+            )
+            row = self._conn.execute(
+                """
+                SELECT id, input_path, output_dir, extract_images, clean_headers, options, attempts
+                FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET status = 'leased', attempts = attempts + 1, worker = ?,
+                        lease_expires = ?, updated = ?
+                    WHERE id = ?
+                    """,
+                    (worker_id, now + lease_seconds, now, row[0]),
+                )
+            self._conn.execute('COMMIT')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+
+        if row is None:
+            return None
+        job_id, input_path, output_dir, extract_images, clean_headers, options, attempts = row
+        return Job(job_id, Path(input_path), Path(output_dir), bool(extract_images),
+                   bool(clean_headers), decode_options(options), attempts + 1)
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        cursor = self._conn.execute(
+            """
+            UPDATE jobs SET lease_expires = ?, updated = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (now + lease_seconds, now, job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, status: JobStatus, message: str) -> bool:
+        cursor = self._conn.execute(
+            """
+            UPDATE jobs SET status = ?, message = ?, lease_expires = NULL, updated = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (queue_status(status), message, time.time(), job_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: int, worker_id: str) -> None:
+        self._conn.execute(
+            """
+            UPDATE jobs SET status = 'pending', attempts = attempts - 1, worker = NULL,
+                lease_expires = NULL, updated = ?
+            WHERE id = ? AND worker = ? AND status = 'leased'
+            """,
+            (time.time(), job_id, worker_id),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for status, count in self._conn.execute(
+            'SELECT status, COUNT(*) FROM jobs GROUP BY status'
+        ):
+            counts[status] = count
+        return counts
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# Queue backends by URL scheme
+QUEUE_BACKENDS: Dict[str, Callable[[str], JobQueue]] = {
+    'sqlite': lambda location: SQLiteJobQueue(Path(location)),
+}
+
+
+def open_queue(url: str) -> JobQueue:
+    """
+    Open a work queue.
+
+    Args:
+        url: ``scheme://location`` for a registered backend (for SQLite,
+            ``sqlite:///abs/path.db`` or ``sqlite://relative.db``), or a
+            path to a SQLite database
+
+    Returns:
+        JobQueue instance
+
+    Raises:
+        ValueError: If the URL scheme has no registered backend
+    """
+    scheme, separator, location = url.partition('://')
+    if not separator:
+        return SQLiteJobQueue(Path(url))
+    if scheme not in QUEUE_BACKENDS:
+        raise ValueError(
+            f"Unknown queue backend '{scheme}' (choose from {', '.join(QUEUE_BACKENDS)})"
+        )
+    return QUEUE_BACKENDS[scheme](location)
+
+
+class LeaseKeeper:
+    """
+    Context manager that renews a job's lease from a background thread.
+
+    The thread uses its own queue connection and renews the lease every
+    third of its duration. ``lost`` is set if the lease was taken over.
+    """
+
+    def __init__(self, queue_url: str, job_id: int, worker_id: str, lease_seconds: float):
+        """
+        Initialize the keeper.
+
+        Args:
+            queue_url: Queue to connect to
+            job_id: Leased job
+            worker_id: Worker holding the lease
+            lease_seconds: Lease duration
+        """
+        self.queue_url = queue_url
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        queue = open_queue(self.queue_url)
+        try:
+            while not self._stop.wait(self.lease_seconds / 3):
+                try:
+                    if not queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds):
+                        self.lost = True
+                        return
+                except sqlite3.Error:
+                    # A busy database only delays this heartbeat; retry next interval
+                    continue
+        finally:
+            queue.close()
+
+    def __enter__(self) -> 'LeaseKeeper':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def default_worker_id() -> str:
+    """Identify this worker process as ``hostname:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    queue_url: str,
+    worker_id: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_SECONDS,
+    max_jobs: Optional[int] = None,
+    exit_when_empty: bool = False,
+    on_result: Optional[Callable[[Job, JobStatus, str], None]] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Lease and convert jobs until stopped.
+
+    Args:
+        queue_url: Queue to work on (see ``open_queue``)
+        worker_id: Identifier recorded with leases (default: hostname:pid)
+        lease_seconds: Lease duration; heartbeats renew it while converting
+        poll_interval: Seconds to wait when no job is available
+        max_jobs: Stop after this many jobs (default: no limit)
+        exit_when_empty: Stop once no job is pending or leased
+        on_result: Called with (job, status, message) after each job
+        timeouts: Seconds a job may run, by input format with 'default' for
+            the rest (see ``batch.supervisor.job_timeout``); jobs then run in
+            a child process that is killed and replaced when over budget
+
+    Returns:
+        Number of jobs processed
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = open_queue(queue_url)
+    pool = WorkerPool(1) if timeouts else None
+    processed = 0
+    try:
+        while max_jobs is None or processed < max_jobs:
+            job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                counts = queue.counts()
+                if exit_when_empty and not counts['pending'] and not counts['leased']:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                with LeaseKeeper(queue_url, job.id, worker_id, lease_seconds) as keeper:
+                    try:
+                        book_format = preflight(job.input_path)
+                    except (OSError, ValueError) as e:
+                        status, message = JobStatus.FAILED, f"Error: {e}"
+                    else:
+                        args = (job.input_path, job.output_dir, job.extract_images,
+                                job.clean_headers, job.converter_options, book_format)
+                        if pool is None:
+                            _, status, message = convert_single_file(*args)
+                        else:
+                            future = pool.submit(
+                                convert_single_file, *args,
+                                timeout=job_timeout(job.input_path, timeouts, book_format),
+                            )
+                            _, status, message = job_result(job.input_path, future)
+            except BaseException:
+                queue.release(job.id, worker_id)
+                raise
+
+            # Another worker owns a job whose lease was taken over, so its result stands
+            if keeper.lost or not queue.complete(job.id, worker_id, status, message):
+                message = f"{message} (lease lost; result not recorded)"
+            processed += 1
+            if on_result:
+                on_result(job, status, message)
+    finally:
+        if pool is not None:
+            # Nothing is running on a normal exit; on Ctrl-C the job is killed
+            pool.shutdown(cancel=True)
+        queue.close()
+    return processed
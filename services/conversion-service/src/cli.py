@@ -2,65 +2,93 @@
 """CLI for the conversion service."""
 
 import argparse
+import asyncio
+import json
 import sys
+from collections import Counter
 from pathlib import Path
-from typing import List
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import as_completed
+from functools import partial
 
-from converters import EPUBConverter, PDFConverter, MOBIConverter, MarkdownToPDFConverter
+from batch import convert_async, convert_single_file, open_queue, run_worker
+from batch.autotune import WorkerAutotuner, describe_decision
+from batch.jobs import JobStatus
+from batch.pipeline import discover_inputs, resume_staging_dir
+from batch.routing import DEFAULT_SUBPROCESS_WORKERS, FormatRouter, default_render_workers
+from batch.supervisor import WorkerPool, job_result, job_timeout, parse_timeout
+from batch.work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_POLL_SECONDS
+from converters.cache import default_cache_dir
+from converters.image_processing import DEFAULT_MAX_DIMENSION, DEFAULT_QUALITY, IMAGE_FORMATS
+from converters.markdown_to_pdf_converter import RENDER_PROFILES
+from converters.metadata import inspect_books
+from converters.page_selection import parse_page_ranges
+from converters.pdf_engines import ENGINE_CHOICES
+from converters.render_targets import parse_targets
+from converters.sniffing import preflight
+from outputs import SearchIndex, open_bundle_writer, verify_links
+from outputs.bundle import BUNDLE_SUFFIXES
 
 
-def get_converter(file_path: Path):
+AUTO_WORKERS = 'auto'
+
+STATUS_SYMBOLS = {
+    JobStatus.CONVERTED: "✓",
+    JobStatus.UNCHANGED: "=",
+    JobStatus.FAILED: "✗",
+    JobStatus.TIMEOUT: "⏱",
+}
+
+
+def print_result(input_path: Path, status: JobStatus, message: str) -> None:
+    """Print one conversion result."""
+    print(f"{STATUS_SYMBOLS.get(status, '✓' if status else '✗')} {input_path.name}: {message}",
+          flush=True)
+
+
+def preflight_inputs(input_paths: List[Path]) -> Tuple[Dict[Path, str], List[Tuple[Path, str]]]:
     """
-    Get the appropriate converter for a file.
+    Check inputs for broken or unsupported files before any conversion starts.
+
+    Only the first and last few kilobytes of each file are read, so junk
+    never takes a worker or an ebook-convert slot.
 
     Args:
-        file_path: Path to the file to convert
+        input_paths: Files to check
 
     Returns:
-        Converter instance or None if format not supported
+        Tuple of (format of each input that passed, (input_path, message)
+        for each rejected input), both in input order
     """
-    converters = [EPUBConverter(), PDFConverter(), MOBIConverter(), MarkdownToPDFConverter()]
-    
-    for converter in converters:
-        if converter.supports_format(file_path):
-            return converter
-    
-    return None
+    passed = {}
+    rejected = []
+    for input_path in input_paths:
+        try:
+            passed[input_path] = preflight(input_path)
+        except (OSError, ValueError) as e:
+            rejected.append((input_path, f"Error: {e}"))
+    return passed, rejected
 
 
-def convert_single_file(
-    input_path: Path,
-    output_dir: Path,
-    extract_images: bool = False,
-    clean_headers: bool = False,
-) -> tuple[Path, bool, str]:
+def summarize_results(statuses: List[JobStatus]) -> str:
     """
-    Convert a single file to Markdown.
+    Count a batch's results by outcome.
 
     Args:
-        input_path: Path to the input file
-        output_dir: Directory for output files
-        extract_images: Whether to extract images
-        clean_headers: Whether to clean headers
+        statuses: Status of every job in the batch
 
     Returns:
-        Tuple of (input_path, success, message)
+        Summary such as '3 changed, 12 unchanged, 1 failed'
     """
-    try:
-        converter = get_converter(input_path)
-        if not converter:
-            return (input_path, False, f"Unsupported format: {input_path.suffix}")
-        
-        output_path = converter.convert(
-            input_path,
-            output_dir,
-            extract_images=extract_images,
-            clean_headers=clean_headers,
-        )
-        return (input_path, True, f"Converted to {output_path}")
-    except Exception as e:
-        return (input_path, False, f"Error: {str(e)}")
+    labels = {
+        JobStatus.CONVERTED: 'changed',
+        JobStatus.UNCHANGED: 'unchanged',
+        JobStatus.FAILED: 'failed',
+        JobStatus.TIMEOUT: 'timed out',
+    }
+    counts = Counter(statuses)
+    return ', '.join(f"{counts[status]} {label}" for status, label in labels.items()
+                     if counts[status] or status in (JobStatus.CONVERTED, JobStatus.UNCHANGED))
 
 
 def convert_files(
@@ -69,52 +97,744 @@ def convert_files(
     extract_images: bool = False,
     clean_headers: bool = False,
     parallel: bool = False,
-    workers: int = 4,
+    workers: Union[int, str] = 4,
+    converter_options: Optional[Dict[str, Any]] = None,
+    pipeline: bool = False,
+    bundle: Optional[Path] = None,
+    search_index: Optional[Path] = None,
+    timeouts: Optional[Dict[str, float]] = None,
+    autotune_log: Optional[Path] = None,
+    render_workers: Optional[int] = None,
+    subprocess_workers: int = DEFAULT_SUBPROCESS_WORKERS,
+    render_memory_limit: Optional[int] = None,
+    strict: bool = False,
 ) -> None:
     """
     Convert multiple files to Markdown.
 
+    Every input is preflighted first: files that are empty, truncated, or
+    whose content is of no supported format are reported as failed
+    without being handed to a converter.
+
     Args:
         input_paths: List of input file paths
         output_dir: Directory for output files
         extract_images: Whether to extract images
         clean_headers: Whether to clean headers
         parallel: Whether to use parallel processing
-        workers: Number of parallel workers
+        workers: Number of parallel workers, or 'auto' to size the pool from
+            CPU/memory limits and measured job memory
+        converter_options: Format-specific converter settings
+        pipeline: Whether to use the asyncio pipeline, which overlaps
+            reading, MOBI unpacking and writing with conversion
+        bundle: Write all outputs into this ZIP or SQLite bundle instead of
+            output_dir (uses the asyncio pipeline)
+        search_index: Update this SQLite full-text index with every converted
+            document (uses the asyncio pipeline)
+        timeouts: Seconds a job may run, by input format ('epub', 'pdf',
+            'mobi', 'markdown') with 'default' for the rest; jobs then run in
+            worker processes that are killed when over budget
+        autotune_log: JSON-lines file to append worker autotuning decisions to
+        render_workers: Processes rendering Markdown inputs, separate from the
+            parsing workers (default: half of workers)
+        subprocess_workers: ebook-convert processes unpacking MOBI inputs at once
+        render_memory_limit: Address-space limit of each rendering process in bytes
+        strict: Convert nothing if any input fails its preflight, and stop
+            the batch (killing running jobs) at the first failed conversion
+
+    Raises:
+        RuntimeError: In strict mode, when an input is rejected or a conversion fails
     """
-    if parallel and len(input_paths) > 1:
-        print(f"Converting {len(input_paths)} files in parallel (workers: {workers})...")
-        with ProcessPoolExecutor(max_workers=workers) as executor:
+    statuses: List[JobStatus] = []
+
+    def report(input_path: Path, status: JobStatus, message: str) -> None:
+        statuses.append(status)
+        print_result(input_path, status, message)
+        if strict and not status:
+            raise RuntimeError(f"Stopped at the first failure (--strict): {input_path}")
+
+    formats, rejected = preflight_inputs(input_paths)
+    for input_path, message in rejected:
+        statuses.append(JobStatus.FAILED)
+        print_result(input_path, JobStatus.FAILED, message)
+    if strict and rejected:
+        raise RuntimeError(
+            f"{len(rejected)} of {len(input_paths)} inputs failed preflight checks "
+            "(--strict); nothing was converted"
+        )
+    # Jobs carry their preflighted format, so dispatch does not sniff the files again
+    input_paths = list(formats)
+
+    autotuner = None
+    workers_label = str(workers)
+    if workers == AUTO_WORKERS:
+        autotuner = WorkerAutotuner(
+            on_decision=lambda record: print(f"⚙ {describe_decision(record)}",
+                                             file=sys.stderr, flush=True),
+            log_path=autotune_log,
+        )
+        workers = autotuner.cpus
+        workers_label = f"auto, up to {workers}"
+    render_workers = render_workers or default_render_workers(workers)
+    workers_label += f", render: {render_workers}, ebook-convert: {subprocess_workers}"
+
+    if pipeline or bundle or search_index:
+        print(f"Converting {len(input_paths)} files with the async pipeline "
+              f"(workers: {workers_label})...")
+        options = converter_options or {}
+        staging_dir = None
+        if options.get('checkpoint', True) and options.get('cache_dir'):
+            # Staged PDF checkpoints outlive the run, so a rerun resumes them
+            staging_dir = resume_staging_dir(options['cache_dir'], bundle or output_dir)
+
+        def run(writer=None) -> None:
+            index = SearchIndex(search_index) if search_index else None
+            try:
+                asyncio.run(convert_async(
+                    input_paths,
+                    output_dir,
+                    extract_images=extract_images,
+                    clean_headers=clean_headers,
+                    converter_options=converter_options,
+                    workers=workers,
+                    staging_dir=staging_dir,
+                    on_result=report,
+                    bundle=writer,
+                    search_index=index,
+                    timeouts=timeouts,
+                    autotuner=autotuner,
+                    subprocess_concurrency=subprocess_workers,
+                    render_workers=render_workers,
+                    render_memory_limit=render_memory_limit,
+                    formats=formats,
+                ))
+            finally:
+                if index:
+                    index.close()
+
+        if bundle:
+            with open_bundle_writer(bundle) as writer:
+                run(writer)
+        else:
+            run()
+    elif (parallel and len(input_paths) > 1) or timeouts:
+        if parallel and len(input_paths) > 1:
+            print(f"Converting {len(input_paths)} files in parallel (workers: {workers_label})...")
+            # Each format goes to the executor matching the resource it uses
+            executor = FormatRouter(
+                workers,
+                render_workers=render_workers,
+                subprocess_workers=subprocess_workers,
+                render_memory_limit=render_memory_limit,
+                autotuner=autotuner,
+            )
+            submit = executor.submit
+        else:
+            print(f"Converting {len(input_paths)} files...")
+            executor = WorkerPool(1)
+            submit = partial(executor.submit, convert_single_file)
+        # Leaving the block on Ctrl-C kills the workers instead of waiting for them
+        with executor:
             futures = {
-                executor.submit(
-                    convert_single_file,
+                submit(
                     path,
                     output_dir,
                     extract_images,
                     clean_headers,
+                    converter_options,
+                    formats[path],
+                    timeout=job_timeout(path, timeouts, formats[path]),
                 ): path
                 for path in input_paths
             }
             
             for future in as_completed(futures):
-                input_path, success, message = future.result()
-                status = "✓" if success else "✗"
-                print(f"{status} {input_path.name}: {message}")
+                report(*job_result(futures[future], future))
     else:
         print(f"Converting {len(input_paths)} files...")
         for input_path in input_paths:
-            input_path, success, message = convert_single_file(
+            report(*convert_single_file(
                 input_path,
                 output_dir,
                 extract_images,
                 clean_headers,
-            )
-            status = "✓" if success else "✗"
-            print(f"{status} {input_path.name}: {message}")
+                converter_options,
+                formats[input_path],
+            ))
+
+    # Outputs whose content was identical were left untouched
+    print(f"\nOutputs: {summarize_results(statuses)}")
+
+
+def page_ranges_arg(value: str):
+    """
+    Parse a --pages argument.
+
+    Args:
+        value: Page-range specification such as '1-20,100-110'
+
+    Returns:
+        List of (start, end) page ranges
+    """
+    try:
+        return parse_page_ranges(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def targets_arg(value: str) -> List[str]:
+    """
+    Parse a --to argument.
+
+    Args:
+        value: Comma-separated output targets such as 'pdf,html,epub'
+
+    Returns:
+        List of output targets
+    """
+    try:
+        return parse_targets(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def positive_int_arg(value: str) -> int:
+    """
+    Parse a strictly positive integer argument.
+
+    Args:
+        value: Command-line value
+
+    Returns:
+        The parsed integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
+def image_quality_arg(value: str) -> int:
+    """
+    Parse an --image-quality argument.
+
+    Args:
+        value: Integer from 1 to 100
+
+    Returns:
+        The quality
+    """
+    quality = positive_int_arg(value)
+    if quality > 100:
+        raise argparse.ArgumentTypeError(f"expected a quality from 1 to 100, got {value!r}")
+    return quality
+
+
+def workers_arg(value: str) -> Union[int, str]:
+    """
+    Parse the main --workers argument.
+
+    Args:
+        value: Positive integer or 'auto'
+
+    Returns:
+        Worker count, or 'auto'
+    """
+    if value.strip().lower() == AUTO_WORKERS:
+        return AUTO_WORKERS
+    return positive_int_arg(value)
+
+
+def timeout_arg(value: str) -> Tuple[str, float]:
+    """
+    Parse a --timeout argument.
+
+    Args:
+        value: ``SECONDS`` or ``FORMAT=SECONDS``
+
+    Returns:
+        Tuple of (format or 'default', seconds)
+    """
+    try:
+        return parse_timeout(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_timeout_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the per-job time budget option.
+
+    Args:
+        parser: Parser to extend
+    """
+    parser.add_argument(
+        '--timeout',
+        type=timeout_arg,
+        action='append',
+        metavar='[FORMAT=]SECONDS',
+        help='Kill and report a job that runs longer than this, for every job or for one '
+             'format (epub, pdf, mobi, markdown); repeatable, e.g. --timeout 300 '
+             '--timeout pdf=900',
+    )
+
+
+def job_timeouts(args: argparse.Namespace) -> Optional[Dict[str, float]]:
+    """
+    Collect the time budgets given with --timeout.
+
+    Args:
+        args: Namespace from a parser extended by add_timeout_arguments
+
+    Returns:
+        Seconds by format ('default' for all others), or None without limits
+    """
+    return dict(args.timeout) if args.timeout else None
+
+
+def add_conversion_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the output and converter options shared by conversion commands.
+
+    Args:
+        parser: Parser to extend
+    """
+    parser.add_argument(
+        '--output-dir',
+        type=Path,
+        default=Path('./output'),
+        help='Output directory for converted files (default: ./output)',
+    )
+    
+    parser.add_argument(
+        '--extract-images',
+        action='store_true',
+        help='Extract and save images from books',
+    )
+    
+    parser.add_argument(
+        '--image-format',
+        choices=IMAGE_FORMATS,
+        help='With --extract-images, re-encode EPUB/MOBI images in this format, downscaled '
+             'and without metadata, and point the Markdown links at them (default: '
+             'extract as-is)',
+    )
+    
+    parser.add_argument(
+        '--image-max-size',
+        type=positive_int_arg,
+        default=DEFAULT_MAX_DIMENSION,
+        metavar='PX',
+        help=f'Largest width or height of re-encoded images (default: {DEFAULT_MAX_DIMENSION})',
+    )
+    
+    parser.add_argument(
+        '--image-quality',
+        type=image_quality_arg,
+        default=DEFAULT_QUALITY,
+        metavar='Q',
+        help=f'Encoder quality of re-encoded images, 1-100 (default: {DEFAULT_QUALITY})',
+    )
+    
+    parser.add_argument(
+        '--clean-headers',
+        action='store_true',
+        help='Clean and normalize headers',
+    )
+    
+    parser.add_argument(
+        '--to',
+        type=targets_arg,
+        default=['pdf'],
+        metavar='TARGETS',
+        help='Outputs for Markdown input, rendered from a single parse: any of pdf, html, epub '
+             '(default: pdf)',
+    )
+    
+    parser.add_argument(
+        '--profile',
+        choices=RENDER_PROFILES,
+        default='final',
+        help='Markdown render profile: final (publication quality) or draft (fast preview '
+             'without highlighting, bookmarks, justification or page breaks) (default: final)',
+    )
+    
+    parser.add_argument(
+        '--font-dir',
+        dest='font_dirs',
+        action='append',
+        type=Path,
+        metavar='DIR',
+        help='Font directory to check for the PDF font; repeat for several '
+             '(default: the platform font directories)',
+    )
+    
+    parser.add_argument(
+        '--pdf-engine',
+        choices=ENGINE_CHOICES,
+        default='auto',
+        help='PDF text engine: fast (pypdf), layout (pdfplumber) or auto-detect per document '
+             '(default: auto)',
+    )
+    
+    parser.add_argument(
+        '--pages',
+        type=page_ranges_arg,
+        metavar='RANGES',
+        help='Convert only these 1-based pages (PDF) or spine items (EPUB/MOBI), '
+             'e.g. 1-20,100-110',
+    )
+    
+    parser.add_argument(
+        '--preview',
+        type=positive_int_arg,
+        metavar='N',
+        help='Convert only the first N pages (PDF) or spine items (EPUB/MOBI)',
+    )
+    
+    parser.add_argument(
+        '--no-checkpoint',
+        action='store_true',
+        help='Do not journal PDF pages for resuming interrupted conversions',
+    )
+    
+    parser.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='Release each PDF page after extracting it and reopen the document in page '
+             'windows, keeping memory flat for very long PDFs (slightly slower)',
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=default_cache_dir(),
+        help='Directory for cached rendering results (default: %(default)s)',
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the on-disk cache',
+    )
+
+
+def conversion_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Build converter settings from parsed conversion options.
+
+    Args:
+        args: Namespace from a parser extended by add_conversion_arguments
+
+    Returns:
+        Converter settings for get_converter
+    """
+    return {
+        'pdf_engine': args.pdf_engine,
+        'page_ranges': args.pages,
+        'preview': args.preview,
+        'checkpoint': not args.no_checkpoint,
+        'low_memory': args.low_memory,
+        'cache_dir': None if args.no_cache else args.cache_dir,
+        'targets': args.to,
+        'profile': args.profile,
+        'font_dirs': args.font_dirs,
+        'image_format': args.image_format,
+        'image_max_size': args.image_max_size,
+        'image_quality': args.image_quality,
+    }
+
+
+def verify_main(argv: List[str]) -> None:
+    """
+    Entry point for the ``verify`` subcommand.
+
+    Args:
+        argv: Arguments following the subcommand name
+    """
+    parser = argparse.ArgumentParser(
+        prog='convert verify',
+        description='Check generated PDFs and Markdown files for broken internal links '
+                    'and missing anchors; prints a JSON report',
+    )
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        type=Path,
+        help='Files or directories to check (searched recursively)',
+    )
+    parser.add_argument(
+        '--workers',
+        type=positive_int_arg,
+        default=None,
+        help='Number of parallel workers (default: CPU count)',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Write the JSON report to this file instead of stdout',
+    )
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    report = verify_links(args.paths, workers=args.workers)
+    report_json = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report_json + '\n', encoding='utf-8')
+    else:
+        print(report_json)
+
+    summary = report['summary']
+    print(
+        f"{'✓' if not summary['files_with_problems'] else '✗'} Checked {summary['files']} files, "
+        f"{summary['internal_links']} internal links: {summary['broken_links']} broken, "
+        f"{summary['missing_files']} file links to missing files, {summary['errors']} unreadable",
+        file=sys.stderr,
+    )
+    sys.exit(1 if summary['files_with_problems'] else 0)
+
+
+def inspect_main(argv: List[str]) -> None:
+    """
+    Run the 'inspect' subcommand: print catalog metadata without converting.
+
+    Args:
+        argv: Arguments following the subcommand name
+    """
+    parser = argparse.ArgumentParser(
+        prog='convert inspect',
+        description='Read title, authors, language, page/chapter counts and cover of EPUB, '
+                    'PDF and MOBI files from their headers only; prints a JSON report',
+    )
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        type=Path,
+        help='Files or directories to inspect (searched recursively)',
+    )
+    parser.add_argument(
+        '--workers',
+        type=positive_int_arg,
+        default=None,
+        help='Number of parallel workers (default: CPU count)',
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Write the JSON report to this file instead of stdout',
+    )
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    report = inspect_books(args.paths, workers=args.workers)
+    report_json = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report_json + '\n', encoding='utf-8')
+    else:
+        print(report_json)
+
+    summary = report['summary']
+    print(
+        f"{'✓' if not summary['errors'] else '✗'} Inspected {summary['books']} books, "
+        f"{summary['errors']} unreadable",
+        file=sys.stderr,
+    )
+    sys.exit(1 if summary['errors'] else 0)
+
+
+def format_counts(counts: Dict[str, int]) -> str:
+    """Format queue job counts for display."""
+    return ', '.join(f"{status}: {count}" for status, count in counts.items())
+
+
+def enqueue_main(argv: List[str]) -> None:
+    """
+    Run the 'enqueue' subcommand: record conversion jobs in a work queue.
+
+    Args:
+        argv: Arguments following the subcommand name
+    """
+    parser = argparse.ArgumentParser(
+        prog='convert enqueue',
+        description='Record conversion jobs in a shared work queue for `convert worker` '
+                    'processes on any host',
+    )
+    parser.add_argument(
+        'files',
+        nargs='+',
+        type=Path,
+        help='Input files or directories (searched recursively)',
+    )
+    parser.add_argument(
+        '--queue',
+        required=True,
+        help='Queue database path or URL (e.g. jobs.db or sqlite:///shared/jobs.db)',
+    )
+    parser.add_argument(
+        '--max-attempts',
+        type=positive_int_arg,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f'Leases a job may get before it is marked failed (default: {DEFAULT_MAX_ATTEMPTS})',
+    )
+    add_conversion_arguments(parser)
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        if not path.exists():
+            print(f"Error: Path not found: {path}", file=sys.stderr)
+            sys.exit(1)
+
+    queue = open_queue(args.queue)
+    try:
+        added = queue.enqueue(
+            discover_inputs(args.files),
+            args.output_dir,
+            extract_images=args.extract_images,
+            clean_headers=args.clean_headers,
+            converter_options=conversion_options(args),
+            max_attempts=args.max_attempts,
+        )
+        print(f"✓ Enqueued {added} jobs ({format_counts(queue.counts())})")
+    finally:
+        queue.close()
+
+
+def worker_main(argv: List[str]) -> None:
+    """
+    Run the 'worker' subcommand: lease and convert jobs from a work queue.
+
+    Args:
+        argv: Arguments following the subcommand name
+    """
+    parser = argparse.ArgumentParser(
+        prog='convert worker',
+        description='Lease and convert jobs recorded with `convert enqueue`',
+    )
+    parser.add_argument(
+        '--queue',
+        required=True,
+        help='Queue database path or URL (e.g. jobs.db or sqlite:///shared/jobs.db)',
+    )
+    parser.add_argument(
+        '--worker-id',
+        help='Identifier recorded with leases (default: hostname:pid)',
+    )
+    parser.add_argument(
+        '--lease-seconds',
+        type=positive_int_arg,
+        default=DEFAULT_LEASE_SECONDS,
+        help='Lease duration; renewed by heartbeats while converting '
+             f'(default: {DEFAULT_LEASE_SECONDS})',
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=DEFAULT_POLL_SECONDS,
+        help=f'Seconds to wait when the queue is empty (default: {DEFAULT_POLL_SECONDS})',
+    )
+    parser.add_argument(
+        '--max-jobs',
+        type=positive_int_arg,
+        help='Exit after this many jobs',
+    )
+    parser.add_argument(
+        '--exit-when-empty',
+        action='store_true',
+        help='Exit once no job is pending or leased instead of waiting for more',
+    )
+    add_timeout_arguments(parser)
+    args = parser.parse_args(argv)
+
+    def report(job, status: JobStatus, message: str) -> None:
+        print_result(job.input_path, status, message)
+
+    try:
+        processed = run_worker(
+            args.queue,
+            worker_id=args.worker_id,
+            lease_seconds=args.lease_seconds,
+            poll_interval=args.poll_interval,
+            max_jobs=args.max_jobs,
+            exit_when_empty=args.exit_when_empty,
+            on_result=report,
+            timeouts=job_timeouts(args),
+        )
+    except KeyboardInterrupt:
+        print("\n✗ Worker stopped; its current job was returned to the queue", file=sys.stderr)
+        sys.exit(1)
+    print(f"\n✓ Worker finished after {processed} jobs")
+
+
+def search_main(argv: List[str]) -> None:
+    """
+    Run the 'search' subcommand: query a full-text index built with --search-index.
+
+    Args:
+        argv: Arguments following the subcommand name
+    """
+    parser = argparse.ArgumentParser(
+        prog='convert search',
+        description='Query a full-text index built with --search-index; prints JSON results',
+    )
+    parser.add_argument(
+        'query',
+        help='Search query: words, "exact phrases", AND/OR/NOT, prefix*',
+    )
+    parser.add_argument(
+        '--index',
+        type=Path,
+        required=True,
+        help='Search index database',
+    )
+    parser.add_argument(
+        '--limit',
+        type=positive_int_arg,
+        default=10,
+        help='Maximum number of results (default: 10)',
+    )
+    args = parser.parse_args(argv)
+
+    if not args.index.is_file():
+        print(f"Error: Search index not found: {args.index}", file=sys.stderr)
+        sys.exit(1)
+
+    with SearchIndex(args.index) as index:
+        try:
+            results = index.search(args.query, limit=args.limit)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    sys.exit(0 if results else 1)
+
+
+# Subcommands take precedence over input file names in the first argument
+SUBCOMMANDS = {
+    'verify': verify_main,
+    'inspect': inspect_main,
+    'enqueue': enqueue_main,
+    'worker': worker_main,
+    'search': search_main,
+}
 
 
 def main():
     """Main CLI entry point."""
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Convert ebook files (EPUB, PDF, MOBI) to Markdown or Markdown to PDF",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -126,14 +846,56 @@ Examples:
   # Convert Markdown to PDF
   %(prog)s document.md --output-dir ./pdf
 
+  # Publish Markdown as PDF, standalone HTML and EPUB from one parse
+  %(prog)s document.md --to pdf,html,epub --output-dir ./publish
+
+  # Quick preview while editing
+  %(prog)s document.md --profile draft --to html --output-dir ./preview
+
   # Convert multiple files
   %(prog)s book1.epub book2.pdf book3.mobi document.md --output-dir ./output
 
   # Batch conversion with parallel processing
   %(prog)s books/*.epub --parallel --workers 4 --output-dir ./markdown
 
+  # Size the pool from the container's CPU quota and memory limit
+  %(prog)s books/*.epub --parallel --workers auto --output-dir ./markdown
+
+  # Batch conversion overlapping I/O, Calibre and parsing
+  %(prog)s books/*.epub books/*.mobi --pipeline --workers 4 --output-dir ./markdown
+
   # Extract images and clean headers
   %(prog)s book.pdf --extract-images --clean-headers --output-dir ./markdown
+
+  # Force the fast text engine for a text-only PDF
+  %(prog)s book.pdf --pdf-engine fast --output-dir ./markdown
+
+  # Collect a whole library into one bundle with a chapter index
+  %(prog)s books/*.epub --bundle library.zip
+
+  # Index a library for full-text search, then query it
+  %(prog)s books/*.epub --search-index library.db --output-dir ./markdown
+  %(prog)s search '"dependency injection" OR ioc' --index library.db
+
+  # Catalog a library's metadata without converting anything
+  %(prog)s inspect /library --output catalog.json
+
+  # Check generated PDFs and Markdown for broken internal links
+  %(prog)s verify ./output
+
+  # Spread a library over several machines through a shared work queue
+  %(prog)s enqueue /library --queue /library/jobs.db --output-dir /library/markdown
+  %(prog)s worker --queue /library/jobs.db --exit-when-empty
+
+  # Kill and report stuck jobs instead of waiting on them forever
+  %(prog)s books/* --parallel --timeout 300 --timeout pdf=900 --output-dir ./markdown
+
+  # Triage a large book: selected pages, or a quick preview
+  %(prog)s book.pdf --pages 1-20,100-110 --output-dir ./markdown
+  %(prog)s book.epub --preview 3 --output-dir ./markdown
+
+  # Refuse the whole batch if any input is truncated or unsupported
+  %(prog)s books/* --parallel --strict --output-dir ./markdown
         """,
     )
     
@@ -144,36 +906,85 @@ Examples:
         help='Input files to convert (supports EPUB, PDF, MOBI, Markdown)',
     )
     
+    add_conversion_arguments(parser)
+    
     parser.add_argument(
-        '--output-dir',
-        type=Path,
-        default=Path('./output'),
-        help='Output directory for converted files (default: ./output)',
+        '--parallel',
+        action='store_true',
+        help='Use parallel processing for batch conversion',
     )
     
     parser.add_argument(
-        '--extract-images',
+        '--pipeline',
         action='store_true',
-        help='Extract and save images from books',
+        help='Use the asyncio pipeline: prefetch inputs, unpack MOBI files and write outputs '
+             'while other files convert',
     )
     
     parser.add_argument(
-        '--clean-headers',
-        action='store_true',
-        help='Clean and normalize headers',
+        '--bundle',
+        type=Path,
+        metavar='PATH',
+        help='Write all outputs into one bundle (.zip, or .sqlite for an updatable SQLite '
+             'archive) with a chapter index, instead of loose files in --output-dir',
     )
     
     parser.add_argument(
-        '--parallel',
-        action='store_true',
-        help='Use parallel processing for batch conversion',
+        '--search-index',
+        type=Path,
+        metavar='PATH',
+        help='Add every converted document to this SQLite full-text index (updated '
+             'incrementally; query it with `convert search`)',
     )
     
     parser.add_argument(
         '--workers',
-        type=int,
+        type=workers_arg,
         default=4,
-        help='Number of parallel workers (default: 4)',
+        help="Number of parallel workers, or 'auto' to use every CPU the cgroup allows and "
+             "shrink or grow the pool to fit its memory limit as jobs report their peak "
+             "RSS (default: 4)",
+    )
+    
+    parser.add_argument(
+        '--autotune-log',
+        type=Path,
+        metavar='PATH',
+        help='Append --workers auto decisions to this JSON-lines file',
+    )
+    
+    parser.add_argument(
+        '--render-workers',
+        type=positive_int_arg,
+        metavar='N',
+        help='Processes rendering Markdown inputs with --parallel or --pipeline, separate '
+             'from the parsing workers (default: half of --workers)',
+    )
+    
+    parser.add_argument(
+        '--subprocess-workers',
+        type=positive_int_arg,
+        default=DEFAULT_SUBPROCESS_WORKERS,
+        metavar='N',
+        help='ebook-convert processes unpacking MOBI inputs at once with --parallel or '
+             f'--pipeline (default: {DEFAULT_SUBPROCESS_WORKERS})',
+    )
+    
+    parser.add_argument(
+        '--render-memory-limit',
+        type=positive_int_arg,
+        metavar='MB',
+        help='Address-space limit of each Markdown rendering process; a render that exceeds '
+             'it fails instead of exhausting memory',
+    )
+    
+    add_timeout_arguments(parser)
+    
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Convert nothing if any input is empty, truncated or of no supported format, and '
+             'stop the batch at the first failed conversion',
     )
     
     args = parser.parse_args()
@@ -190,7 +1001,12 @@ Examples:
         input_paths.append(file_path)
     
     # Create output directory
-    args.output_dir.mkdir(parents=True, exist_ok=True)
+    if not args.bundle:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+    elif args.bundle.suffix.lower() not in BUNDLE_SUFFIXES:
+        print(f"Error: Unsupported bundle format: {args.bundle.suffix} (use .zip or .sqlite)",
+              file=sys.stderr)
+        sys.exit(1)
     
     # Convert files
     try:
@@ -201,10 +1017,24 @@ Examples:
             clean_headers=args.clean_headers,
             parallel=args.parallel,
             workers=args.workers,
+            pipeline=args.pipeline,
+            bundle=args.bundle,
+            search_index=args.search_index,
+            timeouts=job_timeouts(args),
+            autotune_log=args.autotune_log,
+            render_workers=args.render_workers,
+            subprocess_workers=args.subprocess_workers,
+            render_memory_limit=args.render_memory_limit << 20 if args.render_memory_limit else None,
+            strict=args.strict,
+            converter_options=conversion_options(args),
         )
-        print(f"\n✓ Conversion complete! Output in: {args.output_dir}")
+        print(f"\n✓ Conversion complete! Output in: {args.bundle or args.output_dir}")
     except KeyboardInterrupt:
         print("\n\n✗ Conversion cancelled by user", file=sys.stderr)
+        # The pipeline only keeps its staged checkpoints in the on-disk cache
+        staged = args.pipeline or args.bundle or args.search_index
+        if not args.no_checkpoint and not (staged and args.no_cache):
+            print("  PDF progress is checkpointed; rerun the same command to resume", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"\n✗ Conversion failed: {e}", file=sys.stderr)
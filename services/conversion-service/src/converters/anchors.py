@@ -0,0 +1,388 @@
+"""Heading anchor and internal-link scanning for Markdown documents."""
+
+import html
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from markdown.extensions.toc import slugify, unique
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t]*#*[ \t]*$')
+ATTR_LIST_PATTERN = re.compile(r'[ \t]*\{:?([^}]*)\}[ \t]*$')
+ATTR_ID_PATTERN = re.compile(r'(?:^|\s)#([^\s}]+)')
+FENCE_PATTERN = re.compile(r'^[ \t]{0,3}(`{3,}|~{3,})')
+HTML_ID_PATTERN = re.compile(r'<[a-zA-Z][^>]*?\s(?:id|name)=["\']([^"\']+)["\']')
+INTERNAL_LINK_PATTERN = re.compile(r'(?<!!)\[([^\]]*)\]\(<?#([^)\s>]+)>?(?:\s+"[^"]*")?\)')
+REFERENCE_LINK_PATTERN = re.compile(r'^[ \t]{0,3}\[([^\]]+)\]:[ \t]*<?#([^\s>]+)')
+
+# Inline Markdown that contributes no text to a rendered heading
+CODE_SPAN_PATTERN = re.compile(r'(`+)(.+?)\1')
+INLINE_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+INLINE_LINK_PATTERN = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+# Underscores only mark emphasis at word boundaries (snake_case stays intact)
+EMPHASIS_PATTERN = re.compile(r'\*{1,3}|~~|(?<![A-Za-z0-9])_{1,3}|_{1,3}(?![A-Za-z0-9])')
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]')
+
+
+class Heading(NamedTuple):
+    """A heading found while scanning a Markdown document."""
+
+    line_number: int
+    level: int
+    text: str
+    explicit_id: Optional[str]
+
+
+class InternalLink(NamedTuple):
+    """A link to an anchor within the same document."""
+
+    line_number: int
+    anchor: str
+    text: str
+
+
+def heading_plain_text(text: str) -> str:
+    """
+    Reduce heading Markdown to the plain text python-markdown renders.
+
+    Args:
+        text: Heading content without the leading hashes or attribute list
+
+    Returns:
+        Plain heading text
+    """
+    text = INLINE_IMAGE_PATTERN.sub('', text)
+    text = INLINE_LINK_PATTERN.sub(r'\1', text)
+
+    parts = []
+    position = 0
+    # Code spans keep their content verbatim; markup is only removed outside them
+    for match in CODE_SPAN_PATTERN.finditer(text):
+        parts.append(_strip_markup(text[position:match.start()]))
+        parts.append(match.group(2).strip())
+        position = match.end()
+    parts.append(_strip_markup(text[position:]))
+    return html.unescape(''.join(parts)).strip()
+
+
+def _strip_markup(text: str) -> str:
+    """Remove HTML tags and emphasis markers from text outside code spans."""
+    return EMPHASIS_PATTERN.sub('', HTML_TAG_PATTERN.sub('', text))
+
+
+def text_slug(text: str) -> str:
+    """
+    Slugify heading or link text the way the ``toc`` extension does.
+
+    Args:
+        text: Heading or link Markdown
+
+    Returns:
+        Slug before any uniqueness suffix
+    """
+    return slugify(heading_plain_text(text), '-')
+
+
+def _loose_key(anchor: str) -> str:
+    """Reduce an anchor to lowercase alphanumerics for tolerant matching."""
+    return NON_ALNUM_PATTERN.sub('', anchor.lower())
+
+
+def split_attr_list(text: str):
+    """
+    Separate a trailing ``{#id .class}`` attribute list from heading text.
+
+    Args:
+        text: Heading content without the leading hashes
+
+    Returns:
+        Tuple of (text, explicit_id) where explicit_id is None if absent
+    """
+    match = ATTR_LIST_PATTERN.search(text)
+    if not match:
+        return text, None
+    id_match = ATTR_ID_PATTERN.search(match.group(1))
+    return text[: match.start()], id_match.group(1) if id_match else None
+
+
+class AnchorIndex:
+    """
+    Index of the anchors and internal links of one Markdown document.
+
+    Heading anchors follow python-markdown's ``toc`` extension: explicit
+    ``{#id}`` and HTML ids are reserved first, then every other heading
+    gets the slug of its text, made unique with ``_1``, ``_2``... suffixes
+    in document order.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.headings: List[Heading] = []
+        self.links: List[InternalLink] = []
+        self.html_ids: Set[str] = set()
+
+    def add_heading(
+        self, line_number: int, level: int, text: str, explicit_id: Optional[str] = None
+    ) -> Heading:
+        """
+        Register a heading.
+
+        Args:
+            line_number: 1-based line number of the heading
+            level: Heading level (1-6)
+            text: Heading text without hashes or attribute list
+            explicit_id: ID given with an attribute list, if any
+
+        Returns:
+            The registered Heading
+        """
+        heading = Heading(line_number, level, text, explicit_id)
+        self.headings.append(heading)
+        return heading
+
+    def scan_line(self, line_number: int, line: str) -> Optional[Heading]:
+        """
+        Record the anchors and internal links on one line outside code blocks.
+
+        Args:
+            line_number: 1-based line number
+            line: Line content without the trailing newline
+
+        Returns:
+            The Heading if the line is an ATX heading, else None
+        """
+        if '#' not in line and 'id=' not in line and 'name=' not in line:
+            return None
+
+        for match in INTERNAL_LINK_PATTERN.finditer(line):
+            self.links.append(InternalLink(line_number, match.group(2), match.group(1)))
+        reference = REFERENCE_LINK_PATTERN.match(line)
+        if reference:
+            self.links.append(InternalLink(line_number, reference.group(2), reference.group(1)))
+        self.html_ids.update(HTML_ID_PATTERN.findall(line))
+
+        heading = HEADING_PATTERN.match(line)
+        if not heading:
+            return None
+        text, explicit_id = split_attr_list(heading.group(2))
+        return self.add_heading(line_number, len(heading.group(1)), text, explicit_id)
+
+    def heading_anchors(self, overrides: Optional[Dict[int, str]] = None) -> List[str]:
+        """
+        Compute the anchor of every heading.
+
+        Args:
+            overrides: Explicit IDs to assume, keyed by heading position
+
+        Returns:
+            Anchors in heading order
+        """
+        overrides = overrides or {}
+        explicit = [overrides.get(position, heading.explicit_id)
+                    for position, heading in enumerate(self.headings)]
+        used = set(self.html_ids)
+        used.update(anchor for anchor in explicit if anchor)
+        return [
+            anchor or unique(text_slug(heading.text), used)
+            for heading, anchor in zip(self.headings, explicit)
+        ]
+
+    @property
+    def ids(self) -> Set[str]:
+        """All anchors defined by the document."""
+        return self.html_ids | set(self.heading_anchors())
+
+    def missing_anchors(self) -> List[InternalLink]:
+        """
+        Find internal links whose target anchor does not exist.
+
+        Returns:
+            List of broken InternalLink entries
+        """
+        ids = self.ids
+        return [link for link in self.links if link.anchor not in ids]
+
+    def resolve_links(self) -> Tuple[Dict[int, str], Dict[str, str]]:
+        """
+        Match dangling internal links to the headings they were meant for.
+
+        A dangling link is matched by its text (slugified like a heading)
+        or, failing that, by comparing its anchor to heading anchors with
+        all punctuation removed. The heading then takes the link's anchor
+        as its ID, unless it already has an explicit ID or its own anchor
+        is linked elsewhere, in which case the link is rewritten instead.
+        Links to headings whose ``_N`` suffix shifts as a result are
+        rewritten too.
+
+        Returns:
+            Tuple of (heading IDs keyed by heading position, link anchor rewrites)
+        """
+        anchors = self.heading_anchors()
+        defined = self.html_ids | set(anchors)
+        linked = {link.anchor for link in self.links}
+
+        by_slug: Dict[str, int] = {}
+        by_key: Dict[str, int] = {}
+        for position, heading in enumerate(self.headings):
+            slug = text_slug(heading.text)
+            by_slug.setdefault(slug, position)
+            by_key.setdefault(_loose_key(slug), position)
+            by_key.setdefault(_loose_key(anchors[position]), position)
+
+        overrides: Dict[int, str] = {}
+        targets: Dict[str, int] = {}
+        for link in self.links:
+            if link.anchor in defined or link.anchor in targets:
+                continue
+            position = by_slug.get(text_slug(link.text)) if link.text else None
+            if position is None:
+                position = by_key.get(_loose_key(link.anchor))
+            if position is None:
+                continue
+
+            targets[link.anchor] = position
+            heading = self.headings[position]
+            if position not in overrides and not heading.explicit_id and anchors[position] not in linked:
+                overrides[position] = link.anchor
+
+        resolved = self.heading_anchors(overrides)
+        rewrites = {
+            anchor: resolved[position]
+            for anchor, position in targets.items()
+            if resolved[position] != anchor
+        }
+        for position, (before, after) in enumerate(zip(anchors, resolved)):
+            if before != after and position not in overrides and before in linked:
+                rewrites.setdefault(before, after)
+        return overrides, rewrites
+
+    def unresolved_links(self) -> List[InternalLink]:
+        """
+        Find internal links that ``resolve_links`` cannot repair.
+
+        These are the links that stay broken when the Markdown to PDF
+        converter renders the document.
+
+        Returns:
+            List of broken InternalLink entries
+        """
+        overrides, rewrites = self.resolve_links()
+        ids = self.html_ids | set(self.heading_anchors(overrides))
+        return [link for link in self.links if rewrites.get(link.anchor, link.anchor) not in ids]
+
+
+def scan_lines(lines: List[str]) -> AnchorIndex:
+    """
+    Build the anchor index of a Markdown document in a single pass.
+
+    Args:
+        lines: Markdown lines without trailing newlines
+
+    Returns:
+        AnchorIndex with every heading, explicit ID and internal link
+    """
+    index = AnchorIndex()
+    fence = None
+    for line_number, line in enumerate(lines, 1):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker.startswith(fence):
+                fence = None
+            continue
+        if fence is None:
+            index.scan_line(line_number, line)
+    return index
+
+
+def scan_markdown(content: str) -> AnchorIndex:
+    """
+    Build the anchor index of a Markdown document.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        AnchorIndex with every heading, explicit ID and internal link
+    """
+    return scan_lines(content.split('\n'))
+
+
+def section_headings(headings: List[Heading]) -> List[Heading]:
+    """
+    Choose the headings that start a document's top-level sections.
+
+    Sections start at the shallowest heading level that occurs more than
+    once, so a single ``# Title`` followed by ``##`` chapters splits at the
+    chapters. Anything before the first of those headings, such as the
+    title, is left to the caller as a preamble section. Shallower headings
+    after it (e.g. a lone ``# Appendix``) start sections too.
+
+    Args:
+        headings: Headings of the document in order
+
+    Returns:
+        Section-starting headings in document order (empty without headings)
+    """
+    if not headings:
+        return []
+    counts = Counter(heading.level for heading in headings)
+    repeated = [level for level, count in counts.items() if count > 1]
+    level = min(repeated) if repeated else min(counts)
+    first = next(position for position, heading in enumerate(headings) if heading.level == level)
+    return [heading for heading in headings[first:] if heading.level <= level]
+
+
+def resolve_internal_links(content: str, pin_ids: bool = False) -> Tuple[str, AnchorIndex]:
+    """
+    Give headings the IDs that the document's internal links reference.
+
+    Only the heading and link lines that need a change are rewritten;
+    headings get an explicit ``{#id}`` attribute list. With ``pin_ids``
+    every heading gets its final ID written out, so parts of the document
+    can be rendered separately without the ``toc`` extension renumbering
+    duplicate headings.
+
+    Args:
+        content: Markdown text
+        pin_ids: Write an explicit ID on every heading
+
+    Returns:
+        Tuple of (patched Markdown, anchor index of the original text)
+    """
+    lines = content.split('\n')
+    index = scan_lines(lines)
+    overrides, rewrites = index.resolve_links()
+
+    if pin_ids:
+        anchors = index.heading_anchors(overrides)
+        overrides = {
+            position: anchor
+            for position, (heading, anchor) in enumerate(zip(index.headings, anchors))
+            if not heading.explicit_id
+        }
+
+    for position, anchor in overrides.items():
+        heading = index.headings[position]
+        lines[heading.line_number - 1] = f"{'#' * heading.level} {heading.text.strip()} {{#{anchor}}}"
+
+    if rewrites:
+        def rewrite(match):
+            anchor = match.group(2)
+            if anchor not in rewrites:
+                return match.group(0)
+            start, end = match.span(2)
+            offset = match.start(0)
+            text = match.group(0)
+            return text[: start - offset] + rewrites[anchor] + text[end - offset:]
+
+        for line_number in sorted({link.line_number for link in index.links
+                                   if link.anchor in rewrites}):
+            line = lines[line_number - 1]
+            line = INTERNAL_LINK_PATTERN.sub(rewrite, line)
+            lines[line_number - 1] = REFERENCE_LINK_PATTERN.sub(rewrite, line)
+
+    return '\n'.join(lines), index
@@ -1,13 +1,28 @@
 """Base converter class for book format conversions."""
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Union
+
+from .output_files import HashingWriter, open_if_changed
 
 
 class BaseConverter(ABC):
     """Base class for all book format converters."""
 
+    def __init__(self):
+        # Every file written so far, mapped to whether its content changed
+        self.output_changes: Dict[Path, bool] = {}
+        # Markdown of the last conversion (its output, or its input when
+        # rendering Markdown), or None if the converter did not keep it
+        self.markdown: Optional[str] = None
+
+    @property
+    def changed_outputs(self) -> List[Path]:
+        """Files whose content changed, in the order they were written."""
+        return [path for path, changed in self.output_changes.items() if changed]
+
     @abstractmethod
     def convert(
         self,
@@ -64,3 +79,35 @@ class BaseConverter(ABC):
             Path for the output Markdown file
         """
         return output_dir / f"{input_path.stem}.md"
+
+    @contextmanager
+    def _open_atomic(self, output_path: Path) -> Iterator[HashingWriter]:
+        """
+        Open an output for writing that only appears once complete.
+
+        The content is hashed while it streams to a temporary file, which is
+        renamed over the output when the block exits normally and the
+        content differs from the existing file. An unchanged output keeps
+        its mtime, and an interrupted write never leaves a truncated file
+        that looks complete. The outcome is recorded in ``output_changes``.
+
+        Args:
+            output_path: Path of the file to write
+
+        Yields:
+            Writer accepting text (encoded as UTF-8) or bytes
+        """
+        with open_if_changed(output_path) as writer:
+            yield writer
+        self.output_changes[output_path] = writer.changed
+
+    def _write_atomic(self, output_path: Path, content: Union[str, bytes]) -> None:
+        """
+        Write a file atomically, leaving it untouched if the content is unchanged.
+
+        Args:
+            output_path: Path of the file to write
+            content: Text or binary content to write
+        """
+        with self._open_atomic(output_path) as f:
+            f.write(content)
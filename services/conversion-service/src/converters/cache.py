@@ -0,0 +1,178 @@
+"""On-disk caches shared by the converters."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .output_files import write_atomic
+
+# Entries kept in memory per cache before the oldest are dropped
+MAX_MEMORY_ENTRIES = 4096
+
+
+def default_cache_dir() -> Path:
+    """
+    Get the default cache root for conversion-service.
+
+    Returns:
+        ``$XDG_CACHE_HOME/conversion-service`` (``~/.cache`` if unset)
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'conversion-service'
+
+
+class ContentCache:
+    """
+    Content-addressed cache of byte payloads.
+
+    Keys combine an entry's source with a fingerprint of the configuration
+    that produced it, so changing the configuration misses instead of
+    returning stale entries. Entries live on disk when a directory is given,
+    where concurrent writers are safe thanks to atomic renames, and
+    optionally also in memory.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        cache_dir: Optional[Path] = None,
+        suffix: str = '.bin',
+        memory_entries: int = 0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            config: JSON-serializable configuration the entries depend on
+            cache_dir: Directory for persistent entries (none if None)
+            suffix: File suffix of the entries on disk
+            memory_entries: Recent entries also kept in memory
+        """
+        self.fingerprint = hashlib.sha256(
+            json.dumps(config, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.memory_entries = memory_entries
+        self._memory: Dict[str, bytes] = {}
+
+    def key(self, source: Union[str, bytes]) -> str:
+        """
+        Compute the cache key for an entry's source.
+
+        Args:
+            source: Source the entry is derived from; text is hashed as UTF-8
+
+        Returns:
+            Hex digest identifying the entry under the current configuration
+        """
+        digest = hashlib.sha256(self.fingerprint.encode('ascii'))
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up an entry.
+
+        Args:
+            key: Key from ``key()``
+
+        Returns:
+            The cached bytes, or None on a miss
+        """
+        if key in self._memory:
+            return self._memory[key]
+        if self.cache_dir is None:
+            return None
+        try:
+            data = self._entry_path(key).read_bytes()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store an entry.
+
+        Args:
+            key: Key from ``key()``
+            data: Bytes to cache
+        """
+        self._remember(key, data)
+        if self.cache_dir is None:
+            return
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(entry_path, data)
+        except OSError:
+            # The cache is an optimization; a read-only or full disk is not an error
+            pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if not self.memory_entries:
+            return
+        if len(self._memory) >= self.memory_entries:
+            self._memory.pop(next(iter(self._memory)))
+        self._memory[key] = data
+
+
+class FragmentCache(ContentCache):
+    """
+    Cache of rendered HTML fragments, keyed by source text and renderer configuration.
+
+    Recent fragments are also kept in memory.
+    """
+
+    def __init__(self, config: Dict[str, Any], cache_dir: Optional[Path] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            config: JSON-serializable renderer configuration
+            cache_dir: Directory for persistent entries (memory only if None)
+        """
+        super().__init__(config, cache_dir, suffix='.html', memory_entries=MAX_MEMORY_ENTRIES)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a rendered fragment.
+
+        Args:
+            key: Key from ``key()``
+
+        Returns:
+            The cached HTML, or None on a miss
+        """
+        data = super().get(key)
+        return data.decode('utf-8') if data is not None else None
+
+    def put(self, key: str, html: str) -> None:
+        """
+        Store a rendered fragment.
+
+        Args:
+            key: Key from ``key()``
+            html: Rendered HTML
+        """
+        super().put(key, html.encode('utf-8'))
+
+
+class ImageCache(ContentCache):
+    """Cache of processed images, keyed by source bytes and processing settings."""
+
+    def __init__(self, config: Dict[str, Any], cache_dir: Optional[Path] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            config: JSON-serializable processing settings
+            cache_dir: Directory for entries (caching is disabled if None)
+        """
+        super().__init__(config, cache_dir, suffix='.bin')
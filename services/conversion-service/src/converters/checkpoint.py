@@ -0,0 +1,128 @@
+"""Append-only page journal for resumable conversions."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+JOURNAL_VERSION = 1
+
+
+class PageJournal:
+    """
+    Journal of per-page conversion results, flushed as each page completes.
+
+    The first line records a signature of the input file and conversion
+    settings; every following line holds one completed page. A journal
+    whose signature does not match the current run is discarded, and a
+    torn final line left by a crash is ignored.
+    """
+
+    def __init__(self, journal_path: Path, input_path: Path, settings: Dict[str, Any]):
+        """
+        Initialize the journal.
+
+        Args:
+            journal_path: Path of the journal file
+            input_path: Path of the document being converted
+            settings: Conversion settings that affect per-page output
+        """
+        self.journal_path = journal_path
+        stat = input_path.stat()
+        self.signature = {
+            'version': JOURNAL_VERSION,
+            'input': str(input_path.resolve()),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            # Round-trip so tuples compare equal to the lists read back from disk
+            'settings': json.loads(json.dumps(settings)),
+        }
+        self._file = None
+        self._valid_size = 0
+
+    def load(self) -> Dict[int, List[str]]:
+        """
+        Read the pages completed by a previous, interrupted run.
+
+        Returns:
+            Mapping of zero-based page index to the page's Markdown lines
+        """
+        completed: Dict[int, List[str]] = {}
+        if not self.journal_path.exists():
+            return completed
+
+        with open(self.journal_path, 'rb') as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                header = None
+            if header != self.signature or not header_line.endswith(b'\n'):
+                # Stale journal from a different input or different settings
+                f.close()
+                self.discard()
+                return completed
+
+            valid_size = len(header_line)
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                completed[record['page']] = record['lines']
+                valid_size += len(line)
+
+        self._valid_size = valid_size
+        return completed
+
+    def append(self, page_index: int, lines: List[str]) -> None:
+        """
+        Record a completed page and flush it to disk.
+
+        Args:
+            page_index: Zero-based page index
+            lines: Markdown lines produced for the page
+        """
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps({'page': page_index, 'lines': lines}, ensure_ascii=False))
+        self._file.write('\n')
+        self._file.flush()
+
+    def _open(self) -> None:
+        """Open the journal for appending, starting a new one if nothing was loaded."""
+        if not self._valid_size:
+            self._file = open(self.journal_path, 'w', encoding='utf-8')
+            self._file.write(json.dumps(self.signature) + '\n')
+            return
+
+        # Drop a torn record left by a crash so new records start on a fresh line
+        with open(self.journal_path, 'r+b') as f:
+            f.truncate(self._valid_size)
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def close(self) -> None:
+        """Close the journal file, keeping it for a later resume."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """Close and delete the journal."""
+        self.close()
+        self.journal_path.unlink(missing_ok=True)
+
+
+def get_journal_path(output_path: Path) -> Path:
+    """
+    Get the journal path that sits next to an output file.
+
+    Args:
+        output_path: Path of the final output file
+
+    Returns:
+        Path of the checkpoint journal
+    """
+    return output_path.with_name(f"{output_path.name}.checkpoint")
+
@@ -1,20 +1,67 @@
 """EPUB to Markdown converter."""
 
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+import posixpath
+from urllib.parse import unquote
 import html2text
 from bs4 import BeautifulSoup
 import ebooklib
 from ebooklib import epub
 
 from .base_converter import BaseConverter
+from .epub_package import EPUBPackage
+from .image_processing import (
+    DEFAULT_MAX_DIMENSION,
+    DEFAULT_QUALITY,
+    IMAGE_FORMATS,
+    ImageExtraction,
+    ImageProcessor,
+)
+from .page_selection import PageRange, select_pages
+from .sniffing import input_format
 
 
 class EPUBConverter(BaseConverter):
     """Converter for EPUB files to Markdown format."""
 
-    def __init__(self):
-        """Initialize the EPUB converter."""
+    def __init__(
+        self,
+        page_ranges: Optional[List[PageRange]] = None,
+        preview: Optional[int] = None,
+        image_format: Optional[str] = None,
+        image_max_dimension: int = DEFAULT_MAX_DIMENSION,
+        image_quality: int = DEFAULT_QUALITY,
+        image_cache_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize the EPUB converter.
+
+        Args:
+            page_ranges: 1-based ranges of spine documents to convert, not
+                counting the navigation document (default: all documents)
+            preview: Convert only the first N selected spine documents
+            image_format: Re-encode extracted images as 'webp' or 'jpeg',
+                downscaled and without metadata (default: extract as-is)
+            image_max_dimension: Largest width or height of re-encoded images
+            image_quality: Encoder quality of re-encoded images (1-100)
+            image_cache_dir: Directory caching re-encoded images by source hash
+
+        Raises:
+            ValueError: If the image format is unknown
+        """
+        super().__init__()
+        if image_format is not None and image_format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unknown image format: {image_format} (choose from {', '.join(IMAGE_FORMATS)})"
+            )
+        self.page_ranges = page_ranges
+        self.preview = preview
+        self.image_format = image_format
+        self.image_max_dimension = image_max_dimension
+        self.image_quality = image_quality
+        self.image_cache_dir = image_cache_dir
         self.h2t = html2text.HTML2Text()
         self.h2t.ignore_links = False
         self.h2t.ignore_images = False
@@ -75,9 +122,9 @@ class EPUBConverter(BaseConverter):
             file_path: Path to the file to check
 
         Returns:
-            True if file is EPUB format
+            True if the file's content (or, failing that, its suffix) is EPUB
         """
-        return file_path.suffix.lower() in ['.epub']
+        return input_format(file_path) == 'epub'
 
     def convert(
         self,
@@ -100,6 +147,136 @@ class EPUBConverter(BaseConverter):
         """
         self._ensure_output_dir(output_dir)
         
+        processor = None
+        if extract_images and self.image_format:
+            processor = ImageProcessor(
+                self.image_format,
+                self.image_max_dimension,
+                self.image_quality,
+                cache_dir=self.image_cache_dir,
+            )
+        with processor or nullcontext():
+            # Images are re-encoded in the background while the text converts
+            images = ImageExtraction(processor) if processor else None
+            if self.page_ranges is not None or self.preview is not None:
+                markdown_parts = self._convert_spine_selection(
+                    input_path, output_dir, extract_images, clean_headers, images
+                )
+            else:
+                markdown_parts = self._convert_book(
+                    input_path, output_dir, extract_images, clean_headers, images
+                )
+            markdown = '\n'.join(markdown_parts)
+            
+            if images:
+                images_dir = output_dir / "images"
+                images_dir.mkdir(exist_ok=True)
+                markdown = images.finish(
+                    markdown, lambda name, data: self._write_atomic(images_dir / name, data)
+                )
+        
+        # Write the markdown file
+        output_path = self._get_output_path(input_path, output_dir)
+        self._write_atomic(output_path, markdown)
+        self.markdown = markdown
+        
+        return output_path
+
+    def _frontmatter(self, title: Optional[str], author: Optional[str]) -> List[str]:
+        """
+        Build the YAML frontmatter lines.
+
+        Args:
+            title: Book title, if known
+            author: Book author, if known
+
+        Returns:
+            List of frontmatter lines followed by a blank line
+        """
+        lines = ["---"]
+        if title:
+            lines.append(f"title: {title}")
+        if author:
+            lines.append(f"author: {author}")
+        lines.append("status: draft")
+        lines.append("---")
+        lines.append("")
+        return lines
+
+    def _image_archive_path(self, item_path: str, src: Optional[str]) -> Optional[str]:
+        """
+        Resolve an image reference to its path inside the book.
+
+        Args:
+            item_path: Archive path of the document containing the reference
+            src: Value of the reference
+
+        Returns:
+            Archive path of the image, or None for external or empty references
+        """
+        if not src or '://' in src or src.startswith('data:'):
+            return None
+        return posixpath.normpath(posixpath.join(posixpath.dirname(item_path), unquote(src)))
+
+    def _document_to_markdown(
+        self,
+        content: bytes,
+        clean_headers: bool,
+        item_path: str = '',
+        images: Optional[ImageExtraction] = None,
+    ) -> str:
+        """
+        Convert one XHTML document from the book to Markdown.
+
+        Args:
+            content: Raw XHTML content
+            clean_headers: Whether to clean/normalize headers
+            item_path: Archive path of the document, for resolving image links
+            images: Extraction whose placeholders replace image links
+
+        Returns:
+            Markdown text for the document
+        """
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        if images:
+            for tag in soup.find_all('img'):
+                image_path = self._image_archive_path(item_path, tag.get('src'))
+                if image_path:
+                    tag['src'] = images.link(image_path, tag['src'])
+        
+        if clean_headers:
+            # Normalize headers
+            for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+                tag.string = tag.get_text().strip()
+        
+        # Convert to markdown
+        html_content = str(soup)
+        markdown_content = self.h2t.handle(html_content)
+        # Add line breaks between list items
+        return self._add_list_line_breaks(markdown_content)
+
+    def _convert_book(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        extract_images: bool,
+        clean_headers: bool,
+        images: Optional[ImageExtraction] = None,
+    ) -> List[str]:
+        """
+        Convert every document in the book, loading it fully with ebooklib.
+
+        Args:
+            input_path: Path to the EPUB file
+            output_dir: Directory for extracted images
+            extract_images: Whether to extract and save images
+            clean_headers: Whether to clean/normalize headers
+            images: Extraction that processes the images instead of saving them as-is
+
+        Returns:
+            List of Markdown parts, including frontmatter
+        """
         # Read the EPUB file
         book = epub.read_epub(str(input_path))
         
@@ -108,50 +285,115 @@ class EPUBConverter(BaseConverter):
         author = book.get_metadata('DC', 'creator')
         
         # Build markdown content
-        markdown_parts = []
-        
-        # Add frontmatter
-        markdown_parts.append("---")
-        if title:
-            markdown_parts.append(f"title: {title[0][0]}")
-        if author:
-            markdown_parts.append(f"author: {author[0][0]}")
-        markdown_parts.append("status: draft")
-        markdown_parts.append("---")
-        markdown_parts.append("")
+        markdown_parts = self._frontmatter(
+            title[0][0] if title else None,
+            author[0][0] if author else None,
+        )
         
-        # Process each document item in the book
+        # Process each document item in the book; the navigation document
+        # only repeats the table of contents
         for item in book.get_items():
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
+            if item.get_type() == ebooklib.ITEM_DOCUMENT and not isinstance(item, epub.EpubNav):
                 # Convert HTML to text
-                content = item.get_content()
-                soup = BeautifulSoup(content, 'html.parser')
-                
-                if clean_headers:
-                    # Normalize headers
-                    for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        tag.string = tag.get_text().strip()
-                
-                # Convert to markdown
-                html_content = str(soup)
-                markdown_content = self.h2t.handle(html_content)
-                # Add line breaks between list items
-                markdown_content = self._add_list_line_breaks(markdown_content)
-                markdown_parts.append(markdown_content)
+                markdown_parts.append(self._document_to_markdown(
+                    item.get_content(), clean_headers, item.get_name(), images
+                ))
                 markdown_parts.append("")
             
+            elif images and item.get_type() == ebooklib.ITEM_IMAGE:
+                images.add(item.get_name(), item.get_content())
+            
             elif extract_images and item.get_type() == ebooklib.ITEM_IMAGE:
                 # Extract images if requested
                 images_dir = output_dir / "images"
                 images_dir.mkdir(exist_ok=True)
                 
                 image_path = images_dir / item.get_name().split('/')[-1]
-                with open(image_path, 'wb') as f:
-                    f.write(item.get_content())
+                self._write_atomic(image_path, item.get_content())
         
-        # Write the markdown file
-        output_path = self._get_output_path(input_path, output_dir)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(markdown_parts))
+        return markdown_parts
+
+    def _convert_spine_selection(
+        self,
+        input_path: Path,
+        output_dir: Path,
+        extract_images: bool,
+        clean_headers: bool,
+        images: Optional[ImageExtraction] = None,
+    ) -> List[str]:
+        """
+        Convert only the selected spine items, reading them lazily from the zip.
+
+        Only the package document and the selected items are read, so a
+        preview of a large book does not pay for loading the whole archive.
+        Items are numbered among the documents a full conversion converts,
+        so the navigation document and non-XHTML items are skipped.
+        Images are extracted only when referenced by a converted item.
+
+        Args:
+            input_path: Path to the EPUB file
+            output_dir: Directory for extracted images
+            extract_images: Whether to extract and save images
+            clean_headers: Whether to clean/normalize headers
+            images: Extraction that processes the images instead of saving them as-is
+
+        Returns:
+            List of Markdown parts, including frontmatter
+        """
+        with EPUBPackage(input_path) as package:
+            markdown_parts = self._frontmatter(
+                package.get_metadata('title'), package.get_metadata('creator')
+            )
+            
+            for document_index in select_pages(
+                len(package.documents), self.page_ranges, self.preview
+            ):
+                item_path = package.documents[document_index]
+                content = package.read(item_path)
+                markdown_parts.append(
+                    self._document_to_markdown(content, clean_headers, item_path, images)
+                )
+                markdown_parts.append("")
+                
+                if extract_images:
+                    self._extract_referenced_images(
+                        package, item_path, content, output_dir, images
+                    )
         
-        return output_path
+        return markdown_parts
+
+    def _extract_referenced_images(
+        self,
+        package: EPUBPackage,
+        item_path: str,
+        content: bytes,
+        output_dir: Path,
+        images: Optional[ImageExtraction] = None,
+    ) -> None:
+        """
+        Save the images referenced by one spine item.
+
+        Args:
+            package: Open EPUB package
+            item_path: Archive path of the spine item
+            content: Raw XHTML content of the spine item
+            output_dir: Directory for extracted images
+            images: Extraction that processes the images instead of saving them as-is
+        """
+        images_dir = output_dir / "images"
+        images_dir.mkdir(exist_ok=True)
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        for tag in soup.find_all(['img', 'image']):
+            src = tag.get('src') or tag.get('xlink:href') or tag.get('href')
+            image_path = self._image_archive_path(item_path, src)
+            if not image_path:
+                continue
+            try:
+                data = package.read(image_path)
+            except KeyError:
+                continue
+            if images:
+                images.add(image_path, data)
+            else:
+                self._write_atomic(images_dir / image_path.split('/')[-1], data)
@@ -0,0 +1,128 @@
+"""Lightweight EPUB package reader that loads items on demand."""
+
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+CONTAINER_PATH = 'META-INF/container.xml'
+
+XHTML_MEDIA_TYPE = 'application/xhtml+xml'
+
+NAMESPACES = {
+    'container': 'urn:oasis:names:tc:opendocument:xmlns:container',
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+
+
+class EPUBPackage:
+    """
+    Read an EPUB's package document without loading its content.
+
+    Unlike ``ebooklib.epub.read_epub``, which reads every item into memory,
+    only the container and OPF files are parsed up front; spine documents
+    and images are read from the zip when asked for.
+    """
+
+    def __init__(self, input_path: Path):
+        """
+        Open an EPUB file and parse its package document.
+
+        Args:
+            input_path: Path to the EPUB file
+
+        Raises:
+            ValueError: If the file is not a valid EPUB container
+        """
+        self.input_path = input_path
+        self.zip = zipfile.ZipFile(input_path)
+        try:
+            self._parse_package()
+        except (KeyError, ET.ParseError, AttributeError) as e:
+            self.zip.close()
+            raise ValueError(f"Invalid EPUB package in {input_path}: {e}")
+
+    def __enter__(self) -> 'EPUBPackage':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying zip file."""
+        self.zip.close()
+
+    def _parse_package(self) -> None:
+        """Locate the OPF file and read its metadata, manifest and spine."""
+        container = ET.fromstring(self.zip.read(CONTAINER_PATH))
+        rootfile = container.find('.//container:rootfile', NAMESPACES)
+        self.opf_path = rootfile.get('full-path')
+        opf_dir = posixpath.dirname(self.opf_path)
+
+        package = ET.fromstring(self.zip.read(self.opf_path))
+        self.metadata: Dict[str, List[str]] = {}
+        cover_id = None
+        metadata = package.find('opf:metadata', NAMESPACES)
+        if metadata is not None:
+            for element in metadata:
+                if element.tag.startswith(f"{{{NAMESPACES['dc']}}}") and element.text:
+                    name = element.tag.split('}', 1)[1]
+                    self.metadata.setdefault(name, []).append(element.text.strip())
+                elif element.tag == f"{{{NAMESPACES['opf']}}}meta" and element.get('name') == 'cover':
+                    # EPUB 2 cover: <meta name="cover" content="manifest-id"/>
+                    cover_id = element.get('content')
+
+        # Manifest id -> (zip path, media type)
+        self.manifest: Dict[str, tuple] = {}
+        self.cover_path: Optional[str] = None
+        self.nav_path: Optional[str] = None
+        for item in package.iterfind('opf:manifest/opf:item', NAMESPACES):
+            href = posixpath.normpath(posixpath.join(opf_dir, unquote(item.get('href', ''))))
+            self.manifest[item.get('id')] = (href, item.get('media-type', ''))
+            properties = item.get('properties', '').split()
+            if 'cover-image' in properties:
+                self.cover_path = href
+            if 'nav' in properties:
+                self.nav_path = href
+        if self.cover_path is None and cover_id in self.manifest:
+            self.cover_path = self.manifest[cover_id][0]
+
+        spine = [
+            self.manifest[itemref.get('idref')]
+            for itemref in package.iterfind('opf:spine/opf:itemref', NAMESPACES)
+            if itemref.get('idref') in self.manifest
+        ]
+        self.spine: List[str] = [path for path, _ in spine]
+        # Spine items converted to Markdown: XHTML content, not the navigation document
+        self.documents: List[str] = [
+            path for path, media_type in spine
+            if media_type == XHTML_MEDIA_TYPE and path != self.nav_path
+        ]
+
+    def get_metadata(self, name: str) -> Optional[str]:
+        """
+        Get the first Dublin Core metadata value with the given name.
+
+        Args:
+            name: Dublin Core element name (e.g. 'title', 'creator')
+
+        Returns:
+            The value, or None if the element is absent
+        """
+        values = self.metadata.get(name)
+        return values[0] if values else None
+
+    def read(self, path: str) -> bytes:
+        """
+        Read a file from the EPUB archive.
+
+        Args:
+            path: Path of the file inside the archive
+
+        Returns:
+            Raw file content
+        """
+        return self.zip.read(path)
@@ -0,0 +1,182 @@
+"""Persistent index of installed font files."""
+
+import json
+import os
+import platform
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .output_files import write_atomic
+
+FONT_SUFFIXES = {'.ttf', '.otf', '.ttc', '.dfont'}
+INDEX_VERSION = 1
+
+# Indexes already loaded and validated by this process, keyed by (dirs, index path)
+_LOADED: Dict[Tuple[Tuple[str, ...], Optional[str]], 'FontIndex'] = {}
+
+
+def default_font_dirs() -> List[Path]:
+    """
+    Get the standard font directories of the current platform.
+
+    Returns:
+        List of font directories (some may not exist)
+    """
+    system = platform.system()
+    if system == 'Darwin':
+        return [
+            Path.home() / 'Library' / 'Fonts',
+            Path('/Library/Fonts'),
+            Path('/System/Library/Fonts'),
+        ]
+    if system == 'Windows':
+        return [Path(os.environ.get('WINDIR', 'C:\\Windows')) / 'Fonts']
+    return [
+        Path.home() / '.local' / 'share' / 'fonts',
+        Path.home() / '.fonts',
+        Path('/usr/local/share/fonts'),
+        Path('/usr/share/fonts'),
+    ]
+
+
+def font_family(file_name: str) -> str:
+    """
+    Guess a font's family from its file name.
+
+    Args:
+        file_name: Font file name such as ``Literata-BoldItalic.ttf``
+
+    Returns:
+        Family name such as ``Literata``
+    """
+    stem = Path(file_name).stem
+    return stem.split('-')[0].split('_')[0].strip() or stem
+
+
+class FontIndex:
+    """
+    Index of font files (name → file, family) across font directories.
+
+    The index is saved as JSON together with the modification time of
+    every directory it covers. Loading it only stats those directories;
+    the font trees are walked again only when one of them changed, so
+    repeated font checks in any process are cheap.
+    """
+
+    def __init__(self, font_dirs: Iterable[Path], index_path: Optional[Path] = None):
+        """
+        Initialize the index.
+
+        Args:
+            font_dirs: Directories to search recursively for fonts
+            index_path: JSON file to persist the index in (memory only if None)
+        """
+        self.font_dirs = [Path(font_dir) for font_dir in font_dirs]
+        self.index_path = index_path
+        self.fonts: Dict[str, Dict[str, str]] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+
+    @classmethod
+    def load(cls, font_dirs: Iterable[Path], index_path: Optional[Path] = None) -> 'FontIndex':
+        """
+        Get an up-to-date index, reusing the saved one when it is still valid.
+
+        Args:
+            font_dirs: Directories to search recursively for fonts
+            index_path: JSON file to persist the index in (memory only if None)
+
+        Returns:
+            FontIndex for the given directories
+        """
+        font_dirs = [Path(font_dir) for font_dir in font_dirs]
+        memo_key = (tuple(str(font_dir) for font_dir in font_dirs),
+                    str(index_path) if index_path else None)
+        if memo_key in _LOADED:
+            return _LOADED[memo_key]
+
+        index = cls(font_dirs, index_path)
+        if not index._read() or index._is_stale():
+            index.rebuild()
+        _LOADED[memo_key] = index
+        return index
+
+    def _read(self) -> bool:
+        """Load the saved index if it covers the same directories."""
+        if self.index_path is None:
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (data.get('version') != INDEX_VERSION
+                or data.get('font_dirs') != [str(font_dir) for font_dir in self.font_dirs]):
+            return False
+        self.fonts = data['fonts']
+        self._dir_mtimes = data['dir_mtimes']
+        return True
+
+    def _is_stale(self) -> bool:
+        """Check whether any indexed directory was added, removed or changed."""
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        # A font directory that did not exist at indexing time may exist now
+        return any(str(font_dir) not in self._dir_mtimes and font_dir.is_dir()
+                   for font_dir in self.font_dirs)
+
+    def rebuild(self) -> None:
+        """Walk the font directories and save the new index."""
+        self.fonts = {}
+        self._dir_mtimes = {}
+        for font_dir in self.font_dirs:
+            if not font_dir.is_dir():
+                continue
+            for root, _dirs, files in os.walk(font_dir):
+                self._dir_mtimes[root] = os.stat(root).st_mtime_ns
+                for name in files:
+                    if Path(name).suffix.lower() in FONT_SUFFIXES:
+                        self.fonts.setdefault(name.lower(), {
+                            'path': os.path.join(root, name),
+                            'family': font_family(name),
+                        })
+        self._write()
+
+    def _write(self) -> None:
+        """Save the index atomically so concurrent processes never read a partial file."""
+        if self.index_path is None:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'font_dirs': [str(font_dir) for font_dir in self.font_dirs],
+            'dir_mtimes': self._dir_mtimes,
+            'fonts': self.fonts,
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(self.index_path, json.dumps(data))
+        except OSError:
+            # An unsaved index is only slower next time
+            pass
+
+    def find(self, font_name: str) -> Optional[Path]:
+        """
+        Find a font file by family or file name.
+
+        Args:
+            font_name: Font name such as ``Literata`` (case-insensitive)
+
+        Returns:
+            Path to a matching font file, or None if not installed
+        """
+        wanted = font_name.lower()
+        for font in self.fonts.values():
+            if font['family'].lower() == wanted:
+                return Path(font['path'])
+        for name, font in self.fonts.items():
+            if wanted in name:
+                return Path(font['path'])
+        return None
@@ -0,0 +1,252 @@
+"""Downscaling and transcoding of extracted images.
+
+Books often embed multi-megabyte PNG scans and full-resolution covers that
+are far larger than any page displays them. ``ImageProcessor`` shrinks
+them to a maximum dimension, re-encodes them as WebP or JPEG and drops
+their metadata. Pillow releases the GIL while decoding, resizing and
+encoding, so the work runs on a thread pool alongside the text conversion.
+Results are cached by source hash, so re-running a batch does not encode
+the same image twice.
+"""
+
+import io
+import os
+import posixpath
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from PIL import Image, ImageOps
+
+from .cache import ImageCache
+
+IMAGE_FORMATS = ['webp', 'jpeg']
+
+DEFAULT_MAX_DIMENSION = 1600
+DEFAULT_QUALITY = 80
+
+# Formats Pillow decodes; anything else (e.g. SVG) is extracted unchanged
+RASTER_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+
+FORMAT_SUFFIXES = {'webp': '.webp', 'jpeg': '.jpg'}
+
+# Stands in for an image link until the image's final file name is known
+PLACEHOLDER_PREFIX = 'conversion-image-placeholder-'
+PLACEHOLDER_PATTERN = re.compile(re.escape(PLACEHOLDER_PREFIX) + r'(\d+)')
+
+
+def transcode_image(data: bytes, image_format: str, max_dimension: int, quality: int) -> bytes:
+    """
+    Downscale and re-encode one image without its metadata.
+
+    The EXIF orientation is applied to the pixels before the metadata is
+    dropped. Images with transparency are composited onto white for JPEG.
+    Animated images keep only their first frame.
+
+    Args:
+        data: Source image bytes
+        image_format: 'webp' or 'jpeg'
+        max_dimension: Largest width or height in pixels; smaller images
+            are not enlarged
+        quality: Encoder quality from 1 to 100
+
+    Returns:
+        Encoded image bytes
+
+    Raises:
+        OSError: If Pillow cannot decode the image
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        has_alpha = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        if image_format == 'jpeg' and has_alpha:
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        elif image.mode not in ('RGB', 'L') and not (image_format == 'webp' and image.mode == 'RGBA'):
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        output = io.BytesIO()
+        # No exif/icc_profile arguments, so the encoded image carries no metadata
+        image.save(output, format=image_format.upper(), quality=quality, optimize=True)
+        return output.getvalue()
+
+
+class ImageProcessor:
+    """
+    Transcode images on a thread pool, caching results by source hash.
+
+    Used as a context manager, which shuts the thread pool down on exit.
+    """
+
+    def __init__(
+        self,
+        image_format: str = 'webp',
+        max_dimension: int = DEFAULT_MAX_DIMENSION,
+        quality: int = DEFAULT_QUALITY,
+        cache_dir: Optional[Path] = None,
+        workers: Optional[int] = None,
+    ):
+        """
+        Initialize the processor.
+
+        Args:
+            image_format: 'webp' or 'jpeg'
+            max_dimension: Largest width or height in pixels
+            quality: Encoder quality from 1 to 100
+            cache_dir: Directory for cached results (no caching if None)
+            workers: Encoding threads (default: CPU count, at most 4)
+
+        Raises:
+            ValueError: If the format or quality is invalid
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Unknown image format: {image_format} (choose from {', '.join(IMAGE_FORMATS)})"
+            )
+        if not 1 <= quality <= 100:
+            raise ValueError(f"Image quality must be between 1 and 100: {quality}")
+        self.image_format = image_format
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.cache = ImageCache(
+            {'format': image_format, 'max_dimension': max_dimension, 'quality': quality},
+            cache_dir,
+        )
+        self.executor = ThreadPoolExecutor(
+            workers or min(4, os.cpu_count() or 1), thread_name_prefix='image'
+        )
+
+    def __enter__(self) -> 'ImageProcessor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def submit(self, name: str, data: bytes) -> Future:
+        """
+        Schedule an image for processing.
+
+        Args:
+            name: File name of the source image
+            data: Source image bytes
+
+        Returns:
+            Future for the (file name, bytes) to write
+        """
+        return self.executor.submit(self.process, name, data)
+
+    def process(self, name: str, data: bytes) -> Tuple[str, bytes]:
+        """
+        Process one image.
+
+        Images that are not raster formats, that Pillow cannot decode, or
+        that would not get smaller are returned unchanged.
+
+        Args:
+            name: File name of the source image
+            data: Source image bytes
+
+        Returns:
+            Tuple of (file name, bytes) to write
+        """
+        stem, suffix = posixpath.splitext(name)
+        if suffix.lower() not in RASTER_SUFFIXES:
+            return name, data
+        key = self.cache.key(data)
+        encoded = self.cache.get(key)
+        if encoded is None:
+            try:
+                encoded = transcode_image(data, self.image_format, self.max_dimension, self.quality)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                return name, data
+            self.cache.put(key, encoded)
+        if len(encoded) >= len(data):
+            return name, data
+        return stem + FORMAT_SUFFIXES[self.image_format], encoded
+
+
+class ImageExtraction:
+    """
+    The extracted images of one conversion, processed in the background.
+
+    Image links in the converted text are replaced by placeholders while
+    the images are processed, because an image's final file name depends
+    on the result. ``finish`` writes the images and resolves the
+    placeholders to links into the images directory.
+    """
+
+    def __init__(self, processor: ImageProcessor):
+        """
+        Initialize the extraction.
+
+        Args:
+            processor: Processor the images are submitted to
+        """
+        self.processor = processor
+        self._futures: Dict[str, Future] = {}
+        self._links: List[Tuple[str, str]] = []
+
+    def add(self, archive_path: str, data: bytes) -> None:
+        """
+        Submit an image from the book; repeated paths are processed once.
+
+        Args:
+            archive_path: Path of the image inside the book
+            data: Image bytes
+        """
+        if archive_path not in self._futures:
+            self._futures[archive_path] = self.processor.submit(archive_path.split('/')[-1], data)
+
+    def link(self, archive_path: str, src: str) -> str:
+        """
+        Get the placeholder to use for an image link.
+
+        Args:
+            archive_path: Path of the linked image inside the book
+            src: Original link, kept if the image is never extracted
+
+        Returns:
+            Placeholder to put in the link
+        """
+        self._links.append((archive_path, src))
+        return f"{PLACEHOLDER_PREFIX}{len(self._links) - 1}"
+
+    def finish(self, text: str, write: Callable[[str, bytes], None]) -> str:
+        """
+        Write the processed images and resolve the placeholders in the text.
+
+        Args:
+            text: Converted text containing placeholders
+            write: Called with (file name, bytes) for each image, in the
+                order the images were added
+
+        Returns:
+            Text whose image links point into the ``images`` directory
+        """
+        names: Dict[str, str] = {}
+        used = set()
+        for archive_path, future in self._futures.items():
+            name, data = future.result()
+            stem, suffix = posixpath.splitext(name)
+            number = 1
+            while name in used:
+                # Different source images that end up with the same file name
+                number += 1
+                name = f"{stem}-{number}{suffix}"
+            used.add(name)
+            write(name, data)
+            names[archive_path] = name
+
+        def resolve(match: re.Match) -> str:
+            archive_path, src = self._links[int(match.group(1))]
+            name = names.get(archive_path)
+            return f"images/{quote(name)}" if name else src
+
+        return PLACEHOLDER_PATTERN.sub(resolve, text)
@@ -1,33 +1,265 @@
 """Markdown to PDF converter."""
 
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
 import markdown
-from weasyprint import HTML
-import tempfile
+import html
+import os
 import sys
 import platform
 import re
 
+from .anchors import (
+    FENCE_PATTERN,
+    AnchorIndex,
+    heading_plain_text,
+    resolve_internal_links,
+    section_headings,
+)
 from .base_converter import BaseConverter
+from .cache import FragmentCache
+from .font_index import FontIndex, default_font_dirs
+from .render_targets import RENDER_TARGETS, build_epub, replace_image_sources, resolve_images
+from .sniffing import input_format
+
+# Constructs whose rendering depends on the whole document ([TOC] markers,
+# footnote and abbreviation definitions); such documents are not sectioned
+DOCUMENT_SCOPED_PATTERN = re.compile(r'^[ \t]{0,3}(?:\[TOC\]|\[\^[^\]]+\]:|\*\[[^\]]+\]:)')
+REFERENCE_DEFINITION_PATTERN = re.compile(r'^[ ]{0,3}\[[^\]^][^\]]*\]:[ \t]*\S')
+
+# Final-profile styles, shared by every output target (PDF, standalone HTML and EPUB)
+STYLESHEET = """\
+@page {
+    size: A4;
+    margin: 2cm;
+}
+body {
+    font-family: 'Literata', 'Georgia', 'Times New Roman', 'Palatino', 'Baskerville', serif;
+    font-size: 12pt;
+    line-height: 1.6;
+    color: #333;
+    max-width: 800px;
+    margin: 0 auto;
+}
+h1 {
+    font-size: 16pt;
+    margin-top: 0;
+    margin-bottom: 0.5em;
+    color: #1a1a1a;
+    page-break-before: always;
+    page-break-after: avoid;
+    bookmark-level: 1;
+    bookmark-label: content(text);
+}
+h1:first-child {
+    page-break-before: avoid;
+}
+h2 {
+    font-size: 15pt;
+    margin-top: 1em;
+    margin-bottom: 0.5em;
+    color: #1a1a1a;
+    page-break-before: always;
+    page-break-after: avoid;
+    bookmark-level: 2;
+    bookmark-label: content(text);
+}
+h1 + h2 {
+    page-break-before: avoid;
+}
+h3 {
+    font-size: 14pt;
+    margin-top: 1em;
+    margin-bottom: 0.5em;
+    color: #1a1a1a;
+    page-break-before: always;
+    page-break-after: avoid;
+    bookmark-level: 3;
+    bookmark-label: content(text);
+}
+h4, h5, h6 {
+    font-size: 13pt;
+    margin-top: 0.8em;
+    margin-bottom: 0.4em;
+    color: #1a1a1a;
+    page-break-after: avoid;
+}
+p {
+    margin: 0.5em 0;
+    text-align: justify;
+}
+code {
+    font-family: 'Courier New', monospace;
+    background-color: #f4f4f4;
+    padding: 2px 4px;
+    border-radius: 3px;
+    font-size: 0.9em;
+}
+pre {
+    background-color: #f4f4f4;
+    border: 1px solid #ddd;
+    border-radius: 3px;
+    padding: 10px;
+    overflow-x: auto;
+    page-break-inside: avoid;
+}
+pre code {
+    background-color: transparent;
+    padding: 0;
+}
+blockquote {
+    border-left: 4px solid #ddd;
+    padding-left: 1em;
+    margin-left: 0;
+    color: #666;
+    font-style: italic;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 1em 0;
+    page-break-inside: avoid;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: left;
+}
+th {
+    background-color: #f4f4f4;
+    font-weight: bold;
+}
+img {
+    max-width: 100%;
+    height: auto;
+    page-break-inside: avoid;
+}
+ul, ol {
+    margin: 1em 0;
+    padding-left: 2em;
+}
+li {
+    margin-bottom: 0.75em;
+    display: list-item;
+    page-break-inside: avoid;
+    line-height: 1.6;
+    text-align: justify;
+}
+li p {
+    margin: 0;
+    display: block;
+}
+hr {
+    border: none;
+    border-top: 1px solid #ddd;
+    margin: 1.5em 0;
+}
+a {
+    color: #0066cc;
+    text-decoration: none;
+}
+a:hover {
+    text-decoration: none;
+}
+/* Ensure internal links work in PDF */
+a[href^="#"] {
+    color: #0066cc;
+}
+"""
+
+RENDER_PROFILES = ['final', 'draft']
+
+# Draft previews skip the layout work that makes WeasyPrint slow: forced
+# page breaks, keep-together blocks, PDF bookmarks, justification and the
+# font fallback chain
+DRAFT_STYLESHEET_OVERRIDES = """\
+body {
+    font-family: serif;
+}
+h1, h2, h3, h4, h5, h6 {
+    page-break-before: auto;
+    page-break-after: auto;
+    bookmark-level: none;
+}
+p, li {
+    text-align: left;
+}
+pre, table, img, li {
+    page-break-inside: auto;
+}
+"""
 
 
 class MarkdownToPDFConverter(BaseConverter):
-    """Converter for Markdown files to PDF format."""
-
-    def __init__(self):
-        """Initialize the Markdown to PDF converter."""
-        self.md = markdown.Markdown(
-            extensions=[
-                'extra',  # Tables, fenced code blocks, etc.
-                'codehilite',  # Code syntax highlighting
-                'toc',  # Generates [TOC] placeholder for table of contents
-                'meta',  # Metadata support
-                'attr_list',  # Allows ID attributes on headers for internal links
-            ]
+    """
+    Converter for Markdown files to PDF format.
+
+    The document is read, preprocessed and parsed once; the resulting HTML
+    is then written to every requested target (PDF, standalone HTML, EPUB)
+    with the same stylesheet, heading anchors and resolved images.
+    """
+
+    def __init__(
+        self,
+        fragment_cache_dir: Optional[Path] = None,
+        targets: Optional[Sequence[str]] = None,
+        profile: str = 'final',
+        font_dirs: Optional[Sequence[Path]] = None,
+        font_index_path: Optional[Path] = None,
+    ):
+        """
+        Initialize the Markdown to PDF converter.
+
+        Args:
+            fragment_cache_dir: Directory for persistent rendered-section
+                entries (kept in memory only if None)
+            targets: Outputs to produce from each document, any of 'pdf',
+                'html' and 'epub' (default: PDF only)
+            profile: 'final' for publication output, or 'draft' for quick
+                previews without syntax highlighting, bookmarks,
+                justification, page breaks or font checks
+            font_dirs: Directories to look for fonts in (default: the
+                platform's font directories, checked on macOS only)
+            font_index_path: JSON file caching the font index across runs
+                and processes (memory only if None)
+
+        Raises:
+            ValueError: If an unknown target or profile is requested
+        """
+        super().__init__()
+        self.targets = list(targets or ['pdf'])
+        unknown = [target for target in self.targets if target not in RENDER_TARGETS]
+        if unknown:
+            raise ValueError(f"Unknown output target(s): {', '.join(unknown)}")
+        if profile not in RENDER_PROFILES:
+            raise ValueError(
+                f"Unknown render profile '{profile}' (choose from {', '.join(RENDER_PROFILES)})"
+            )
+        self.profile = profile
+        self.font_dirs = list(font_dirs) if font_dirs else None
+        self.font_index_path = font_index_path
+
+        self.extensions = [
+            'extra',  # Tables, fenced code blocks, etc.
+            'codehilite',  # Code syntax highlighting
+            'toc',  # Generates [TOC] placeholder for table of contents
+            'meta',  # Metadata support
+            'attr_list',  # Allows ID attributes on headers for internal links
+        ]
+        self.stylesheet = STYLESHEET
+        if profile == 'draft':
+            self.extensions.remove('codehilite')
+            self.stylesheet += DRAFT_STYLESHEET_OVERRIDES
+
+        self.md = markdown.Markdown(extensions=self.extensions)
+        self.fragment_cache = FragmentCache(
+            {'markdown': markdown.__version__, 'extensions': self.extensions},
+            fragment_cache_dir,
         )
 
-        # Check if Literata font is installed
-        if not self._is_font_installed('Literata'):
+        # Check if Literata font is installed (drafts use the default serif font)
+        if profile == 'final' and not self._is_font_installed('Literata'):
             print("⚠️  Warning: Literata font not found. PDFs will use fallback fonts.", file=sys.stderr)
             print("   Install with: brew install --cask homebrew/cask-fonts/font-literata", file=sys.stderr)
 
@@ -35,29 +267,21 @@ class MarkdownToPDFConverter(BaseConverter):
         """
         Check if a font is installed on the system.
 
+        Uses the persistent font index, so only the first check after a
+        font directory changes walks the font trees.
+
         Args:
             font_name: Name of the font to check
 
         Returns:
             True if font is found, False otherwise
         """
-        if platform.system() == 'Darwin':  # macOS
-            font_dirs = [
-                Path.home() / 'Library' / 'Fonts',
-                Path('/Library/Fonts'),
-                Path('/System/Library/Fonts'),
-            ]
-
-            for font_dir in font_dirs:
-                if font_dir.exists():
-                    # Check for common font file extensions
-                    for ext in ['*.ttf', '*.otf', '*.ttc', '*.dfont']:
-                        for font_file in font_dir.glob(f'**/{ext}'):
-                            if font_name.lower() in font_file.name.lower():
-                                return True
-
-        # For non-macOS systems or if font check fails, return True to avoid false warnings
-        return platform.system() != 'Darwin'
+        if self.font_dirs is None and platform.system() != 'Darwin':
+            # Without configured directories only macOS is checked, to avoid false warnings
+            return True
+
+        index = FontIndex.load(self.font_dirs or default_font_dirs(), self.font_index_path)
+        return index.find(font_name) is not None
 
     def supports_format(self, file_path: Path) -> bool:
         """
@@ -67,22 +291,25 @@ class MarkdownToPDFConverter(BaseConverter):
             file_path: Path to the file to check
 
         Returns:
-            True if file is Markdown format
+            True if the file's content (or, failing that, its suffix) is Markdown
         """
-        return file_path.suffix.lower() in ['.md', '.markdown']
+        return input_format(file_path) == 'markdown'
 
-    def _preprocess_markdown(self, content: str) -> str:
+    def _preprocess_markdown(self, content: str) -> Tuple[str, AnchorIndex]:
         """
         Preprocess markdown content to fix common formatting issues.
 
         Specifically fixes lists that aren't recognized by markdown parser
-        by ensuring there's a blank line before the list starts.
+        by ensuring there's a blank line before the list starts, and gives
+        headings the IDs that the document's internal (TOC) links reference.
+        Every heading's ID is written out so sections render identically
+        on their own.
 
         Args:
             content: Raw markdown content
 
         Returns:
-            Preprocessed markdown content
+            Tuple of (preprocessed markdown content, anchor index)
         """
         # Fix numbered lists by adding blank line before them
         # Markdown requires a blank line before a list for proper parsing
@@ -121,7 +348,88 @@ class MarkdownToPDFConverter(BaseConverter):
             flags=re.MULTILINE
         )
 
-        return content
+        # Build the anchor index and fix headings that links point at under
+        # a different ID (replaces the old fix_headers.py pass)
+        return resolve_internal_links(content, pin_ids=True)
+
+    def _split_sections(self, content: str, index: AnchorIndex) -> List[str]:
+        """
+        Split a document into independently renderable top-level sections.
+
+        Sections start at the headings ``section_headings`` chooses, with
+        any text before the first of them as a section of its own.
+        Reference-style link definitions are appended to every section so
+        links resolve wherever they are defined. Documents with a ``[TOC]``
+        marker, footnotes or abbreviations are returned whole because their
+        rendering depends on the entire document.
+
+        Args:
+            content: Preprocessed Markdown content
+            index: Anchor index of the content
+
+        Returns:
+            List of section sources in document order
+        """
+        if not index.headings:
+            return [content]
+
+        lines = content.split('\n')
+        definitions = []
+        fence = None
+        for line in lines:
+            fence_match = FENCE_PATTERN.match(line)
+            if fence_match:
+                marker = fence_match.group(1)
+                if fence is None:
+                    fence = marker
+                elif marker.startswith(fence):
+                    fence = None
+                continue
+            if fence is not None or '[' not in line:
+                continue
+            if DOCUMENT_SCOPED_PATTERN.match(line):
+                return [content]
+            if REFERENCE_DEFINITION_PATTERN.match(line):
+                definitions.append(line)
+
+        starts = [heading.line_number - 1 for heading in section_headings(index.headings)]
+        if starts[0] > 0:
+            starts.insert(0, 0)
+        ends = starts[1:] + [len(lines)]
+
+        footer = '\n\n' + '\n'.join(definitions) if definitions else ''
+        return ['\n'.join(lines[start:end]) + footer for start, end in zip(starts, ends)]
+
+    def _render_sections(self, content: str, index: AnchorIndex) -> List[str]:
+        """
+        Render preprocessed Markdown to HTML one top-level section at a time.
+
+        Each section's HTML is looked up in the fragment cache by content
+        hash, so after an edit only the changed sections are parsed again.
+        The Markdown instance is reset before every section and after the
+        document so no ``toc``/``meta`` state carries over between files.
+
+        Args:
+            content: Preprocessed Markdown content
+            index: Anchor index of the content
+
+        Returns:
+            HTML of each section in document order
+        """
+        parts = []
+        try:
+            for section in self._split_sections(content, index):
+                key = self.fragment_cache.key(section)
+                section_html = self.fragment_cache.get(key)
+                if section_html is None:
+                    self.md.reset()
+                    section_html = self.md.convert(section)
+                    self.fragment_cache.put(key, section_html)
+                if section_html:
+                    parts.append(section_html)
+        finally:
+            self.md.reset()
+        return parts
 
     def convert(
         self,
@@ -131,21 +439,22 @@ class MarkdownToPDFConverter(BaseConverter):
         clean_headers: bool = False,
     ) -> Path:
         """
-        Convert a Markdown file to PDF format.
+        Convert a Markdown file to PDF and any other configured targets.
 
         Args:
             input_path: Path to the Markdown file
-            output_dir: Directory to save the converted PDF file
+            output_dir: Directory to save the converted files
             extract_images: Not applicable for Markdown to PDF conversion (ignored)
             clean_headers: Not applicable for Markdown to PDF conversion (ignored)
 
         Returns:
-            Path to the generated PDF file
+            Path to the output of the first target; the other targets are
+            written next to it with their own extensions
             
         Raises:
             FileNotFoundError: If the input file doesn't exist
             ValueError: If the Markdown content is invalid
-            Exception: If PDF generation fails
+            Exception: If PDF, HTML or EPUB generation fails
         """
         self._ensure_output_dir(output_dir)
         
@@ -157,184 +466,104 @@ class MarkdownToPDFConverter(BaseConverter):
             raise FileNotFoundError(f"Input file not found: {input_path}")
         except Exception as e:
             raise Exception(f"Error reading file {input_path}: {e}")
+        self.markdown = markdown_content
 
         # Preprocess markdown to fix formatting issues
-        markdown_content = self._preprocess_markdown(markdown_content)
+        markdown_content, anchor_index = self._preprocess_markdown(markdown_content)
 
-        # Convert Markdown to HTML
+        # Convert Markdown to HTML once for every target
         try:
-            html_content = self.md.convert(markdown_content)
+            sections = self._render_sections(markdown_content, anchor_index)
         except Exception as e:
             raise ValueError(f"Error converting Markdown to HTML: {e}")
-        
-        # Create a styled HTML document
-        styled_html = self._create_styled_html(html_content)
-        
-        # Generate output path (change extension to .pdf)
-        output_path = output_dir / f"{input_path.stem}.pdf"
-        
-        # Convert HTML to PDF using WeasyPrint
+        html_content = '\n'.join(sections)
+        images = resolve_images(html_content, input_path.parent)
+        title = (
+            heading_plain_text(anchor_index.headings[0].text)
+            if anchor_index.headings else input_path.stem
+        )
+
+        output_paths = []
+        for target in self.targets:
+            output_path = output_dir / f"{input_path.stem}.{target}"
+            if target == 'pdf':
+                self._write_pdf(output_path, input_path, html_content, images, title)
+            elif target == 'html':
+                self._write_html(output_path, html_content, images, title)
+            else:
+                try:
+                    self._write_atomic(
+                        output_path, build_epub(sections, images, self.stylesheet, title)
+                    )
+                except Exception as e:
+                    raise Exception(f"Error generating EPUB: {e}")
+            output_paths.append(output_path)
+
+        return output_paths[0]
+
+    def _write_pdf(
+        self, output_path: Path, input_path: Path, body_html: str, images: Dict[str, Path], title: str
+    ) -> None:
+        """
+        Render body HTML to a PDF with WeasyPrint.
+
+        Args:
+            output_path: Path of the PDF to write
+            input_path: Markdown source, whose directory is the base URL
+            body_html: Rendered document body
+            images: Local image files keyed by ``src``
+            title: Document title
+        """
+        # Imported here so HTML/EPUB-only runs (e.g. draft previews) skip
+        # loading WeasyPrint and its native libraries
+        from weasyprint import HTML
+
+        sources = {src: path.as_uri() for src, path in images.items()}
+        styled_html = self._create_styled_html(replace_image_sources(body_html, sources), title)
         try:
-            HTML(string=styled_html, base_url=str(input_path.parent)).write_pdf(
-                output_path
-            )
+            pdf = HTML(string=styled_html, base_url=str(input_path.parent)).write_pdf()
         except Exception as e:
             raise Exception(f"Error generating PDF: {e}")
-        
-        return output_path
+        self._write_atomic(output_path, pdf)
+
+    def _write_html(self, output_path: Path, body_html: str, images: Dict[str, Path], title: str) -> None:
+        """
+        Write a standalone HTML page whose images resolve from its own location.
+
+        Args:
+            output_path: Path of the HTML file to write
+            body_html: Rendered document body
+            images: Local image files keyed by ``src``
+            title: Document title
+        """
+        output_dir = output_path.parent.resolve()
+        sources = {
+            src: quote(Path(os.path.relpath(path, output_dir)).as_posix())
+            for src, path in images.items()
+        }
+        self._write_atomic(
+            output_path, self._create_styled_html(replace_image_sources(body_html, sources), title)
+        )
 
-    def _create_styled_html(self, body_html: str) -> str:
+    def _create_styled_html(self, body_html: str, title: Optional[str] = None) -> str:
         """
         Create a styled HTML document from body HTML.
 
         Args:
             body_html: The HTML content for the body
+            title: Document title, if known
 
         Returns:
             Complete HTML document with styling
         """
+        title_element = f"\n    <title>{html.escape(title)}</title>" if title else ''
         return f"""
 <!DOCTYPE html>
 <html>
 <head>
-    <meta charset="UTF-8">
+    <meta charset="UTF-8">{title_element}
     <style>
-        @page {{
-            size: A4;
-            margin: 2cm;
-        }}
-        body {{
-            font-family: 'Literata', 'Georgia', 'Times New Roman', 'Palatino', 'Baskerville', serif;
-            font-size: 12pt;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-        }}
-        h1 {{
-            font-size: 16pt;
-            margin-top: 0;
-            margin-bottom: 0.5em;
-            color: #1a1a1a;
-            page-break-before: always;
-            page-break-after: avoid;
-            bookmark-level: 1;
-            bookmark-label: content(text);
-        }}
-        h1:first-child {{
-            page-break-before: avoid;
-        }}
-        h2 {{
-            font-size: 15pt;
-            margin-top: 1em;
-            margin-bottom: 0.5em;
-            color: #1a1a1a;
-            page-break-before: always;
-            page-break-after: avoid;
-            bookmark-level: 2;
-            bookmark-label: content(text);
-        }}
-        h1 + h2 {{
-            page-break-before: avoid;
-        }}
-        h3 {{
-            font-size: 14pt;
-            margin-top: 1em;
-            margin-bottom: 0.5em;
-            color: #1a1a1a;
-            page-break-before: always;
-            page-break-after: avoid;
-            bookmark-level: 3;
-            bookmark-label: content(text);
-        }}
-        h4, h5, h6 {{
-            font-size: 13pt;
-            margin-top: 0.8em;
-            margin-bottom: 0.4em;
-            color: #1a1a1a;
-            page-break-after: avoid;
-        }}
-        p {{
-            margin: 0.5em 0;
-            text-align: justify;
-        }}
-        code {{
-            font-family: 'Courier New', monospace;
-            background-color: #f4f4f4;
-            padding: 2px 4px;
-            border-radius: 3px;
-            font-size: 0.9em;
-        }}
-        pre {{
-            background-color: #f4f4f4;
-            border: 1px solid #ddd;
-            border-radius: 3px;
-            padding: 10px;
-            overflow-x: auto;
-            page-break-inside: avoid;
-        }}
-        pre code {{
-            background-color: transparent;
-            padding: 0;
-        }}
-        blockquote {{
-            border-left: 4px solid #ddd;
-            padding-left: 1em;
-            margin-left: 0;
-            color: #666;
-            font-style: italic;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            margin: 1em 0;
-            page-break-inside: avoid;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #f4f4f4;
-            font-weight: bold;
-        }}
-        img {{
-            max-width: 100%;
-            height: auto;
-            page-break-inside: avoid;
-        }}
-        ul, ol {{
-            margin: 1em 0;
-            padding-left: 2em;
-        }}
-        li {{
-            margin-bottom: 0.75em;
-            display: list-item;
-            page-break-inside: avoid;
-            line-height: 1.6;
-            text-align: justify;
-        }}
-        li p {{
-            margin: 0;
-            display: block;
-        }}
-        hr {{
-            border: none;
-            border-top: 1px solid #ddd;
-            margin: 1.5em 0;
-        }}
-        a {{
-            color: #0066cc;
-            text-decoration: none;
-        }}
-        a:hover {{
-            text-decoration: none;
-        }}
-        /* Ensure internal links work in PDF */
-        a[href^="#"] {{
-            color: #0066cc;
-        }}
+{self.stylesheet}
     </style>
 </head>
 <body>
@@ -0,0 +1,61 @@
+"""Peak resident-memory measurement for conversions."""
+
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset this process's peak RSS so the next reading covers one document.
+
+    Only Linux supports resetting the high-water mark; elsewhere the peak
+    keeps covering the whole process lifetime.
+
+    Returns:
+        True if the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Get this process's peak resident set size.
+
+    Returns:
+        Peak RSS in bytes, or None if the platform does not report it
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other Unix systems kilobytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def format_bytes(size: int) -> str:
+    """
+    Format a byte count for reports.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        Size such as ``84.2 MB``
+    """
+    return f"{size / (1 << 20):.1f} MB"
@@ -0,0 +1,265 @@
+"""Metadata-only inspection of EPUB, PDF and MOBI files.
+
+Only the parts of each container that hold catalog metadata are read:
+the EPUB container and OPF files, the PDF trailer, Info dictionary and
+page tree, and the MOBI record 0 headers with their EXTH block. No
+chapter text, page content or image is decoded.
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from pypdf import PdfReader
+
+from .epub_package import EPUBPackage
+from .sniffing import preflight, suffix_format
+
+INSPECTED_SUFFIXES = {'.epub', '.pdf', '.mobi', '.azw', '.azw3'}
+
+PALMDB_HEADER_SIZE = 78
+MOBI_HEADER_OFFSET = 16
+
+# EXTH record types (https://wiki.mobileread.com/wiki/MOBI#EXTH_Header)
+EXTH_AUTHOR = 100
+EXTH_PUBLISHER = 101
+EXTH_PUBLISHING_DATE = 106
+EXTH_COVER_OFFSET = 201
+EXTH_UPDATED_TITLE = 503
+EXTH_LANGUAGE = 524
+
+
+def discover_books(paths: Iterable[Path]) -> List[Path]:
+    """
+    Expand files and directories into the list of books to inspect.
+
+    Args:
+        paths: Files or directories; directories are searched recursively
+
+    Returns:
+        Sorted list of EPUB, PDF and MOBI files
+    """
+    found = set()
+    for path in paths:
+        if path.is_dir():
+            for root, _dirs, files in os.walk(path):
+                for name in files:
+                    if Path(name).suffix.lower() in INSPECTED_SUFFIXES:
+                        found.add(Path(root) / name)
+        elif path.suffix.lower() in INSPECTED_SUFFIXES:
+            found.add(path)
+    return sorted(found)
+
+
+def _book_record(path: Path, book_format: str) -> Dict[str, Any]:
+    """Create an empty metadata record for a file."""
+    return {
+        'path': str(path),
+        'format': book_format,
+        'size': path.stat().st_size,
+        'title': None,
+        'authors': [],
+        'language': None,
+        'publisher': None,
+        'date': None,
+        'pages': None,
+        'chapters': None,
+        'cover': None,
+    }
+
+
+def inspect_epub(epub_path: Path) -> Dict[str, Any]:
+    """
+    Read an EPUB's metadata from its OPF package document.
+
+    Args:
+        epub_path: Path to the EPUB file
+
+    Returns:
+        Metadata record; ``chapters`` is the number of spine documents and
+        ``cover`` the cover image's path inside the archive
+
+    Raises:
+        ValueError: If the file is not a valid EPUB container
+    """
+    record = _book_record(epub_path, 'epub')
+    with EPUBPackage(epub_path) as package:
+        record.update(
+            title=package.get_metadata('title'),
+            authors=package.metadata.get('creator', []),
+            language=package.get_metadata('language'),
+            publisher=package.get_metadata('publisher'),
+            date=package.get_metadata('date'),
+            chapters=len(package.spine),
+            cover=package.cover_path,
+        )
+    return record
+
+
+def _pdf_text(value: Any) -> Optional[str]:
+    """Get a PDF metadata string, treating empty values as missing."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def inspect_pdf(pdf_path: Path) -> Dict[str, Any]:
+    """
+    Read a PDF's metadata from its Info dictionary and page tree.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Metadata record; ``chapters`` is the number of top-level outline
+        entries (None without an outline) and ``cover`` is always None
+    """
+    record = _book_record(pdf_path, 'pdf')
+    reader = PdfReader(pdf_path)
+    info = reader.metadata or {}
+    author = _pdf_text(info.get('/Author'))
+    root = reader.trailer['/Root'].get_object()
+    outline = reader.outline if '/Outlines' in root else []
+    record.update(
+        title=_pdf_text(info.get('/Title')),
+        authors=[author] if author else [],
+        language=_pdf_text(root.get('/Lang')),
+        date=_pdf_text(info.get('/CreationDate')),
+        pages=len(reader.pages),
+        chapters=sum(1 for entry in outline if not isinstance(entry, list)) or None,
+    )
+    return record
+
+
+def _read_exth(record0: bytes, header_length: int) -> Dict[int, List[bytes]]:
+    """Parse the EXTH block that follows the MOBI header in record 0."""
+    start = MOBI_HEADER_OFFSET + header_length
+    if record0[start:start + 4] != b'EXTH':
+        return {}
+    count = struct.unpack_from('>I', record0, start + 8)[0]
+    records: Dict[int, List[bytes]] = {}
+    position = start + 12
+    for _ in range(count):
+        if position + 8 > len(record0):
+            break
+        record_type, length = struct.unpack_from('>II', record0, position)
+        if length < 8:
+            break
+        records.setdefault(record_type, []).append(record0[position + 8:position + length])
+        position += length
+    return records
+
+
+def inspect_mobi(mobi_path: Path) -> Dict[str, Any]:
+    """
+    Read a MOBI/AZW file's metadata from its MOBI and EXTH headers.
+
+    Only the PalmDB header and record 0 are read; Calibre is not needed.
+
+    Args:
+        mobi_path: Path to the MOBI file
+
+    Returns:
+        Metadata record; ``cover`` is the PalmDB record holding the cover
+        image (``record:N``)
+
+    Raises:
+        ValueError: If the file has no MOBI header
+    """
+    record = _book_record(mobi_path, 'mobi')
+    with open(mobi_path, 'rb') as f:
+        header = f.read(PALMDB_HEADER_SIZE + 16)
+        if len(header) < PALMDB_HEADER_SIZE + 16:
+            raise ValueError(f"Truncated MOBI file: {mobi_path}")
+        record_count = struct.unpack_from('>H', header, 76)[0]
+        if record_count < 2:
+            raise ValueError(f"Invalid MOBI file (no records): {mobi_path}")
+        record0_start, record1_start = struct.unpack_from('>I4xI', header, PALMDB_HEADER_SIZE)
+        f.seek(record0_start)
+        record0 = f.read(record1_start - record0_start)
+
+    if record0[MOBI_HEADER_OFFSET:MOBI_HEADER_OFFSET + 4] != b'MOBI':
+        raise ValueError(f"Invalid MOBI file (no MOBI header): {mobi_path}")
+    header_length, encoding_id = struct.unpack_from('>I4xI', record0, MOBI_HEADER_OFFSET + 4)
+    encoding = 'utf-8' if encoding_id == 65001 else 'cp1252'
+    name_offset, name_length = struct.unpack_from('>II', record0, 84)
+    first_image = struct.unpack_from('>I', record0, 108)[0]
+    exth_flags = struct.unpack_from('>I', record0, 128)[0]
+    exth = _read_exth(record0, header_length) if exth_flags & 0x40 else {}
+
+    def text(record_type: int) -> Optional[str]:
+        values = exth.get(record_type)
+        if not values:
+            return None
+        return values[0].decode(encoding, errors='replace').strip() or None
+
+    title = text(EXTH_UPDATED_TITLE)
+    if title is None:
+        title = record0[name_offset:name_offset + name_length].decode(encoding, errors='replace')
+    record.update(
+        title=title.strip() or None,
+        authors=[value.decode(encoding, errors='replace').strip()
+                 for value in exth.get(EXTH_AUTHOR, [])],
+        language=text(EXTH_LANGUAGE),
+        publisher=text(EXTH_PUBLISHER),
+        date=text(EXTH_PUBLISHING_DATE),
+    )
+    cover_offset = exth.get(EXTH_COVER_OFFSET)
+    if cover_offset and len(cover_offset[0]) == 4 and first_image != 0xFFFFFFFF:
+        record['cover'] = f"record:{first_image + struct.unpack('>I', cover_offset[0])[0]}"
+    return record
+
+
+def inspect_book(path: Path) -> Dict[str, Any]:
+    """
+    Inspect one book, capturing read errors in the record.
+
+    The format is taken from the file's content, falling back to its
+    suffix, and obviously broken files are reported without being parsed.
+
+    Args:
+        path: Path to an EPUB, PDF or MOBI file
+
+    Returns:
+        Metadata record, with an ``error`` entry if the file could not be read
+    """
+    book_format = suffix_format(path) or path.suffix.lower().lstrip('.')
+    try:
+        book_format = preflight(path)
+        inspect = {'epub': inspect_epub, 'pdf': inspect_pdf, 'mobi': inspect_mobi}.get(book_format)
+        if inspect is None:
+            raise ValueError(f"Unsupported format: {path.suffix}")
+        return inspect(path)
+    except Exception as e:
+        return {'path': str(path), 'format': book_format, 'error': str(e)}
+
+
+def inspect_books(paths: Iterable[Path], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Inspect many books in parallel.
+
+    Args:
+        paths: Files or directories to inspect
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Report dict with a summary and one metadata record per book
+    """
+    files = discover_books(paths)
+    if len(files) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(files) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(inspect_book, files, chunksize=chunksize))
+    else:
+        results = [inspect_book(path) for path in files]
+
+    return {
+        'summary': {
+            'books': len(results),
+            'errors': sum(1 for result in results if 'error' in result),
+        },
+        'books': results,
+    }
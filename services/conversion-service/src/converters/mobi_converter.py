@@ -1,20 +1,78 @@
 """MOBI to Markdown converter."""
 
+import os
+import shutil
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import subprocess
 import tempfile
 
 from .epub_converter import EPUBConverter
 from .base_converter import BaseConverter
+from .image_processing import DEFAULT_MAX_DIMENSION, DEFAULT_QUALITY
+from .page_selection import PageRange
+from .sniffing import FORMAT_SUFFIXES, input_format
+
+
+def ebook_convert_input(input_path: Path, work_dir: Path) -> Path:
+    """
+    Get a path ``ebook-convert`` will read as MOBI.
+
+    ``ebook-convert`` picks its input plugin by file suffix, so a MOBI file
+    recognized by its content under another name is linked (or copied)
+    into the work directory with a .mobi suffix.
+
+    Args:
+        input_path: MOBI/AZW file
+        work_dir: Directory for the link
+
+    Returns:
+        input_path itself if its suffix is already a MOBI suffix, else the link
+    """
+    if input_path.suffix.lower() in FORMAT_SUFFIXES['mobi']:
+        return input_path
+    link = work_dir / f"{input_path.stem}.mobi"
+    try:
+        os.symlink(input_path.resolve(), link)
+    except OSError:
+        shutil.copyfile(input_path, link)
+    return link
 
 
 class MOBIConverter(BaseConverter):
     """Converter for MOBI files to Markdown format."""
 
-    def __init__(self):
-        """Initialize the MOBI converter."""
-        self.epub_converter = EPUBConverter()
+    def __init__(
+        self,
+        page_ranges: Optional[List[PageRange]] = None,
+        preview: Optional[int] = None,
+        image_format: Optional[str] = None,
+        image_max_dimension: int = DEFAULT_MAX_DIMENSION,
+        image_quality: int = DEFAULT_QUALITY,
+        image_cache_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize the MOBI converter.
+
+        Args:
+            page_ranges: 1-based spine item ranges of the intermediate EPUB to convert
+            preview: Convert only the first N selected spine items
+            image_format: Re-encode extracted images as 'webp' or 'jpeg' (default: as-is)
+            image_max_dimension: Largest width or height of re-encoded images
+            image_quality: Encoder quality of re-encoded images (1-100)
+            image_cache_dir: Directory caching re-encoded images by source hash
+        """
+        super().__init__()
+        self.epub_converter = EPUBConverter(
+            page_ranges=page_ranges,
+            preview=preview,
+            image_format=image_format,
+            image_max_dimension=image_max_dimension,
+            image_quality=image_quality,
+            image_cache_dir=image_cache_dir,
+        )
+        # The EPUB converter writes the outputs, so share its record of them
+        self.output_changes = self.epub_converter.output_changes
 
     def supports_format(self, file_path: Path) -> bool:
         """
@@ -24,9 +82,9 @@ class MOBIConverter(BaseConverter):
             file_path: Path to the file to check
 
         Returns:
-            True if file is MOBI format
+            True if the file's content (or, failing that, its suffix) is MOBI
         """
-        return file_path.suffix.lower() in ['.mobi', '.azw', '.azw3']
+        return input_format(file_path) == 'mobi'
 
     def convert(
         self,
@@ -60,7 +118,7 @@ class MOBIConverter(BaseConverter):
             # Convert MOBI to EPUB using ebook-convert (from Calibre)
             try:
                 subprocess.run(
-                    ['ebook-convert', str(input_path), str(epub_path)],
+                    ['ebook-convert', str(ebook_convert_input(input_path, temp_path)), str(epub_path)],
                     check=True,
                     capture_output=True,
                     text=True
@@ -74,9 +132,11 @@ class MOBIConverter(BaseConverter):
                 )
             
             # Convert the EPUB to Markdown
-            return self.epub_converter.convert(
+            output_path = self.epub_converter.convert(
                 epub_path,
                 output_dir,
                 extract_images=extract_images,
                 clean_headers=clean_headers
             )
+            self.markdown = self.epub_converter.markdown
+            return output_path
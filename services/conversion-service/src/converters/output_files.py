@@ -0,0 +1,174 @@
+"""Atomic, write-if-changed output files.
+
+Downstream tools (site syncs, ``make``-style rebuilds, git date extraction)
+treat a file whose mtime moved as changed. Outputs are therefore written to
+a temporary file while their SHA-256 is computed, compared with the file
+already in place, and only renamed over it when the content differs;
+identical outputs are left untouched, mtime included.
+
+``atomic_replace`` is the temporary-file-and-rename primitive underneath;
+caches and indexes use it through ``write_atomic``.
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
+# Process umask, read once so atomically written files get normal permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Bytes read at a time when hashing existing files
+CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """
+    Compute the SHA-256 of a file without loading it into memory.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def matches_file(path: Path, size: int, digest: str) -> bool:
+    """
+    Check whether a file already has the given content.
+
+    Args:
+        path: Existing output
+        size: Size of the new content in bytes
+        digest: SHA-256 hex digest of the new content
+
+    Returns:
+        True if the file exists with the same size and digest
+    """
+    try:
+        if path.stat().st_size != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return file_digest(path) == digest
+
+
+class HashingWriter:
+    """
+    Binary file wrapper that hashes everything written through it.
+
+    Text is encoded as UTF-8, so the same writer serves text and binary
+    outputs.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.changed: Optional[bool] = None
+
+    def write(self, data: Union[str, bytes]) -> int:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.digest.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+
+@contextmanager
+def atomic_replace(
+    path: Path,
+    durable: bool = False,
+    replace_if: Optional[Callable[[], bool]] = None,
+) -> Iterator[BinaryIO]:
+    """
+    Open a temporary file that is renamed over a path when the block exits.
+
+    The temporary file is created next to the target, so the rename is
+    atomic: readers see the old or the new content, never a partial file,
+    and concurrent writers of the same path are safe. If the block raises,
+    the temporary file is removed and the target is left alone.
+
+    Args:
+        path: File to replace
+        durable: fsync the content before the rename
+        replace_if: Called once the block has exited normally; the
+            temporary file is discarded instead if it returns False
+
+    Yields:
+        Binary file to write the new content to
+
+    Raises:
+        OSError: If the temporary file cannot be created or renamed
+    """
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            replace = replace_if is None or replace_if()
+            if replace and durable:
+                f.flush()
+                os.fsync(f.fileno())
+        if replace:
+            os.chmod(temp_name, 0o666 & ~_UMASK)
+            os.replace(temp_name, path)
+        else:
+            os.unlink(temp_name)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def write_atomic(path: Path, data: Union[str, bytes]) -> None:
+    """
+    Replace a file's content atomically.
+
+    Args:
+        path: File to write; its directory must exist
+        data: New content; text is encoded as UTF-8
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    with atomic_replace(path) as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+
+
+@contextmanager
+def open_if_changed(output_path: Path) -> Iterator[HashingWriter]:
+    """
+    Open an output for writing that only replaces the file if its content changed.
+
+    The content goes to a temporary file in the same directory. When the
+    block exits normally, the temporary file is discarded if the existing
+    output has the same SHA-256, and renamed over it otherwise, so an
+    interrupted write never leaves a truncated file that looks complete.
+    ``changed`` is set on the writer once the block has exited.
+
+    Args:
+        output_path: Path of the file to write
+
+    Yields:
+        Writer accepting str or bytes
+    """
+    writer: Optional[HashingWriter] = None
+
+    def changed() -> bool:
+        writer.changed = not matches_file(output_path, writer.size, writer.digest.hexdigest())
+        return writer.changed
+
+    with atomic_replace(output_path, durable=True, replace_if=changed) as f:
+        writer = HashingWriter(f)
+        yield writer
@@ -0,0 +1,74 @@
+"""Page-range parsing and selection for partial conversions."""
+
+from typing import List, Optional, Tuple
+
+PageRange = Tuple[int, Optional[int]]
+
+
+def parse_page_ranges(spec: str) -> List[PageRange]:
+    """
+    Parse a page-range specification such as ``1-20,100-110``.
+
+    Pages are 1-based and ranges are inclusive. A range without an end
+    (``300-``) runs to the last page.
+
+    Args:
+        spec: Comma-separated list of page numbers and ranges
+
+    Returns:
+        List of (start, end) tuples, with end None for open ranges
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    page_ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, separator, end_text = part.partition('-')
+        try:
+            start = int(start_text)
+            end = int(end_text) if end_text.strip() else None
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if not separator:
+            end = start
+        if start < 1 or (end is not None and end < start):
+            raise ValueError(f"Invalid page range: {part}")
+        page_ranges.append((start, end))
+
+    if not page_ranges:
+        raise ValueError(f"Empty page range: {spec!r}")
+    return page_ranges
+
+
+def select_pages(
+    page_count: int,
+    page_ranges: Optional[List[PageRange]] = None,
+    preview: Optional[int] = None,
+) -> List[int]:
+    """
+    Resolve page ranges and a preview limit to concrete page indices.
+
+    Args:
+        page_count: Number of pages (or spine items) in the document
+        page_ranges: Ranges from ``parse_page_ranges``, or None for all pages
+        preview: Keep only the first N selected pages
+
+    Returns:
+        Sorted list of distinct zero-based page indices
+    """
+    if page_ranges is None:
+        indices = range(page_count)
+    else:
+        selected = set()
+        for start, end in page_ranges:
+            last = page_count if end is None else min(end, page_count)
+            selected.update(range(start - 1, last))
+        indices = sorted(selected)
+
+    indices = list(indices)
+    if preview is not None:
+        indices = indices[:preview]
+    return indices
@@ -1,15 +1,59 @@
 """PDF to Markdown converter."""
 
 from pathlib import Path
-from typing import Optional
-import pdfplumber
+from typing import List, Optional
 
 from .base_converter import BaseConverter
+from .checkpoint import PageJournal, get_journal_path
+from .memory import peak_rss, reset_peak_rss
+from .page_selection import PageRange, select_pages
+from .pdf_engines import LayoutEngine, get_engine, sample_page_indices
+from .pdf_headings import estimate_body_size, page_markdown_lines
+from .sniffing import input_format
+
+# Pages sampled to estimate the body font size for heading detection
+BODY_SIZE_SAMPLE_PAGES = 5
+
+# Pages read between document reopens in low-memory mode
+DEFAULT_PAGE_WINDOW = 50
 
 
 class PDFConverter(BaseConverter):
     """Converter for PDF files to Markdown format."""
 
+    def __init__(
+        self,
+        engine: str = 'auto',
+        page_ranges: Optional[List[PageRange]] = None,
+        preview: Optional[int] = None,
+        checkpoint: bool = True,
+        low_memory: bool = False,
+        page_window: int = DEFAULT_PAGE_WINDOW,
+    ):
+        """
+        Initialize the PDF converter.
+
+        Args:
+            engine: Text-extraction engine ('auto', 'fast' or 'layout')
+            page_ranges: 1-based page ranges to convert (default: all pages)
+            preview: Convert only the first N selected pages
+            checkpoint: Journal completed pages next to the output so an
+                interrupted conversion resumes where it stopped
+            low_memory: Release each page after extracting it and reopen the
+                document every ``page_window`` pages, so memory stays flat
+                regardless of page count
+            page_window: Pages read between reopens in low-memory mode
+        """
+        super().__init__()
+        self.engine = engine
+        self.page_ranges = page_ranges
+        self.preview = preview
+        self.checkpoint = checkpoint
+        self.low_memory = low_memory
+        self.page_window = page_window
+        # Peak RSS in bytes of the last conversion, if the platform reports it
+        self.peak_rss = None
+
     def supports_format(self, file_path: Path) -> bool:
         """
         Check if this converter supports the given file format.
@@ -18,9 +62,37 @@ class PDFConverter(BaseConverter):
             file_path: Path to the file to check
 
         Returns:
-            True if file is PDF format
+            True if the file's content (or, failing that, its suffix) is PDF
+        """
+        return input_format(file_path) == 'pdf'
+
+    def _text_lines(self, text: str, clean_headers: bool) -> List[str]:
+        """
+        Format plain page text as Markdown lines.
+
+        Args:
+            text: Text extracted from a page
+            clean_headers: Whether to promote short ALL-CAPS lines to headers
+
+        Returns:
+            List of Markdown lines for the page
         """
-        return file_path.suffix.lower() in ['.pdf']
+        if not text:
+            return []
+        if not clean_headers:
+            return [text]
+
+        # Basic header detection and formatting
+        formatted_lines = []
+        for line in text.split('\n'):
+            line = line.strip()
+            if line:
+                # Simple heuristic: short lines in all caps might be headers
+                if len(line) < 50 and line.isupper():
+                    formatted_lines.append(f"## {line.title()}")
+                else:
+                    formatted_lines.append(line)
+        return formatted_lines
 
     def convert(
         self,
@@ -42,51 +114,99 @@ class PDFConverter(BaseConverter):
             Path to the generated Markdown file
         """
         self._ensure_output_dir(output_dir)
-        
-        markdown_parts = []
-        
-        # Add frontmatter
-        markdown_parts.append("---")
-        markdown_parts.append(f"title: {input_path.stem}")
-        markdown_parts.append("status: draft")
-        markdown_parts.append("---")
-        markdown_parts.append("")
-        
-        # Extract text from PDF
-        with pdfplumber.open(input_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                text = page.extract_text()
-                if text:
-                    if clean_headers:
-                        # Basic header detection and formatting
-                        lines = text.split('\n')
-                        formatted_lines = []
-                        for line in lines:
-                            line = line.strip()
-                            if line:
-                                # Simple heuristic: short lines in all caps might be headers
-                                if len(line) < 50 and line.isupper():
-                                    formatted_lines.append(f"## {line.title()}")
-                                else:
-                                    formatted_lines.append(line)
-                        markdown_parts.extend(formatted_lines)
-                    else:
-                        markdown_parts.append(text)
-                    
-                    markdown_parts.append("")
-                
-                # Extract images if requested
-                if extract_images:
-                    images_dir = output_dir / "images"
-                    images_dir.mkdir(exist_ok=True)
-                    
-                    # Note: pdfplumber doesn't directly extract images
-                    # This would require additional libraries like PyMuPDF
-                    # Left as placeholder for future enhancement
-        
-        # Write the markdown file
+        reset_peak_rss()
+
+        # Font-based heading detection needs pdfplumber's character data, so
+        # auto mode goes straight to the layout engine when headers are cleaned
+        engine_name = 'layout' if clean_headers and self.engine == 'auto' else self.engine
+
         output_path = self._get_output_path(input_path, output_dir)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(markdown_parts))
-        
+        journal = None
+        # The text is kept for the caller, except where that would undo low-memory mode
+        parts = None if self.low_memory else []
+
+        # Extract text from PDF, streaming pages into the output file
+        with get_engine(input_path, engine_name) as engine, \
+                self._open_atomic(output_path) as output:
+            frontmatter = f"---\ntitle: {input_path.stem}\nstatus: draft\n---\n"
+            output.write(frontmatter)
+            if parts is not None:
+                parts.append(frontmatter)
+
+            page_indices = select_pages(engine.page_count, self.page_ranges, self.preview)
+            if self.low_memory:
+                windows = [page_indices[start:start + self.page_window]
+                           for start in range(0, len(page_indices), self.page_window)]
+            else:
+                windows = [page_indices]
+                engine.load_pages(page_indices)
+
+            completed = {}
+            if self.checkpoint:
+                journal = PageJournal(
+                    get_journal_path(output_path),
+                    input_path,
+                    {
+                        'engine': engine.name,
+                        'clean_headers': clean_headers,
+                        'page_ranges': self.page_ranges,
+                        'preview': self.preview,
+                    },
+                )
+                completed = journal.load()
+
+            font_headings = clean_headers and isinstance(engine, LayoutEngine)
+            body_size = None
+            if font_headings and any(index not in completed for index in page_indices):
+                sample = [page_indices[position] for position in
+                          sample_page_indices(len(page_indices), BODY_SIZE_SAMPLE_PAGES)]
+                if self.low_memory:
+                    engine.reopen(sample)
+                body_size = estimate_body_size(engine.get_page(index).chars for index in sample)
+
+            try:
+                for window in windows:
+                    if self.low_memory and any(index not in completed for index in window):
+                        engine.reopen(window)
+                    for page_index in window:
+                        if page_index in completed:
+                            page_lines = completed[page_index]
+                        else:
+                            if font_headings:
+                                page_lines = page_markdown_lines(
+                                    engine.get_page(page_index).chars, body_size
+                                )
+                            else:
+                                page_lines = self._text_lines(
+                                    engine.extract_text(page_index), clean_headers
+                                )
+                            if self.low_memory:
+                                engine.release_page(page_index)
+                            if journal:
+                                journal.append(page_index, page_lines)
+
+                        if page_lines:
+                            page_text = '\n' + '\n'.join(page_lines) + '\n'
+                            output.write(page_text)
+                            if parts is not None:
+                                parts.append(page_text)
+
+                        # Extract images if requested
+                        if extract_images:
+                            images_dir = output_dir / "images"
+                            images_dir.mkdir(exist_ok=True)
+
+                            # Note: pdfplumber doesn't directly extract images
+                            # This would require additional libraries like PyMuPDF
+                            # Left as placeholder for future enhancement
+            finally:
+                if journal:
+                    journal.close()
+
+        # The output was renamed into place complete, so drop the journal
+        if journal:
+            journal.discard()
+        self.peak_rss = peak_rss()
+        self.markdown = ''.join(parts) if parts is not None else None
+
         return output_path
@@ -0,0 +1,275 @@
+"""Text-extraction engines for the PDF converter."""
+
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+from pypdf import PdfReader
+
+ENGINE_CHOICES = ['auto', 'fast', 'layout']
+
+# Number of pages sampled by auto mode before committing to an engine
+AUTO_SAMPLE_PAGES = 3
+
+# Fast-engine text is rejected when fewer than this share of its characters are
+# whitespace, which is how pypdf output looks when it glues words together
+MIN_WHITESPACE_RATIO = 0.08
+
+
+class PDFTextEngine(ABC):
+    """
+    Base class for PDF text-extraction engines.
+
+    An engine is opened once per document and used as a context manager.
+    Pages are addressed by zero-based index so callers can extract any
+    subset of pages without walking the whole document.
+    """
+
+    name = ''
+
+    def __init__(self, input_path: Path):
+        """
+        Initialize the engine for a document.
+
+        Args:
+            input_path: Path to the PDF file
+        """
+        self.input_path = input_path
+
+    def __enter__(self) -> 'PDFTextEngine':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @abstractmethod
+    def open(self) -> None:
+        """Open the underlying PDF document."""
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the underlying PDF document."""
+        pass
+
+    @property
+    @abstractmethod
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+        pass
+
+    def load_pages(self, page_indices: List[int]) -> None:  # noqa: B027
+        """
+        Declare which pages will be read so the engine can skip the rest.
+
+        Must be called before the first page is accessed. Engines that
+        already load pages lazily ignore it.
+
+        Args:
+            page_indices: Zero-based indices of the pages to load
+        """
+        pass
+
+    def release_page(self, page_index: int) -> None:  # noqa: B027
+        """
+        Drop the parsed objects of a page that will not be read again.
+
+        Args:
+            page_index: Zero-based page index
+        """
+        pass
+
+    def reopen(self, page_indices: List[int]) -> None:
+        """
+        Reopen the document, dropping everything parsed so far.
+
+        Parsers cache resolved objects for the whole document, so
+        long documents are read in windows of pages with a reopen
+        between windows to keep memory bounded.
+
+        Args:
+            page_indices: Zero-based indices of the pages the next window reads
+        """
+        self.close()
+        self.open()
+        self.load_pages(page_indices)
+
+    @abstractmethod
+    def extract_text(self, page_index: int) -> str:
+        """
+        Extract the text of a single page.
+
+        Args:
+            page_index: Zero-based page index
+
+        Returns:
+            Page text, or an empty string if the page has no text
+        """
+        pass
+
+
+class LayoutEngine(PDFTextEngine):
+    """Engine backed by pdfplumber's full layout analysis."""
+
+    name = 'layout'
+
+    def open(self) -> None:
+        self.pdf = pdfplumber.open(self.input_path)
+        self._pages = None
+
+    def close(self) -> None:
+        self.pdf.close()
+
+    @property
+    def page_count(self) -> int:
+        # Read the page tree's count rather than building every Page object
+        try:
+            return int(resolve1(self.pdf.doc.catalog['Pages'])['Count'])
+        except (KeyError, TypeError, ValueError):
+            return len(self.pdf.pages)
+
+    def load_pages(self, page_indices: List[int]) -> None:
+        if self._pages is None:
+            self.pdf.pages_to_parse = {index + 1 for index in page_indices}
+
+    def get_page(self, page_index: int):
+        """
+        Get the pdfplumber page object for a page.
+
+        Args:
+            page_index: Zero-based page index
+
+        Returns:
+            pdfplumber Page instance
+        """
+        if self._pages is None:
+            self._pages = {page.page_number - 1: page for page in self.pdf.pages}
+        return self._pages[page_index]
+
+    def release_page(self, page_index: int) -> None:
+        if self._pages is not None and page_index in self._pages:
+            # Flushes the page's cached layout objects and text map
+            self._pages.pop(page_index).close()
+
+    def extract_text(self, page_index: int) -> str:
+        return self.get_page(page_index).extract_text() or ''
+
+
+class FastEngine(PDFTextEngine):
+    """Engine backed by pypdf's raw content-stream text extraction."""
+
+    name = 'fast'
+
+    def open(self) -> None:
+        self._file = open(self.input_path, 'rb')
+        self.reader = PdfReader(self._file)
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+    def reopen(self, page_indices: List[int]) -> None:
+        # pypdf decodes content streams per call and keeps only the xref and
+        # page tree, so memory is already flat; reopening would only re-parse
+        self.load_pages(page_indices)
+
+    def extract_text(self, page_index: int) -> str:
+        text = self.reader.pages[page_index].extract_text() or ''
+        # Justified lines come back padded with runs of spaces
+        return re.sub(r'(?<=\S) {2,}(?=\S)', ' ', text)
+
+
+ENGINES = {
+    LayoutEngine.name: LayoutEngine,
+    FastEngine.name: FastEngine,
+}
+
+
+def sample_page_indices(page_count: int, sample_size: int = AUTO_SAMPLE_PAGES) -> List[int]:
+    """
+    Pick evenly spaced page indices across a document.
+
+    Args:
+        page_count: Number of pages in the document
+        sample_size: Maximum number of pages to pick
+
+    Returns:
+        Sorted list of distinct zero-based page indices
+    """
+    if page_count <= sample_size:
+        return list(range(page_count))
+    step = page_count / sample_size
+    return sorted({int(step * i + step / 2) for i in range(sample_size)})
+
+
+def _fast_text_is_usable(text: str) -> bool:
+    """
+    Decide whether text from the fast engine is good enough to keep.
+
+    Args:
+        text: Concatenated fast-engine text of the sampled pages
+
+    Returns:
+        True if the text looks like properly spaced, decoded prose
+    """
+    stripped = text.strip()
+    if not stripped:
+        return False
+    if '\ufffd' in stripped or '(cid:' in stripped:
+        return False
+    whitespace = sum(1 for char in stripped if char.isspace())
+    return whitespace / len(stripped) >= MIN_WHITESPACE_RATIO
+
+
+def choose_engine(input_path: Path, sample_size: int = AUTO_SAMPLE_PAGES) -> str:
+    """
+    Pick the extraction engine for a document by sampling a few pages.
+
+    The fast engine is used whenever it yields readable text for the
+    sampled pages; documents with undecodable fonts, glued words or no
+    extractable text fall back to the layout engine.
+
+    Args:
+        input_path: Path to the PDF file
+        sample_size: Number of pages to sample
+
+    Returns:
+        Name of the chosen engine ('fast' or 'layout')
+    """
+    try:
+        with FastEngine(input_path) as engine:
+            indices = sample_page_indices(engine.page_count, sample_size)
+            sample = '\n'.join(engine.extract_text(index) for index in indices)
+    except Exception:
+        return LayoutEngine.name
+
+    return FastEngine.name if _fast_text_is_usable(sample) else LayoutEngine.name
+
+
+def get_engine(input_path: Path, engine: Optional[str] = 'auto') -> PDFTextEngine:
+    """
+    Create the extraction engine for a document.
+
+    Args:
+        input_path: Path to the PDF file
+        engine: One of 'auto', 'fast' or 'layout'
+
+    Returns:
+        Unopened PDFTextEngine instance
+
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    engine = engine or 'auto'
+    if engine == 'auto':
+        engine = choose_engine(input_path)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine} (choose from {', '.join(ENGINE_CHOICES)})")
+    return ENGINES[engine](input_path)
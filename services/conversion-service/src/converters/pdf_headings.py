@@ -0,0 +1,184 @@
+"""Font-statistics heading detection for PDF pages."""
+
+import re
+from operator import itemgetter
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+# Resolution of the font-size histograms, in points
+SIZE_BIN = 0.5
+
+# Characters whose tops differ by less than this many points share a line
+LINE_TOLERANCE = 3.0
+
+# Horizontal gap, as a fraction of the font size, that marks a word break
+WORD_GAP = 0.25
+
+# Lines longer than this are body text regardless of their font
+MAX_HEADING_CHARS = 120
+
+# Bold lines at body size are only headings when they are this short
+MAX_BOLD_HEADING_CHARS = 80
+
+# Minimum size ratio to the body font for each heading level, largest first
+HEADING_LEVELS = [(1.6, '#'), (1.25, '##'), (1.08, '###')]
+
+BOLD_FONT_PATTERN = re.compile(r'bold|black|heavy|semibold|demi', re.IGNORECASE)
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+
+def _char_arrays(chars: List[dict]) -> dict:
+    """
+    Convert pdfplumber char dicts into column arrays.
+
+    Args:
+        chars: pdfplumber ``page.chars`` list
+
+    Returns:
+        Dict of NumPy arrays keyed by 'text', 'size', 'top', 'x0', 'x1' and 'bold'
+    """
+    count = len(chars)
+    arrays = {
+        key: np.fromiter(map(itemgetter(key), chars), dtype=float, count=count)
+        for key in ('size', 'top', 'x0', 'x1')
+    }
+    arrays['text'] = np.array(list(map(itemgetter('text'), chars)), dtype=str)
+
+    # Classify each distinct font once instead of every character
+    fontnames, font_index = np.unique(
+        np.array(list(map(itemgetter('fontname'), chars)), dtype=str), return_inverse=True
+    )
+    font_is_bold = np.array([bool(BOLD_FONT_PATTERN.search(name)) for name in fontnames])
+    arrays['bold'] = font_is_bold[font_index]
+    return arrays
+
+
+def size_histogram(chars: List[dict]) -> np.ndarray:
+    """
+    Count characters per font-size bin.
+
+    Args:
+        chars: pdfplumber ``page.chars`` list
+
+    Returns:
+        Array where index ``i`` holds the number of characters of size ``i * SIZE_BIN``
+    """
+    if not chars:
+        return np.zeros(0, dtype=np.int64)
+    sizes = np.fromiter(map(itemgetter('size'), chars), dtype=float, count=len(chars))
+    return np.bincount(np.rint(sizes / SIZE_BIN).astype(np.int64))
+
+
+def estimate_body_size(char_pages: Iterable[List[dict]]) -> Optional[float]:
+    """
+    Estimate the body font size as the mode of the combined size histogram.
+
+    Args:
+        char_pages: ``page.chars`` lists for a sample of pages
+
+    Returns:
+        Body font size in points, or None if the pages have no characters
+    """
+    histogram = np.zeros(0, dtype=np.int64)
+    for chars in char_pages:
+        page_histogram = size_histogram(chars)
+        if len(page_histogram) > len(histogram):
+            page_histogram[: len(histogram)] += histogram
+            histogram = page_histogram
+        else:
+            histogram[: len(page_histogram)] += page_histogram
+
+    if not histogram.any():
+        return None
+    return float(np.argmax(histogram) * SIZE_BIN)
+
+
+def _group_lines(arrays: dict):
+    """
+    Order characters into reading order and find line boundaries.
+
+    Args:
+        arrays: Column arrays from ``_char_arrays``
+
+    Returns:
+        Tuple of (order, starts) where ``order`` sorts characters by line then
+        x position and ``starts`` holds the index in that order where each line begins
+    """
+    by_top = np.argsort(arrays['top'], kind='stable')
+    new_line = np.diff(arrays['top'][by_top], prepend=-np.inf) > LINE_TOLERANCE
+    line_id = np.empty_like(by_top)
+    line_id[by_top] = np.cumsum(new_line)
+
+    order = np.lexsort((arrays['x0'], line_id))
+    sorted_ids = line_id[order]
+    starts = np.flatnonzero(np.diff(sorted_ids, prepend=-1))
+    return order, starts
+
+
+def page_markdown_lines(chars: List[dict], body_size: Optional[float]) -> List[str]:
+    """
+    Rebuild a page's text lines and mark headings from font statistics.
+
+    Lines noticeably larger than the body font become ``#``, ``##`` or ``###``
+    headings depending on their size ratio, and short fully-bold lines at body
+    size become ``###``. Consecutive heading lines of the same level are
+    merged so wrapped titles stay one heading.
+
+    Args:
+        chars: pdfplumber ``page.chars`` list
+        body_size: Document body font size from ``estimate_body_size``
+
+    Returns:
+        List of Markdown lines for the page
+    """
+    if not chars:
+        return []
+
+    arrays = _char_arrays(chars)
+    order, starts = _group_lines(arrays)
+    text = arrays['text'][order]
+    size = arrays['size'][order]
+    bold = arrays['bold'][order]
+    x0 = arrays['x0'][order]
+    x1 = arrays['x1'][order]
+
+    # Insert spaces where the gap to the previous glyph on the line is wide
+    gap = np.r_[0.0, x0[1:] - x1[:-1]]
+    line_start = np.zeros(len(text), dtype=bool)
+    line_start[starts] = True
+    needs_space = (gap > WORD_GAP * size) & ~line_start
+    text = np.char.add(np.where(needs_space, ' ', ''), text)
+
+    counts = np.diff(np.r_[starts, len(text)])
+    line_size = np.add.reduceat(size, starts) / counts
+    bold_share = np.add.reduceat(bold.astype(float), starts) / counts
+
+    pieces = text.tolist()
+    ends = np.r_[starts[1:], len(text)]
+    line_texts = [' '.join(''.join(pieces[start:end]).split()) for start, end in zip(starts, ends)]
+    lengths = np.fromiter(map(len, line_texts), dtype=np.int64, count=len(line_texts))
+
+    levels = np.full(len(line_texts), '', dtype=object)
+    if body_size:
+        ratio = line_size / body_size
+        candidate = lengths <= MAX_HEADING_CHARS
+        levels[candidate & (bold_share >= 0.9) & (lengths <= MAX_BOLD_HEADING_CHARS)] = '###'
+        for threshold, marker in reversed(HEADING_LEVELS):
+            levels[candidate & (ratio >= threshold)] = marker
+
+    markdown_lines = []
+    previous_level = ''
+    for line, level in zip(line_texts, levels):
+        if not line:
+            continue
+        if level and not LETTER_PATTERN.search(line):
+            level = ''
+        if level and level == previous_level:
+            markdown_lines[-1] = f"{markdown_lines[-1]} {line}"
+        elif level:
+            markdown_lines.append(f"{level} {line}")
+        else:
+            markdown_lines.append(line)
+        previous_level = level
+    return markdown_lines
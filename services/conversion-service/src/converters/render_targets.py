@@ -0,0 +1,225 @@
+"""Output targets for rendered Markdown: shared image resolution and EPUB packaging."""
+
+import hashlib
+import html
+import io
+import mimetypes
+import os
+import re
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote, urlparse
+
+from ebooklib import epub
+
+RENDER_TARGETS = ['pdf', 'html', 'epub']
+
+IMG_SRC_PATTERN = re.compile(r'(<img\b[^>]*?\ssrc=")([^"]+)(")')
+ELEMENT_ID_PATTERN = re.compile(r'\sid="([^"]+)"')
+INTERNAL_HREF_PATTERN = re.compile(r'(\shref=")#([^"]+)(")')
+HEADING_TEXT_PATTERN = re.compile(r'<h[1-6][^>]*>(.*?)</h[1-6]>', re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Earliest timestamp a ZIP entry can hold (1980-01-01 UTC)
+ZIP_EPOCH = 315532800
+
+
+def parse_targets(spec: str) -> List[str]:
+    """
+    Parse a comma-separated list of render targets.
+
+    Args:
+        spec: Target list such as ``pdf,html,epub``
+
+    Returns:
+        Targets in the given order without duplicates
+
+    Raises:
+        ValueError: If the list is empty or names an unknown target
+    """
+    targets = []
+    for target in (part.strip().lower() for part in spec.split(',')):
+        if target not in RENDER_TARGETS:
+            raise ValueError(
+                f"Unknown output target '{target}' (choose from {', '.join(RENDER_TARGETS)})"
+            )
+        if target not in targets:
+            targets.append(target)
+    return targets
+
+
+def resolve_images(body_html: str, base_dir: Path) -> Dict[str, Path]:
+    """
+    Find the local image files referenced by rendered HTML.
+
+    Args:
+        body_html: Rendered HTML
+        base_dir: Directory relative image paths are resolved against
+
+    Returns:
+        Dict mapping each ``src`` attribute value to an existing file
+    """
+    images = {}
+    for match in IMG_SRC_PATTERN.finditer(body_html):
+        src = match.group(2)
+        if src in images:
+            continue
+        parsed = urlparse(html.unescape(src))
+        if parsed.scheme == 'file':
+            path = Path(unquote(parsed.path))
+        elif parsed.scheme or parsed.netloc:
+            continue
+        else:
+            path = base_dir / unquote(parsed.path)
+        if path.is_file():
+            images[src] = path.resolve()
+    return images
+
+
+def replace_image_sources(body_html: str, sources: Dict[str, str]) -> str:
+    """
+    Point ``<img>`` elements at new locations.
+
+    Args:
+        body_html: Rendered HTML
+        sources: New ``src`` values keyed by the current ones
+
+    Returns:
+        HTML with the image sources replaced
+    """
+    if not sources:
+        return body_html
+
+    def replace(match):
+        src = sources.get(match.group(2))
+        return match.group(0) if src is None else match.group(1) + src + match.group(3)
+
+    return IMG_SRC_PATTERN.sub(replace, body_html)
+
+
+def _section_title(section_html: str, default: str) -> str:
+    """Get the plain text of the first heading in a section."""
+    match = HEADING_TEXT_PATTERN.search(section_html)
+    if not match:
+        return default
+    return html.unescape(TAG_PATTERN.sub('', match.group(1))).strip() or default
+
+
+def build_timestamp() -> datetime:
+    """
+    Get the timestamp recorded inside packaged outputs.
+
+    A fixed timestamp keeps rebuilds of unchanged content byte-identical.
+    ``SOURCE_DATE_EPOCH`` overrides it, as for other reproducible builds.
+
+    Returns:
+        UTC timestamp, no earlier than 1980-01-01
+    """
+    try:
+        epoch = int(os.environ.get('SOURCE_DATE_EPOCH', ZIP_EPOCH))
+    except ValueError:
+        epoch = ZIP_EPOCH
+    return datetime.fromtimestamp(max(epoch, ZIP_EPOCH), timezone.utc)
+
+
+def _normalize_zip(data: bytes, timestamp: datetime) -> bytes:
+    """
+    Rewrite a ZIP archive with the same timestamp on every entry.
+
+    Args:
+        data: Archive whose entries carry the time they were written
+        timestamp: Time to record instead
+
+    Returns:
+        Archive with the same entries, order and compression
+    """
+    date_time = timestamp.timetuple()[:6]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as source, zipfile.ZipFile(buffer, 'w') as target:
+        for info in source.infolist():
+            entry = zipfile.ZipInfo(info.filename, date_time)
+            entry.compress_type = info.compress_type
+            entry.external_attr = info.external_attr
+            target.writestr(entry, source.read(info))
+    return buffer.getvalue()
+
+
+def build_epub(
+    sections: List[str],
+    images: Dict[str, Path],
+    stylesheet: str,
+    title: str,
+    author: Optional[str] = None,
+) -> bytes:
+    """
+    Package rendered sections as an EPUB book with one chapter per section.
+
+    Internal ``#anchor`` links are rewritten to point into the chapter
+    that defines the anchor. The modification date and ZIP entry times
+    come from ``build_timestamp``, so the same sections always produce
+    the same bytes.
+
+    Args:
+        sections: Rendered HTML of each top-level section
+        images: Local image files keyed by ``src`` (from ``resolve_images``)
+        stylesheet: CSS shared with the other targets
+        title: Book title
+        author: Book author, if known
+
+    Returns:
+        EPUB file content
+    """
+    book = epub.EpubBook()
+    book.set_identifier(hashlib.sha256('\n'.join(sections).encode('utf-8')).hexdigest())
+    book.set_title(title)
+    book.set_language('en')
+    if author:
+        book.add_author(author)
+
+    style = epub.EpubItem(
+        uid='style', file_name='style/book.css', media_type='text/css', content=stylesheet
+    )
+    book.add_item(style)
+
+    sources = {}
+    for number, (src, path) in enumerate(sorted(images.items()), 1):
+        file_name = f"images/image_{number:03d}{path.suffix.lower()}"
+        media_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+        book.add_item(epub.EpubImage(
+            uid=f"image_{number:03d}", file_name=file_name, media_type=media_type,
+            content=path.read_bytes(),
+        ))
+        sources[src] = quote(file_name)
+
+    file_names = [f"chapter_{number:03d}.xhtml" for number in range(1, len(sections) + 1)]
+    anchor_files = {}
+    for file_name, section in zip(file_names, sections):
+        for anchor in ELEMENT_ID_PATTERN.findall(section):
+            anchor_files.setdefault(anchor, file_name)
+
+    chapters = []
+    for number, (file_name, section) in enumerate(zip(file_names, sections), 1):
+        def link(match, file_name=file_name):
+            target = anchor_files.get(match.group(2), file_name)
+            prefix = '' if target == file_name else target
+            return f"{match.group(1)}{prefix}#{match.group(2)}{match.group(3)}"
+
+        chapter = epub.EpubHtml(
+            title=_section_title(section, f"Section {number}"), file_name=file_name, lang='en'
+        )
+        chapter.content = INTERNAL_HREF_PATTERN.sub(link, replace_image_sources(section, sources))
+        chapter.add_item(style)
+        book.add_item(chapter)
+        chapters.append(chapter)
+
+    book.toc = chapters
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ['nav'] + chapters
+
+    timestamp = build_timestamp()
+    buffer = io.BytesIO()
+    epub.write_epub(buffer, book, {'mtime': timestamp, 'raise_exceptions': True})
+    return _normalize_zip(buffer.getvalue(), timestamp)
@@ -0,0 +1,227 @@
+"""Content sniffing and cheap validation of input files.
+
+Choosing a converter by file suffix alone sends a mislabeled or truncated
+file all the way into ebooklib, pdfplumber or a multi-second Calibre run
+before it fails. ``input_format`` identifies a file by its magic bytes,
+falling back to the suffix only for content without any (Markdown, or an
+EPUB whose ``mimetype`` entry is not first). ``preflight`` also rejects
+files that are obviously broken, by reading a few kilobytes from each end
+of the file and, for EPUB, the ZIP central directory.
+"""
+
+import codecs
+import re
+import struct
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+# Input formats and the file suffixes they are recognized by
+FORMAT_SUFFIXES = {
+    'epub': {'.epub'},
+    'pdf': {'.pdf'},
+    'mobi': {'.mobi', '.azw', '.azw3'},
+    'markdown': {'.md', '.markdown'},
+}
+
+# Bytes read from the start and the end of a file
+HEAD_SIZE = 4096
+TAIL_SIZE = 2048
+
+# PDF readers accept junk before the header within the first kilobyte; that
+# is only honoured for files named .pdf, since text can quote the header
+PDF_MAGIC = b'%PDF-'
+PDF_HEADER_WINDOW = 1024
+PDF_EOF = b'%%EOF'
+PDF_STARTXREF = re.compile(rb'startxref\s+(\d+)')
+
+# An EPUB is a ZIP archive whose first entry is an uncompressed 'mimetype'
+ZIP_MAGIC = b'PK\x03\x04'
+ZIP_LOCAL_HEADER = struct.Struct('<26xHH')
+EPUB_MIMETYPE = b'application/epub+zip'
+EPUB_CONTAINER = 'META-INF/container.xml'
+
+# MOBI, AZW and AZW3 are Palm databases of type 'BOOK' by creator 'MOBI'
+PALMDB_TYPE = slice(60, 68)
+PALMDB_HEADER_SIZE = 78
+PALMDB_RECORD_SIZE = 8
+MOBI_TYPE = b'BOOKMOBI'
+
+
+class InvalidInputError(ValueError):
+    """Raised for an input that is obviously broken or is not the format it claims to be."""
+
+
+def suffix_format(path: Path) -> Optional[str]:
+    """
+    Get the format a file's suffix claims.
+
+    Args:
+        path: Input file
+
+    Returns:
+        'epub', 'pdf', 'mobi' or 'markdown', or None for other suffixes
+    """
+    suffix = path.suffix.lower()
+    for name, suffixes in FORMAT_SUFFIXES.items():
+        if suffix in suffixes:
+            return name
+    return None
+
+
+def sniff_format(head: bytes, suffix: str = '') -> Optional[str]:
+    """
+    Identify a format by its magic bytes.
+
+    The PDF and MOBI signatures are plain ASCII that a text file can
+    contain, so they never override a Markdown suffix; only the binary
+    EPUB signature does. The PDF header must be at offset 0 unless the
+    file is named .pdf.
+
+    Args:
+        head: The first ``HEAD_SIZE`` bytes of a file
+        suffix: The file's suffix
+
+    Returns:
+        'epub', 'pdf' or 'mobi', or None if the content has no known signature
+    """
+    suffix = suffix.lower()
+    if suffix not in FORMAT_SUFFIXES['markdown']:
+        window = PDF_HEADER_WINDOW if suffix in FORMAT_SUFFIXES['pdf'] else len(PDF_MAGIC)
+        if PDF_MAGIC in head[:window]:
+            return 'pdf'
+        if head[PALMDB_TYPE] == MOBI_TYPE:
+            return 'mobi'
+    if head.startswith(ZIP_MAGIC) and len(head) >= ZIP_LOCAL_HEADER.size:
+        name_length, extra_length = ZIP_LOCAL_HEADER.unpack_from(head)
+        name_end = ZIP_LOCAL_HEADER.size + name_length
+        data = head[name_end + extra_length:]
+        if head[ZIP_LOCAL_HEADER.size:name_end] == b'mimetype' and data.startswith(EPUB_MIMETYPE):
+            return 'epub'
+    return None
+
+
+def input_format(path: Path) -> Optional[str]:
+    """
+    Get the format of an input file from its content, or else its suffix.
+
+    Args:
+        path: Input file
+
+    Returns:
+        'epub', 'pdf', 'mobi' or 'markdown', or None if neither the content
+        nor the suffix is recognized
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(HEAD_SIZE)
+    except OSError:
+        head = b''
+    return sniff_format(head, path.suffix) or suffix_format(path)
+
+
+def preflight(path: Path) -> str:
+    """
+    Check that an input is plausibly convertible before any expensive work.
+
+    Catches empty and truncated files, files whose content does not match
+    their suffix and files of no supported format. Passing does not
+    guarantee the conversion succeeds.
+
+    Args:
+        path: Input file
+
+    Returns:
+        The file's format, as ``input_format`` returns it
+
+    Raises:
+        InvalidInputError: If the file is unsupported or obviously broken
+        OSError: If the file cannot be read
+    """
+    size = path.stat().st_size
+    if size == 0:
+        raise InvalidInputError("Empty file")
+    with open(path, 'rb') as f:
+        head = f.read(HEAD_SIZE)
+        f.seek(max(0, size - TAIL_SIZE))
+        tail = f.read()
+
+    book_format = sniff_format(head, path.suffix) or suffix_format(path)
+    if book_format is None:
+        raise InvalidInputError(f"Unsupported format: {path.suffix}")
+    _CHECKS[book_format](path, size, head, tail)
+    return book_format
+
+
+def _check_pdf(path: Path, size: int, head: bytes, tail: bytes) -> None:
+    """Require the %PDF header, the %%EOF marker and an in-range startxref offset."""
+    if PDF_MAGIC not in head[:PDF_HEADER_WINDOW]:
+        raise InvalidInputError("Not a PDF file: no %PDF header")
+    if PDF_EOF not in tail:
+        raise InvalidInputError("Truncated PDF: no %%EOF marker at the end of the file")
+    offsets = PDF_STARTXREF.findall(tail)
+    if not offsets:
+        raise InvalidInputError("Damaged PDF: no startxref pointer to the cross-reference table")
+    if int(offsets[-1]) >= size:
+        raise InvalidInputError(
+            f"Truncated PDF: the cross-reference table offset {int(offsets[-1])} is past "
+            f"the end of the file ({size} bytes)"
+        )
+
+
+def _check_epub(path: Path, size: int, head: bytes, tail: bytes) -> None:
+    """Require a readable ZIP central directory with the OCF container file."""
+    if not head.startswith(ZIP_MAGIC):
+        raise InvalidInputError("Not an EPUB file: no ZIP header")
+    try:
+        with zipfile.ZipFile(path) as archive:
+            entries = archive.infolist()
+    except zipfile.BadZipFile as e:
+        raise InvalidInputError(f"Truncated or damaged EPUB: {e}")
+    if not any(entry.filename == EPUB_CONTAINER for entry in entries):
+        raise InvalidInputError(f"Not an EPUB file: the ZIP archive has no {EPUB_CONTAINER}")
+    end = max(entry.header_offset + entry.compress_size for entry in entries)
+    if end > size:
+        raise InvalidInputError(
+            f"Truncated EPUB: entries extend to byte {end} of a {size}-byte file"
+        )
+
+
+def _check_mobi(path: Path, size: int, head: bytes, tail: bytes) -> None:
+    """Require the BOOKMOBI header and a record list that ends inside the file."""
+    if head[PALMDB_TYPE] != MOBI_TYPE:
+        raise InvalidInputError("Not a MOBI file: no BOOKMOBI header")
+    if len(head) < PALMDB_HEADER_SIZE:
+        raise InvalidInputError("Truncated MOBI: incomplete Palm database header")
+    (records,) = struct.unpack_from('>H', head, PALMDB_HEADER_SIZE - 2)
+    if records == 0:
+        raise InvalidInputError("Damaged MOBI: the Palm database has no records")
+    with open(path, 'rb') as f:
+        f.seek(PALMDB_HEADER_SIZE + (records - 1) * PALMDB_RECORD_SIZE)
+        entry = f.read(4)
+    if len(entry) < 4:
+        raise InvalidInputError("Truncated MOBI: incomplete record list")
+    (last_offset,) = struct.unpack('>I', entry)
+    if last_offset >= size:
+        raise InvalidInputError(
+            f"Truncated MOBI: record {records} starts past the end of the file ({size} bytes)"
+        )
+
+
+def _check_markdown(path: Path, size: int, head: bytes, tail: bytes) -> None:
+    """Require text that starts as valid UTF-8."""
+    try:
+        # A multi-byte character may be cut off at the end of the head
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+    except UnicodeDecodeError:
+        raise InvalidInputError("Not a Markdown file: the content is not UTF-8 text")
+    if b'\x00' in head:
+        raise InvalidInputError("Not a Markdown file: the content is binary")
+
+
+_CHECKS = {
+    'epub': _check_epub,
+    'pdf': _check_pdf,
+    'mobi': _check_mobi,
+    'markdown': _check_markdown,
+}
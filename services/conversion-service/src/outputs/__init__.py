@@ -0,0 +1,7 @@
+"""Tools that operate on generated conversion outputs."""
+
+from .bundle import BundleReader, open_bundle_writer
+from .link_checker import verify_links
+from .search_index import SearchIndex
+
+__all__ = ['BundleReader', 'SearchIndex', 'open_bundle_writer', 'verify_links']
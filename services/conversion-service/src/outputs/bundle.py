@@ -0,0 +1,518 @@
+"""Single-file bundles of conversion outputs with a chapter index.
+
+A bundle holds every book of a run under ``<book>/`` (the converted
+document plus its images) instead of loose files in the output directory.
+Two containers are supported:
+
+- ZIP (``.zip``): members are compressed individually and the chapter
+  index is stored as ``index.json``
+- SQLite (``.sqlite``, ``.db``, ``.sqlar``): files live in a standard
+  ``sqlar`` table (extractable with ``sqlite3 -A``) and the chapter index
+  in a ``chapters`` table; re-running a conversion replaces the book
+
+Each chapter entry records the byte range of a top-level section in the
+book's Markdown, so readers can fetch one chapter without reading the rest.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import zipfile
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from converters.anchors import heading_plain_text, scan_lines, section_headings
+
+INDEX_MEMBER = 'index.json'
+SQLITE_SUFFIXES = {'.sqlite', '.sqlite3', '.db', '.sqlar'}
+BUNDLE_SUFFIXES = SQLITE_SUFFIXES | {'.zip'}
+INDEXED_SUFFIXES = {'.md', '.markdown'}
+
+# Already-compressed formats are stored without recompressing
+STORED_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.epub', '.zip'}
+
+
+class Chapter(NamedTuple):
+    """A top-level section of a bundled Markdown document."""
+
+    book: str
+    number: int
+    title: str
+    document: str
+    start: int
+    end: int
+
+
+def index_chapters(book: str, document: str, data: bytes) -> List[Chapter]:
+    """
+    Find the top-level sections of a Markdown document.
+
+    Chapters start at the headings ``section_headings`` chooses, the same
+    sections the Markdown to PDF converter renders separately.
+
+    Args:
+        book: Book name in the bundle
+        document: Member path of the document
+        data: UTF-8 encoded Markdown
+
+    Returns:
+        Chapters with byte offsets into ``data``; text before the first
+        chapter heading, such as the book title, is chapter 0
+    """
+    lines = data.decode('utf-8').split('\n')
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line.encode('utf-8')) + 1)
+
+    headings = scan_lines(lines).headings
+    if not headings:
+        return [Chapter(book, 1, book, document, 0, len(data))]
+
+    starts = [(offsets[heading.line_number - 1], heading_plain_text(heading.text))
+              for heading in section_headings(headings)]
+
+    chapters = []
+    if starts[0][0] > 0 and data[:starts[0][0]].strip():
+        # Named after its own heading (usually the book title), if it has one
+        preamble_title = next((heading_plain_text(heading.text) for heading in headings
+                               if offsets[heading.line_number - 1] < starts[0][0]), book)
+        chapters.append(Chapter(book, 0, preamble_title, document, 0, starts[0][0]))
+    for number, (start, title) in enumerate(starts, 1):
+        end = starts[number][0] if number < len(starts) else len(data)
+        chapters.append(Chapter(book, number, title, document, start, end))
+    return chapters
+
+
+class BundleWriter(ABC):
+    """
+    Single writer that collects converted books into a bundle.
+
+    Not safe for concurrent use; batch runners serialize ``add_book``
+    calls in the process that owns the writer.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Bundle file to write
+        """
+        self.path = Path(path)
+        self._books: Dict[str, int] = {}
+
+    def _book_name(self, name: str) -> str:
+        """Make a book name unique within this writing session."""
+        count = self._books.get(name, 0) + 1
+        self._books[name] = count
+        return name if count == 1 else f"{name}_{count}"
+
+    def add_book(self, name: str, source_dir: Path, primary: Optional[Path] = None) -> str:
+        """
+        Add a converted book from a directory of output files.
+
+        Args:
+            name: Preferred book name (usually the input file's stem)
+            source_dir: Directory holding the book's outputs
+            primary: The converter's main output, relative to ``source_dir``
+                (default: the first Markdown file found)
+
+        Returns:
+            Name the book was stored under
+        """
+        book = self._book_name(name)
+        files = sorted(
+            Path(root, file_name).relative_to(source_dir)
+            for root, _dirs, file_names in os.walk(source_dir)
+            for file_name in file_names
+            if not file_name.endswith('.checkpoint')
+        )
+        if primary is None:
+            primary = next((relative for relative in files
+                            if relative.suffix.lower() in INDEXED_SUFFIXES), None)
+
+        self._begin_book(book)
+        for relative in files:
+            member = f"{book}/{relative.as_posix()}"
+            data = (source_dir / relative).read_bytes()
+            self._write_member(member, data)
+            if relative == primary and relative.suffix.lower() in INDEXED_SUFFIXES:
+                self._write_chapters(book, index_chapters(book, member, data))
+        return book
+
+    def _begin_book(self, book: str) -> None:  # noqa: B027
+        """Prepare to (re)write a book; nothing to do unless the backend keeps old members."""
+        pass
+
+    @abstractmethod
+    def _write_member(self, member: str, data: bytes) -> None:
+        """Store one file."""
+
+    @abstractmethod
+    def _write_chapters(self, book: str, chapters: List[Chapter]) -> None:
+        """Store a document's chapter index."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the bundle."""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Stop after a failure without finishing the bundle, leaving an existing one intact."""
+
+    def __enter__(self) -> 'BundleWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # A failed or interrupted batch must not replace a complete bundle
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ZipBundleWriter(BundleWriter):
+    """
+    Bundle writer producing a ZIP archive.
+
+    The archive is written to a temporary file next to the target and
+    renamed into place on close, so readers never see a partial bundle; a
+    batch that fails discards it and leaves the previous bundle in place.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._temp_name = self.path.parent / f".{self.path.name}.{os.getpid()}.tmp"
+        self._zip = zipfile.ZipFile(self._temp_name, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._chapters: List[Chapter] = []
+
+    def _write_member(self, member: str, data: bytes) -> None:
+        stored = Path(member).suffix.lower() in STORED_SUFFIXES
+        self._zip.writestr(
+            member, data, compress_type=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+        )
+
+    def _write_chapters(self, book: str, chapters: List[Chapter]) -> None:
+        self._chapters.extend(chapters)
+
+    def close(self) -> None:
+        if self._zip is None:
+            return
+        try:
+            self._zip.writestr(
+                INDEX_MEMBER,
+                json.dumps({'chapters': [chapter._asdict() for chapter in self._chapters]},
+                           ensure_ascii=False),
+            )
+            self._zip.close()
+            os.replace(self._temp_name, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._zip = None
+
+    def abort(self) -> None:
+        if self._zip is None:
+            return
+        try:
+            self._zip.close()
+        finally:
+            self._zip = None
+            self._temp_name.unlink(missing_ok=True)
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sqlar (
+    name TEXT PRIMARY KEY,
+    mode INT,
+    mtime INT,
+    sz INT,
+    data BLOB
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    book TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    document TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    "end" INTEGER NOT NULL,
+    PRIMARY KEY (book, number)
+);
+"""
+
+
+class SQLiteBundleWriter(BundleWriter):
+    """
+    Bundle writer producing a SQLite archive.
+
+    Files use the ``sqlar`` layout (zlib-compressed unless that does not
+    save space) and each book is replaced in a single transaction, so an
+    existing bundle can be updated incrementally.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Batch runners call add_book from worker threads, one at a time
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(SQLITE_SCHEMA)
+
+    def add_book(self, name: str, source_dir: Path, primary: Optional[Path] = None) -> str:
+        with self._conn:
+            return super().add_book(name, source_dir, primary)
+
+    def _begin_book(self, book: str) -> None:
+        self._conn.execute('DELETE FROM sqlar WHERE name >= ? AND name < ?', _member_range(book))
+        self._conn.execute('DELETE FROM chapters WHERE book = ?', (book,))
+
+    def _write_member(self, member: str, data: bytes) -> None:
+        compressed = data
+        if Path(member).suffix.lower() not in STORED_SUFFIXES:
+            candidate = zlib.compress(data)
+            if len(candidate) < len(data):
+                compressed = candidate
+        self._conn.execute(
+            'INSERT OR REPLACE INTO sqlar (name, mode, mtime, sz, data) VALUES (?, ?, ?, ?, ?)',
+            (member, 0o100644, int(time.time()), len(data), compressed),
+        )
+
+    def _write_chapters(self, book: str, chapters: List[Chapter]) -> None:
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO chapters (book, number, title, document, start, "end") '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            chapters,
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def abort(self) -> None:
+        # Books added before the failure were committed one by one and stay
+        self._conn.rollback()
+        self._conn.close()
+
+
+def _member_range(book: str) -> Tuple[str, str]:
+    """
+    Get the bounds of a book's member names for a range query.
+
+    Unlike LIKE, the comparison is case-sensitive and uses the primary key.
+
+    Args:
+        book: Book name
+
+    Returns:
+        Tuple of (lowest member name, first name past the book's members);
+        '0' is the character after '/'
+    """
+    return f"{book}/", f"{book}0"
+
+
+def _is_sqlite(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+
+def open_bundle_writer(path: Path) -> BundleWriter:
+    """
+    Create a bundle writer for a path, choosing the container by suffix.
+
+    Args:
+        path: ``.zip`` for a ZIP bundle, ``.sqlite``/``.db``/``.sqlar`` for SQLite
+
+    Returns:
+        BundleWriter instance
+
+    Raises:
+        ValueError: If the suffix is not a bundle format
+    """
+    path = Path(path)
+    if _is_sqlite(path):
+        return SQLiteBundleWriter(path)
+    if path.suffix.lower() == '.zip':
+        return ZipBundleWriter(path)
+    raise ValueError(f"Unsupported bundle format: {path.suffix} (use .zip or .sqlite)")
+
+
+class BundleReader:
+    """
+    Random-access reader for ZIP and SQLite bundles.
+
+    Example:
+        with BundleReader(Path('library.zip')) as bundle:
+            for chapter in bundle.chapters('my-book'):
+                print(chapter.number, chapter.title)
+            text = bundle.read_chapter('my-book', 3)
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open a bundle.
+
+        Args:
+            path: Bundle file
+
+        Raises:
+            ValueError: If the file is not a bundle
+        """
+        self.path = Path(path)
+        self._conn = None
+        self._zip = None
+        if _is_sqlite(self.path):
+            self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+            rows = self._conn.execute('SELECT * FROM chapters ORDER BY book, number')
+            chapters = [Chapter(*row) for row in rows]
+            names = [row[0] for row in self._conn.execute('SELECT name FROM sqlar')]
+        else:
+            try:
+                self._zip = zipfile.ZipFile(self.path)
+                index = json.loads(self._zip.read(INDEX_MEMBER))
+            except (zipfile.BadZipFile, KeyError) as e:
+                raise ValueError(f"Not a bundle: {self.path}: {e}")
+            chapters = [Chapter(**entry) for entry in index['chapters']]
+            names = self._zip.namelist()
+
+        self._books = sorted({name.split('/', 1)[0] for name in names if '/' in name})
+        self._chapters: Dict[str, List[Chapter]] = {}
+        for chapter in chapters:
+            self._chapters.setdefault(chapter.book, []).append(chapter)
+
+    def books(self) -> List[str]:
+        """
+        List the books in the bundle.
+
+        Returns:
+            Sorted book names
+        """
+        return list(self._books)
+
+    def chapters(self, book: str) -> List[Chapter]:
+        """
+        List a book's chapters.
+
+        Args:
+            book: Book name
+
+        Returns:
+            Chapters in document order (empty if the book has no Markdown)
+
+        Raises:
+            KeyError: If the book is not in the bundle
+        """
+        if book not in self._books:
+            raise KeyError(book)
+        return self._chapters.get(book, [])
+
+    def files(self, book: str) -> List[str]:
+        """
+        List the files stored for a book.
+
+        Args:
+            book: Book name
+
+        Returns:
+            Member paths relative to the book
+        """
+        prefix = f"{book}/"
+        if self._conn is not None:
+            rows = self._conn.execute(
+                'SELECT name FROM sqlar WHERE name >= ? AND name < ? ORDER BY name',
+                _member_range(book),
+            )
+            names = [row[0] for row in rows]
+        else:
+            names = [name for name in self._zip.namelist() if name.startswith(prefix)]
+        return [name[len(prefix):] for name in names]
+
+    def read_file(self, book: str, relative_path: str) -> bytes:
+        """
+        Read one stored file, such as an image.
+
+        Args:
+            book: Book name
+            relative_path: Path relative to the book (e.g. ``images/cover.jpg``)
+
+        Returns:
+            File content
+
+        Raises:
+            KeyError: If the file is not in the bundle
+        """
+        member = f"{book}/{relative_path}"
+        if self._conn is not None:
+            row = self._conn.execute(
+                'SELECT sz, data FROM sqlar WHERE name = ?', (member,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(member)
+            size, data = row
+            return data if len(data) == size else zlib.decompress(data)
+        return self._zip.read(member)
+
+    def read_document(self, book: str) -> str:
+        """
+        Read a book's whole Markdown document.
+
+        Args:
+            book: Book name
+
+        Returns:
+            Markdown text
+
+        Raises:
+            KeyError: If the book has no Markdown document
+        """
+        chapters = self.chapters(book)
+        if not chapters:
+            raise KeyError(f"{book} has no Markdown document")
+        document = chapters[0].document
+        return self.read_file(book, document[len(book) + 1:]).decode('utf-8')
+
+    def read_chapter(self, book: str, number: int) -> str:
+        """
+        Read one chapter of a book.
+
+        Args:
+            book: Book name
+            number: Chapter number from ``chapters()``
+
+        Returns:
+            Markdown text of the chapter
+
+        Raises:
+            KeyError: If the chapter does not exist
+        """
+        for chapter in self.chapters(book):
+            if chapter.number == number:
+                break
+        else:
+            raise KeyError(f"{book} has no chapter {number}")
+
+        if self._conn is not None:
+            # sqlar stores uncompressed data when compression does not help;
+            # only then can SQLite slice the blob without reading it all
+            row = self._conn.execute(
+                'SELECT sz, length(data), substr(data, ?, ?) FROM sqlar WHERE name = ?',
+                (chapter.start + 1, chapter.end - chapter.start, chapter.document),
+            ).fetchone()
+            if row[0] == row[1]:
+                return bytes(row[2]).decode('utf-8')
+        data = self.read_file(book, chapter.document[len(book) + 1:])
+        return data[chapter.start:chapter.end].decode('utf-8')
+
+    def close(self) -> None:
+        """Close the bundle."""
+        if self._conn is not None:
+            self._conn.close()
+        if self._zip is not None:
+            self._zip.close()
+
+    def __enter__(self) -> 'BundleReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,231 @@
+"""Bulk link-integrity checking for generated PDF and Markdown files."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import unquote, urlparse
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, IndirectObject
+
+from converters.anchors import scan_markdown
+
+CHECKED_SUFFIXES = {'.pdf', '.md', '.markdown'}
+
+
+def discover_files(paths: Iterable[Path]) -> List[Path]:
+    """
+    Expand files and directories into the list of documents to check.
+
+    Args:
+        paths: Files or directories; directories are searched recursively
+
+    Returns:
+        Sorted list of PDF and Markdown files
+    """
+    found = set()
+    for path in paths:
+        if path.is_dir():
+            for root, _dirs, files in os.walk(path):
+                for name in files:
+                    if Path(name).suffix.lower() in CHECKED_SUFFIXES:
+                        found.add(Path(root) / name)
+        elif path.suffix.lower() in CHECKED_SUFFIXES:
+            found.add(path)
+    return sorted(found)
+
+
+def _destination_name(destination: Any) -> Optional[str]:
+    """
+    Get the name of a named destination, or None for explicit destinations.
+
+    Args:
+        destination: Value of a link's /Dest or GoTo action /D entry
+
+    Returns:
+        Destination name as a string
+    """
+    if isinstance(destination, IndirectObject):
+        destination = destination.get_object()
+    if isinstance(destination, ArrayObject):
+        return None
+    if isinstance(destination, bytes):
+        return destination.decode('latin-1')
+    return str(destination)
+
+
+def _iter_link_annotations(reader: PdfReader) -> Iterator[tuple]:
+    """
+    Stream link annotations page by page.
+
+    Args:
+        reader: Open PDF reader
+
+    Yields:
+        Tuples of (1-based page number, annotation dictionary)
+    """
+    for page_number, page in enumerate(reader.pages, 1):
+        annotations = page.get('/Annots')
+        if annotations is None:
+            continue
+        for annotation in annotations.get_object():
+            annotation = annotation.get_object()
+            if annotation.get('/Subtype') == '/Link':
+                yield page_number, annotation
+
+
+def check_pdf(pdf_path: Path) -> Dict[str, Any]:
+    """
+    Check that every internal link in a PDF points at an existing destination.
+
+    Named destinations are collected once per document; explicit
+    destinations must reference one of the document's pages. ``file://``
+    links are external, so a target file that does not exist is listed
+    under ``missing_files`` rather than ``broken``.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Report dict with link counts, broken internal links and missing file targets
+    """
+    reader = PdfReader(pdf_path)
+    named_destinations = set(reader.named_destinations)
+    page_ids = {page.indirect_reference.idnum for page in reader.pages if page.indirect_reference}
+
+    report = {
+        'path': str(pdf_path),
+        'type': 'pdf',
+        'links': 0,
+        'internal_links': 0,
+        'broken': [],
+        'missing_files': [],
+    }
+    for page_number, annotation in _iter_link_annotations(reader):
+        report['links'] += 1
+        action = annotation.get('/A')
+        action = action.get_object() if action is not None else {}
+
+        if action.get('/S') == '/URI':
+            uri = str(action.get('/URI', ''))
+            parsed = urlparse(uri)
+            if parsed.scheme == 'file' and not Path(unquote(parsed.path)).exists():
+                report['missing_files'].append({'page': page_number, 'target': uri})
+            continue
+
+        if '/Dest' in annotation:
+            destination = annotation['/Dest']
+        elif action.get('/S') == '/GoTo':
+            destination = action.get('/D')
+        else:
+            continue
+
+        report['internal_links'] += 1
+        name = _destination_name(destination)
+        if name is not None:
+            if name.lstrip('/') not in named_destinations and name not in named_destinations:
+                report['broken'].append(
+                    {'page': page_number, 'target': name, 'reason': 'missing destination'}
+                )
+            continue
+
+        target = destination.get_object()[0] if len(destination.get_object()) else None
+        if not isinstance(target, IndirectObject) or target.idnum not in page_ids:
+            report['broken'].append(
+                {'page': page_number, 'target': str(target), 'reason': 'invalid page'}
+            )
+
+    return report
+
+
+def check_markdown(markdown_path: Path) -> Dict[str, Any]:
+    """
+    Check that every ``(#anchor)`` link in a Markdown file reaches an anchor.
+
+    Anchors are computed and dangling links repaired the way the Markdown
+    to PDF converter does it, so only links that are still broken in the
+    rendered PDF are reported.
+
+    Args:
+        markdown_path: Path to the Markdown file
+
+    Returns:
+        Report dict with link counts and any missing anchors
+    """
+    with open(markdown_path, 'r', encoding='utf-8') as f:
+        index = scan_markdown(f.read())
+
+    return {
+        'path': str(markdown_path),
+        'type': 'markdown',
+        'links': len(index.links),
+        'internal_links': len(index.links),
+        'broken': [
+            {'line': link.line_number, 'target': link.anchor, 'reason': 'missing anchor'}
+            for link in index.unresolved_links()
+        ],
+        'missing_files': [],
+    }
+
+
+def check_file(path: Path) -> Dict[str, Any]:
+    """
+    Check one PDF or Markdown file, capturing read errors in the report.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Report dict for the file
+    """
+    is_pdf = path.suffix.lower() == '.pdf'
+    try:
+        return check_pdf(path) if is_pdf else check_markdown(path)
+    except Exception as e:
+        return {
+            'path': str(path),
+            'type': 'pdf' if is_pdf else 'markdown',
+            'links': 0,
+            'internal_links': 0,
+            'broken': [],
+            'missing_files': [],
+            'error': str(e),
+        }
+
+
+def verify_links(paths: Iterable[Path], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Check links across many PDF and Markdown files in parallel.
+
+    Args:
+        paths: Files or directories to check
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Report dict with a summary and the per-file results that have problems
+    """
+    files = discover_files(paths)
+    if len(files) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(files) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(check_file, files, chunksize=chunksize))
+    else:
+        results = [check_file(path) for path in files]
+
+    problems = [
+        result for result in results
+        if result['broken'] or result['missing_files'] or 'error' in result
+    ]
+    return {
+        'summary': {
+            'files': len(results),
+            'links': sum(result['links'] for result in results),
+            'internal_links': sum(result['internal_links'] for result in results),
+            'broken_links': sum(len(result['broken']) for result in results),
+            'missing_files': sum(len(result['missing_files']) for result in results),
+            'files_with_problems': len(problems),
+            'errors': sum(1 for result in results if 'error' in result),
+        },
+        'files': problems,
+    }
@@ -0,0 +1,210 @@
+"""SQLite FTS5 full-text search index over converted Markdown documents."""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from converters.anchors import heading_plain_text, scan_lines
+
+# Longest chunk indexed as one row; longer sections are split at blank lines
+MAX_CHUNK_CHARS = 8000
+
+# PRAGMA user_version of an index whose chunks are all in chunk_documents
+SCHEMA_VERSION = 1
+
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    book TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    chunks INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    path UNINDEXED,
+    book UNINDEXED,
+    heading,
+    body,
+    tokenize = 'porter unicode61'
+);
+-- Filtering the FTS table on its path column scans every chunk, so a
+-- document's chunks are found by rowid through this table
+CREATE TABLE IF NOT EXISTS chunk_documents (
+    chunk INTEGER PRIMARY KEY,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunk_documents_path ON chunk_documents (path);
+"""
+
+
+def split_chunks(markdown: str) -> Iterator[Tuple[str, str]]:
+    """
+    Split a Markdown document into searchable chunks at its headings.
+
+    Args:
+        markdown: Markdown text
+
+    Yields:
+        Tuples of (heading text, chunk text); text before the first
+        heading has an empty heading
+    """
+    lines = markdown.split('\n')
+    starts = [(heading.line_number - 1, heading_plain_text(heading.text))
+              for heading in scan_lines(lines).headings]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, ''))
+
+    for position, (start, heading) in enumerate(starts):
+        end = starts[position + 1][0] if position + 1 < len(starts) else len(lines)
+        body = '\n'.join(lines[start:end]).strip()
+        while len(body) > MAX_CHUNK_CHARS:
+            cut = body.rfind('\n\n', 0, MAX_CHUNK_CHARS)
+            cut = cut if cut > 0 else MAX_CHUNK_CHARS
+            yield heading, body[:cut]
+            body = body[cut:].lstrip()
+        if body:
+            yield heading, body
+
+
+class SearchIndex:
+    """
+    Incrementally updated full-text index of converted documents.
+
+    Documents are keyed by output path and re-indexed only when their
+    content hash changes. Not safe for concurrent writers; batch runners
+    serialize ``index_document`` calls in the process that owns the index.
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Open (and create if needed) the index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Batch runners call index_document from worker threads, one at a time
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(SEARCH_SCHEMA)
+        if self._conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            # Map the chunks of an index created before chunk_documents, once
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR IGNORE INTO chunk_documents (chunk, path) '
+                    'SELECT rowid, path FROM chunks'
+                )
+                self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def index_document(self, path: str, book: str, markdown: str) -> bool:
+        """
+        Add or update one document.
+
+        Args:
+            path: Output path (or bundle member) identifying the document
+            book: Book name shown in results
+            markdown: Document text
+
+        Returns:
+            True if the document was (re)indexed, False if it was unchanged
+        """
+        content_hash = hashlib.sha256(markdown.encode('utf-8')).hexdigest()
+        row = self._conn.execute(
+            'SELECT content_hash FROM documents WHERE path = ?', (path,)
+        ).fetchone()
+        if row and row[0] == content_hash:
+            return False
+
+        with self._conn:
+            if row:
+                self._delete_chunks(path)
+            chunks = [
+                (self._conn.execute(
+                    'INSERT INTO chunks (path, book, heading, body) VALUES (?, ?, ?, ?)',
+                    (path, book, heading, body),
+                ).lastrowid, path)
+                for heading, body in split_chunks(markdown)
+            ]
+            self._conn.executemany(
+                'INSERT INTO chunk_documents (chunk, path) VALUES (?, ?)', chunks
+            )
+            self._conn.execute(
+                'INSERT OR REPLACE INTO documents (path, book, content_hash, chunks, updated) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (path, book, content_hash, len(chunks), time.time()),
+            )
+        return True
+
+    def remove_document(self, path: str) -> None:
+        """
+        Remove a document from the index.
+
+        Args:
+            path: Path the document was indexed under
+        """
+        with self._conn:
+            self._delete_chunks(path)
+            self._conn.execute('DELETE FROM documents WHERE path = ?', (path,))
+
+    def _delete_chunks(self, path: str) -> None:
+        """Delete a document's chunks by rowid, within the caller's transaction."""
+        rows = self._conn.execute(
+            'SELECT chunk FROM chunk_documents WHERE path = ?', (path,)
+        ).fetchall()
+        self._conn.executemany('DELETE FROM chunks WHERE rowid = ?', rows)
+        self._conn.execute('DELETE FROM chunk_documents WHERE path = ?', (path,))
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Run a full-text query.
+
+        Args:
+            query: FTS5 query (words, "phrases", AND/OR/NOT, prefix*)
+            limit: Maximum number of results
+
+        Returns:
+            Best-ranked chunks as dicts with path, book, heading, snippet and score
+
+        Raises:
+            ValueError: If the query is not valid FTS5 syntax
+        """
+        try:
+            rows = self._conn.execute(
+                """
+                SELECT path, book, heading, snippet(chunks, 3, '[', ']', '…', 16), bm25(chunks)
+                FROM chunks WHERE chunks MATCH ?
+                ORDER BY bm25(chunks) LIMIT ?
+                """,
+                (query, limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}")
+        return [
+            {'path': path, 'book': book, 'heading': heading, 'snippet': snippet,
+             'score': round(-score, 3)}
+            for path, book, heading, snippet, score in rows
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Count indexed documents and chunks.
+
+        Returns:
+            Dict with 'documents' and 'chunks'
+        """
+        documents, chunks = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(chunks), 0) FROM documents'
+        ).fetchone()
+        return {'documents': documents, 'chunks': chunks}
+
+    def close(self) -> None:
+        """Close the index."""
+        self._conn.close()
+
+    def __enter__(self) -> 'SearchIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,45 @@
+"""Tests for heading anchors and internal-link resolution."""
+
+from converters.anchors import scan_markdown
+
+
+def test_dangling_link_gives_the_heading_its_anchor():
+    index = scan_markdown("# Book\n\nSee [Getting Started](#start).\n\n## Getting Started\n")
+
+    overrides, rewrites = index.resolve_links()
+
+    assert overrides == {1: 'start'}
+    assert rewrites == {}
+    assert index.heading_anchors(overrides) == ['book', 'start']
+
+
+def test_link_is_rewritten_when_the_heading_anchor_is_linked_elsewhere():
+    index = scan_markdown(
+        "# Book\n\n[Introduction](#introduction) and [Introduction](#intro).\n\n## Introduction\n"
+    )
+
+    assert index.resolve_links() == ({}, {'intro': 'introduction'})
+
+
+def test_anchor_matches_heading_ignoring_punctuation():
+    index = scan_markdown("# Book\n\n[see](#chapter1)\n\n## Chapter 1\n")
+
+    assert index.resolve_links() == ({1: 'chapter1'}, {})
+
+
+def test_links_to_shifted_duplicate_headings_are_rewritten():
+    index = scan_markdown(
+        "# Book\n\n[Notes](#my-notes) and [later notes](#notes_1)\n\n## Notes\n\n## Notes\n"
+    )
+
+    overrides, rewrites = index.resolve_links()
+
+    assert index.heading_anchors(overrides) == ['book', 'my-notes', 'notes']
+    assert rewrites == {'notes_1': 'notes'}
+    assert index.unresolved_links() == []
+
+
+def test_only_unrepairable_links_are_unresolved():
+    index = scan_markdown("# Book\n\n[Nowhere](#nowhere) [Book](#book) [Start](#begin)\n")
+
+    assert [link.anchor for link in index.unresolved_links()] == ['nowhere', 'begin']
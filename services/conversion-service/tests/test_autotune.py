@@ -0,0 +1,51 @@
+"""Tests for worker-count autotuning."""
+
+import json
+
+from batch.autotune import MIN_SAMPLES, SAMPLE_WINDOW, WorkerAutotuner
+
+GIB = 1 << 30
+
+
+def test_workers_shrink_for_large_jobs_and_grow_back(tmp_path):
+    decisions = []
+    log_path = tmp_path / "autotune.jsonl"
+    tuner = WorkerAutotuner(cpus=8, memory=16 * GIB, on_decision=decisions.append,
+                            log_path=log_path)
+    assert tuner.workers == 8
+    large = tuner.memory_budget // 2
+
+    # Nothing changes until enough jobs have reported
+    for _ in range(MIN_SAMPLES - 1):
+        assert tuner.record(large) == 8
+    assert tuner.record(large) == 2
+
+    # Large jobs are remembered until they leave the sample window
+    for _ in range(SAMPLE_WINDOW - 1):
+        assert tuner.record(1 << 20) == 2
+    assert tuner.record(1 << 20) == 8
+
+    assert [(d['workers_from'], d['workers_to']) for d in decisions] == [(0, 8), (8, 2), (2, 8)]
+    assert decisions[1]['reason'].startswith('shrink')
+    assert decisions[2]['reason'].startswith('grow')
+    logged = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [record['workers_to'] for record in logged] == [8, 2, 8]
+
+
+def test_worker_count_stays_at_least_one():
+    tuner = WorkerAutotuner(cpus=4, memory=GIB)
+
+    for _ in range(MIN_SAMPLES):
+        tuner.record(4 * GIB)
+
+    assert tuner.workers == 1
+
+
+def test_unmeasured_jobs_leave_the_worker_count_alone():
+    decisions = []
+    tuner = WorkerAutotuner(cpus=4, memory=16 * GIB, on_decision=decisions.append)
+
+    for _ in range(MIN_SAMPLES):
+        assert tuner.record(None) == 4
+
+    assert len(decisions) == 1
@@ -0,0 +1,68 @@
+"""Tests for ZIP and SQLite bundles."""
+
+import pytest
+
+from outputs.bundle import BundleReader, open_bundle_writer
+
+BOOK = "# My Book\n\nForeword.\n\n## One\n\nFirst chapter.\n\n## Two\n\nSecond chapter.\n"
+
+
+def write_book(directory):
+    directory.mkdir()
+    (directory / "book.md").write_text(BOOK, encoding="utf-8")
+    (directory / "images").mkdir()
+    (directory / "images" / "cover.png").write_bytes(b"\x89PNG not really")
+    return directory
+
+
+def test_books_differing_only_in_case_are_kept_apart(tmp_path):
+    source = write_book(tmp_path / "out")
+    bundle = tmp_path / "library.sqlite"
+    with open_bundle_writer(bundle) as writer:
+        writer.add_book("sample", source)
+    with open_bundle_writer(bundle) as writer:
+        writer.add_book("SAMPLE", source)
+
+    with BundleReader(bundle) as reader:
+        assert reader.books() == ["SAMPLE", "sample"]
+        assert reader.files("sample") == ["book.md", "images/cover.png"]
+        assert reader.read_document("sample") == BOOK
+
+
+def test_failed_batch_leaves_the_previous_zip_bundle_intact(tmp_path):
+    source = write_book(tmp_path / "out")
+    bundle = tmp_path / "library.zip"
+    with open_bundle_writer(bundle) as writer:
+        writer.add_book("first", source)
+    before = bundle.read_bytes()
+
+    with pytest.raises(KeyboardInterrupt):
+        with open_bundle_writer(bundle) as writer:
+            writer.add_book("second", source)
+            raise KeyboardInterrupt
+
+    assert bundle.read_bytes() == before
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+
+@pytest.mark.parametrize("name", ["library.zip", "library.sqlite"])
+def test_bundle_round_trip(tmp_path, name):
+    source = write_book(tmp_path / "out")
+    bundle = tmp_path / name
+    with open_bundle_writer(bundle) as writer:
+        assert writer.add_book("sample", source) == "sample"
+
+    with BundleReader(bundle) as reader:
+        assert reader.books() == ["sample"]
+        assert reader.files("sample") == ["book.md", "images/cover.png"]
+        assert reader.read_file("sample", "images/cover.png") == b"\x89PNG not really"
+        assert reader.read_document("sample") == BOOK
+        assert [(chapter.number, chapter.title) for chapter in reader.chapters("sample")] == [
+            (0, "My Book"), (1, "One"), (2, "Two")
+        ]
+        assert reader.read_chapter("sample", 1) == "## One\n\nFirst chapter.\n\n"
+        assert "".join(
+            reader.read_chapter("sample", chapter.number) for chapter in reader.chapters("sample")
+        ) == BOOK
+        with pytest.raises(KeyError):
+            reader.read_chapter("sample", 3)
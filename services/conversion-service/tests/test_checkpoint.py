@@ -0,0 +1,59 @@
+"""Tests for the resumable page journal."""
+
+from benchmark_pdf_memory import write_synthetic_pdf
+from converters.checkpoint import PageJournal, get_journal_path
+from converters.pdf_converter import PDFConverter
+
+SETTINGS = {'engine': 'fast', 'clean_headers': False, 'page_ranges': None, 'preview': None}
+
+
+def test_torn_final_record_is_dropped_on_resume(tmp_path):
+    book = tmp_path / "book.pdf"
+    book.write_bytes(b"%PDF-1.4 stand-in")
+    journal_path = tmp_path / "book.md.checkpoint"
+
+    journal = PageJournal(journal_path, book, SETTINGS)
+    journal.append(0, ["# Page one"])
+    journal.append(1, ["Page two"])
+    journal.close()
+    with open(journal_path, 'ab') as f:
+        f.write(b'{"page": 2, "lines": ["cut off by a cra')
+
+    resumed = PageJournal(journal_path, book, SETTINGS)
+    assert resumed.load() == {0: ["# Page one"], 1: ["Page two"]}
+    resumed.append(2, ["Page three"])
+    resumed.close()
+
+    assert PageJournal(journal_path, book, SETTINGS).load() == {
+        0: ["# Page one"], 1: ["Page two"], 2: ["Page three"]
+    }
+
+
+def test_journal_from_other_settings_is_discarded(tmp_path):
+    book = tmp_path / "book.pdf"
+    book.write_bytes(b"%PDF-1.4 stand-in")
+    journal_path = tmp_path / "book.md.checkpoint"
+    journal = PageJournal(journal_path, book, SETTINGS)
+    journal.append(0, ["# Page one"])
+    journal.close()
+
+    assert PageJournal(journal_path, book, {**SETTINGS, 'clean_headers': True}).load() == {}
+    assert not journal_path.exists()
+
+
+def test_converter_resumes_from_journaled_pages(tmp_path):
+    book = tmp_path / "book.pdf"
+    write_synthetic_pdf(book, 3)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    journal = PageJournal(get_journal_path(output_dir / "book.md"), book, SETTINGS)
+    journal.append(0, ["Journaled before the interruption"])
+    journal.close()
+
+    output_path = PDFConverter(engine='fast').convert(book, output_dir)
+
+    markdown = output_path.read_text(encoding='utf-8')
+    assert "Journaled before the interruption" in markdown
+    assert "Page 1 line 0" not in markdown
+    assert "Page 3 line 0" in markdown
+    assert not get_journal_path(output_path).exists()
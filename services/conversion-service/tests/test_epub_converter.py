@@ -0,0 +1,48 @@
+"""Tests for EPUB spine selection."""
+
+from ebooklib import epub
+
+from converters.epub_converter import EPUBConverter
+
+
+def write_book(path, chapters):
+    book = epub.EpubBook()
+    book.set_identifier("test-book")
+    book.set_title("Test Book")
+    items = []
+    for number in range(1, chapters + 1):
+        item = epub.EpubHtml(title=f"Chapter {number}", file_name=f"chapter_{number}.xhtml")
+        item.content = f"<h1>Chapter {number}</h1><p>Text of chapter {number}.</p>"
+        book.add_item(item)
+        items.append(item)
+    book.toc = items
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ["nav"] + items
+    epub.write_epub(str(path), book)
+    return path
+
+
+def test_preview_counts_the_documents_a_full_conversion_converts(tmp_path):
+    book = write_book(tmp_path / "book.epub", 3)
+    (tmp_path / "full").mkdir()
+    (tmp_path / "preview").mkdir()
+
+    full = EPUBConverter().convert(book, tmp_path / "full").read_text(encoding="utf-8")
+    preview = EPUBConverter(preview=2).convert(book, tmp_path / "preview").read_text(
+        encoding="utf-8"
+    )
+
+    assert "Chapter 1" in preview and "Chapter 2" in preview
+    assert "Text of chapter 3" not in preview
+    assert preview.count("Chapter 1") == 1
+    assert full.count("Chapter 1") == 1
+
+
+def test_page_ranges_skip_the_navigation_document(tmp_path):
+    book = write_book(tmp_path / "book.epub", 3)
+
+    output = EPUBConverter(page_ranges=[(2, 2)]).convert(book, tmp_path)
+
+    assert "Text of chapter 2" in output.read_text(encoding="utf-8")
+    assert "Chapter 1" not in output.read_text(encoding="utf-8")
@@ -0,0 +1,57 @@
+"""Tests for rendering Markdown one top-level section at a time."""
+
+import markdown
+
+from converters.markdown_to_pdf_converter import MarkdownToPDFConverter
+
+BOOK = """Intro with a [reference link][ref].
+
+# Part One {#part-one}
+
+Some *emphasis* and a list:
+
+- one
+- two
+
+```python
+# not a heading
+print(1)
+```
+
+## Chapter A
+
+See [Part One](#part-one) and [Chapter B](#chapter-b).
+
+# Part Two
+
+## Chapter B
+
+Last [reference][ref].
+
+[ref]: https://example.com
+"""
+
+
+def render_whole(converter, content):
+    return markdown.Markdown(extensions=converter.extensions).convert(content)
+
+
+def test_sectioned_html_matches_whole_document_html():
+    converter = MarkdownToPDFConverter(profile='draft')
+    content, index = converter._preprocess_markdown(BOOK)
+
+    sections = converter._render_sections(content, index)
+
+    assert len(sections) == 3
+    assert '\n'.join(sections) == render_whole(converter, content)
+    assert sections[2].count('href="https://example.com"') == 1
+
+
+def test_document_with_a_table_of_contents_is_rendered_whole():
+    converter = MarkdownToPDFConverter(profile='draft')
+    content, index = converter._preprocess_markdown("[TOC]\n\n" + BOOK)
+
+    sections = converter._render_sections(content, index)
+
+    assert len(sections) == 1
+    assert sections[0] == render_whole(converter, content)
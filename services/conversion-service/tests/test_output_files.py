@@ -0,0 +1,48 @@
+"""Tests for atomic, write-if-changed outputs."""
+
+import os
+
+import pytest
+
+from converters.output_files import open_if_changed
+
+
+def write(path, text):
+    with open_if_changed(path) as writer:
+        writer.write(text)
+    return writer.changed
+
+
+def test_unchanged_output_keeps_its_mtime(tmp_path):
+    output = tmp_path / "book.md"
+    assert write(output, "# Book\n")
+    os.utime(output, (1_000_000, 1_000_000))
+
+    assert not write(output, "# Book\n")
+
+    assert output.stat().st_mtime == 1_000_000
+    assert output.read_text(encoding="utf-8") == "# Book\n"
+
+
+def test_changed_output_is_replaced(tmp_path):
+    output = tmp_path / "book.md"
+    write(output, "# Book\n")
+    os.utime(output, (1_000_000, 1_000_000))
+
+    assert write(output, "# Book, revised\n")
+
+    assert output.stat().st_mtime != 1_000_000
+    assert output.read_text(encoding="utf-8") == "# Book, revised\n"
+
+
+def test_failed_write_leaves_the_previous_output(tmp_path):
+    output = tmp_path / "book.md"
+    write(output, "# Book\n")
+
+    with pytest.raises(RuntimeError):
+        with open_if_changed(output) as writer:
+            writer.write("# Half a bo")
+            raise RuntimeError("converter crashed")
+
+    assert output.read_text(encoding="utf-8") == "# Book\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["book.md"]
@@ -0,0 +1,23 @@
+"""Regression test for the memory bound of low-memory PDF conversion."""
+
+import sys
+
+import pytest
+
+from benchmark_pdf_memory import DEFAULT_TOLERANCE, growth, measure, write_synthetic_pdf
+
+# Short windows give many reopens in a PDF small enough for a test run; the
+# benchmark script checks the 5000-page case
+PAGES = 160
+PAGE_WINDOW = 10
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="samples RSS from /proc")
+def test_low_memory_peak_rss_stays_flat_across_pages(tmp_path):
+    pdf_path = tmp_path / "synthetic.pdf"
+    write_synthetic_pdf(pdf_path, PAGES)
+
+    _, samples = measure(pdf_path, tmp_path / "out", 'layout', True, page_window=PAGE_WINDOW)
+
+    assert (tmp_path / "out" / "synthetic.md").exists()
+    assert growth(samples) <= DEFAULT_TOLERANCE
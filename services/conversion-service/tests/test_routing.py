@@ -0,0 +1,44 @@
+"""Tests for routing conversion jobs by the resource they use."""
+
+import zipfile
+
+from batch.routing import job_kind
+
+MOBI_HEADER = bytes(60) + b"BOOKMOBI" + bytes(24)
+
+
+def write_epub(path):
+    with zipfile.ZipFile(path, "w") as epub:
+        epub.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        epub.writestr("META-INF/container.xml", "<container/>")
+    return path
+
+
+def test_jobs_are_classified_by_content(tmp_path):
+    pdf = tmp_path / "book.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n%%EOF\n")
+    mobi = tmp_path / "book.azw3"
+    mobi.write_bytes(MOBI_HEADER)
+    notes = tmp_path / "notes.md"
+    notes.write_text("# Notes\n")
+
+    assert job_kind(pdf) == 'parse'
+    assert job_kind(write_epub(tmp_path / "book.epub")) == 'parse'
+    assert job_kind(mobi) == 'subprocess'
+    assert job_kind(notes) == 'render'
+
+
+def test_mislabelled_file_is_routed_by_its_content(tmp_path):
+    mobi = tmp_path / "book.pdf"
+    mobi.write_bytes(MOBI_HEADER)
+
+    assert job_kind(mobi) == 'subprocess'
+    assert job_kind(write_epub(tmp_path / "book.mobi")) == 'parse'
+
+
+def test_preflight_format_is_used_without_reading_the_file(tmp_path):
+    missing = tmp_path / "gone.pdf"
+
+    assert job_kind(missing, 'mobi') == 'subprocess'
+    assert job_kind(missing, 'markdown') == 'render'
+    assert job_kind(missing, 'pdf') == 'parse'
@@ -0,0 +1,29 @@
+"""Tests for the full-text search index."""
+
+from outputs.search_index import SearchIndex
+
+FIRST = "# Voyage\n\nThe albatross follows the ship.\n\n## Calm\n\nWater, water, everywhere.\n"
+SECOND = "# Voyage\n\nThe ship sails on.\n"
+
+
+def test_reindexing_replaces_only_that_documents_chunks(tmp_path):
+    with SearchIndex(tmp_path / "index.db") as index:
+        assert index.index_document("out/voyage.md", "voyage", FIRST)
+        assert index.index_document("out/other.md", "other", "# Other\n\nAn albatross here too.\n")
+        assert not index.index_document("out/voyage.md", "voyage", FIRST)
+
+        assert index.index_document("out/voyage.md", "voyage", SECOND)
+
+        assert [hit["path"] for hit in index.search("albatross")] == ["out/other.md"]
+        assert index.search("everywhere") == []
+        assert [hit["heading"] for hit in index.search("sails")] == ["Voyage"]
+        assert index.stats() == {"documents": 2, "chunks": 2}
+
+
+def test_removed_document_is_no_longer_found(tmp_path):
+    with SearchIndex(tmp_path / "index.db") as index:
+        index.index_document("out/voyage.md", "voyage", FIRST)
+        index.remove_document("out/voyage.md")
+
+        assert index.search("albatross") == []
+        assert index.stats() == {"documents": 0, "chunks": 0}
@@ -0,0 +1,54 @@
+"""Tests for content sniffing and preflight checks."""
+
+import pytest
+
+from converters.sniffing import InvalidInputError, input_format, preflight
+
+MINIMAL_PDF = (
+    b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog >>\nendobj\n"
+    b"xref\n0 2\n0000000000 65535 f \n0000000009 00000 n \n"
+    b"trailer\n<< /Size 2 /Root 1 0 R >>\nstartxref\n47\n%%EOF\n"
+)
+
+
+def test_markdown_quoting_the_pdf_header_stays_markdown(tmp_path):
+    notes = tmp_path / "notes.md"
+    notes.write_text(
+        "# Notes on PDF\n\nEvery PDF file begins with `%PDF-1.7` and ends with `%%EOF`.\n"
+    )
+
+    assert input_format(notes) == 'markdown'
+    assert preflight(notes) == 'markdown'
+
+
+def test_markdown_starting_with_the_pdf_header_stays_markdown(tmp_path):
+    notes = tmp_path / "notes.markdown"
+    notes.write_text("%PDF-1.7 is the header every PDF starts with.\n")
+
+    assert preflight(notes) == 'markdown'
+
+
+def test_pdf_header_after_leading_junk_only_counts_for_pdf_suffix(tmp_path):
+    content = b"junk before the header\n" + MINIMAL_PDF
+    named_pdf = tmp_path / "book.pdf"
+    named_pdf.write_bytes(content)
+    named_txt = tmp_path / "book.txt"
+    named_txt.write_bytes(content)
+
+    assert preflight(named_pdf) == 'pdf'
+    assert input_format(named_txt) is None
+
+
+def test_mislabeled_pdf_is_routed_by_content(tmp_path):
+    book = tmp_path / "book.epub"
+    book.write_bytes(MINIMAL_PDF)
+
+    assert preflight(book) == 'pdf'
+
+
+def test_truncated_pdf_is_rejected(tmp_path):
+    book = tmp_path / "book.pdf"
+    book.write_bytes(MINIMAL_PDF[:60])
+
+    with pytest.raises(InvalidInputError, match="Truncated PDF"):
+        preflight(book)
@@ -0,0 +1,29 @@
+"""Tests for the supervised worker pool."""
+
+import time
+
+import pytest
+
+from batch.supervisor import JobTimeoutError, WorkerPool
+
+
+def test_done_callback_can_submit_a_follow_up_job():
+    follow_ups = []
+    with WorkerPool(1) as pool:
+        first = pool.submit(abs, -1)
+        first.add_done_callback(lambda future: follow_ups.append(pool.submit(abs, -2)))
+
+        assert first.result(timeout=30) == 1
+        deadline = time.monotonic() + 30
+        while not follow_ups and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert follow_ups[0].result(timeout=30) == 2
+
+
+def test_job_over_its_budget_fails_and_the_worker_is_replaced():
+    with WorkerPool(1) as pool:
+        stuck = pool.submit(time.sleep, 60, timeout=0.5)
+        with pytest.raises(JobTimeoutError):
+            stuck.result(timeout=30)
+
+        assert pool.submit(abs, -3).result(timeout=30) == 3
@@ -0,0 +1,97 @@
+"""Tests for the shared work queue with several local worker processes."""
+
+import multiprocessing
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch.work_queue import open_queue, run_worker
+from benchmark_pdf_memory import write_synthetic_pdf
+
+# Short leases so expiry can be waited out in a test
+LEASE_SECONDS = 0.5
+OPTIONS = {'pdf_engine': 'fast', 'checkpoint': False}
+
+
+def make_books(directory, count):
+    directory.mkdir()
+    books = [directory / f"book{number}.pdf" for number in range(count)]
+    for book in books:
+        write_synthetic_pdf(book, 2)
+    return books
+
+
+def job_rows(queue_url):
+    with sqlite3.connect(queue_url) as conn:
+        return conn.execute('SELECT status, attempts, message FROM jobs ORDER BY id').fetchall()
+
+
+def lease_and_hang(queue_url, worker_id, leased):
+    """Lease a job and stop heartbeating, like a worker killed mid-job."""
+    queue = open_queue(queue_url)
+    queue.lease(worker_id, LEASE_SECONDS)
+    leased.set()
+    time.sleep(60)
+
+
+def kill_worker_mid_job(queue_url, worker_id):
+    leased = multiprocessing.Event()
+    worker = multiprocessing.Process(target=lease_and_hang, args=(queue_url, worker_id, leased))
+    worker.start()
+    assert leased.wait(10)
+    worker.kill()
+    worker.join()
+    time.sleep(LEASE_SECONDS * 2)
+
+
+def test_concurrent_workers_complete_each_job_once(tmp_path):
+    books = make_books(tmp_path / "in", 6)
+    queue_url = str(tmp_path / "queue.db")
+    queue = open_queue(queue_url)
+    queue.enqueue(books, tmp_path / "out", converter_options=OPTIONS)
+    queue.close()
+
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(run_worker, queue_url, f"worker-{number}",
+                            lease_seconds=30, poll_interval=0.05, exit_when_empty=True)
+            for number in range(3)
+        ]
+        processed = [future.result() for future in futures]
+
+    assert sum(processed) == len(books)
+    assert [(status, attempts) for status, attempts, _ in job_rows(queue_url)] == [('done', 1)] * 6
+    assert sorted(path.name for path in (tmp_path / "out").glob("*.md")) == [
+        f"book{number}.md" for number in range(6)
+    ]
+
+
+def test_expired_lease_is_handed_to_another_worker(tmp_path):
+    books = make_books(tmp_path / "in", 1)
+    queue_url = str(tmp_path / "queue.db")
+    queue = open_queue(queue_url)
+    queue.enqueue(books, tmp_path / "out", converter_options=OPTIONS, max_attempts=2)
+    queue.close()
+
+    kill_worker_mid_job(queue_url, "doomed")
+    processed = run_worker(queue_url, "survivor", lease_seconds=30, poll_interval=0.05,
+                           exit_when_empty=True)
+
+    assert processed == 1
+    assert [(status, attempts) for status, attempts, _ in job_rows(queue_url)] == [('done', 2)]
+
+
+def test_job_fails_once_its_leases_expire_max_attempts_times(tmp_path):
+    books = make_books(tmp_path / "in", 1)
+    queue_url = str(tmp_path / "queue.db")
+    queue = open_queue(queue_url)
+    queue.enqueue(books, tmp_path / "out", converter_options=OPTIONS, max_attempts=2)
+    queue.close()
+
+    kill_worker_mid_job(queue_url, "doomed-1")
+    kill_worker_mid_job(queue_url, "doomed-2")
+    processed = run_worker(queue_url, "survivor", lease_seconds=30, poll_interval=0.05,
+                           exit_when_empty=True)
+
+    assert processed == 0
+    assert job_rows(queue_url) == [('failed', 2, 'Lease expired after 2 attempts')]